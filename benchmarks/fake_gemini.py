@@ -0,0 +1,224 @@
+"""
+Local stand-in for the Gemini REST API, for benchmarks without quota.
+
+Implements ``models/*:generateContent`` and ``models/*:streamGenerateContent``
+as spoken by google-generativeai with ``transport="rest"``. Latency is drawn
+from a configurable time-to-first-token distribution plus a per-token delay,
+and streamed answers arrive token by token.
+
+Run standalone:
+    python -m benchmarks.fake_gemini --port 8090 --ttft-ms 400 --token-ms 15
+
+Then start the API with:
+    GEMINI_API_ENDPOINT=http://127.0.0.1:8090 GEMINI_TRANSPORT=rest python -m phase7_api.main
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator
+
+VOCABULARY = (
+    "St. Aloysius University offers undergraduate and postgraduate programs "
+    "admissions open every year students apply online with marks cards and "
+    "the fee structure depends on the course hostel facilities library "
+    "placements scholarships are available for eligible candidates contact "
+    "the admissions office for details"
+).split()
+
+
+@dataclass
+class FakeGeminiSettings:
+    """Latency and output shape of the stand-in."""
+    ttft_ms: float = 400.0
+    ttft_jitter_ms: float = 100.0
+    distribution: str = "lognormal"  # fixed | uniform | normal | lognormal
+    tokens: int = 120
+    token_ms: float = 10.0
+    tokens_per_chunk: int = 4
+    error_rate: float = 0.0
+    seed: int = 0
+
+    def sample_ttft(self, rng: random.Random) -> float:
+        """Time to first token in seconds."""
+        mean, spread = self.ttft_ms, self.ttft_jitter_ms
+        if self.distribution == "fixed" or spread <= 0:
+            value = mean
+        elif self.distribution == "uniform":
+            value = rng.uniform(mean - spread, mean + spread)
+        elif self.distribution == "normal":
+            value = rng.gauss(mean, spread)
+        elif self.distribution == "lognormal":
+            # Parameterized so the median is ``mean`` and the tail grows with ``spread``
+            sigma = spread / max(mean, 1e-9)
+            value = mean * rng.lognormvariate(0.0, sigma)
+        else:
+            raise ValueError(f"Unknown latency distribution: {self.distribution}")
+        return max(value, 0.0) / 1000
+
+
+class _Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts: Dict[str, int] = {"generate": 0, "stream": 0, "errors": 0}
+
+    def inc(self, key: str) -> None:
+        with self.lock:
+            self.counts[key] += 1
+
+
+def _candidate(text: str, final: bool) -> Dict:
+    candidate = {"content": {"parts": [{"text": text}], "role": "model"}, "index": 0}
+    if final:
+        candidate["finishReason"] = "STOP"
+    return {"candidates": [candidate]}
+
+
+def _make_handler(settings: FakeGeminiSettings, stats: _Stats):
+    rng = random.Random(settings.seed)
+    rng_lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, status: int, body: Dict) -> None:
+            payload = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _answer_chunks(self) -> Iterator[str]:
+            with rng_lock:
+                words = [rng.choice(VOCABULARY) for _ in range(settings.tokens)]
+            for start in range(0, len(words), settings.tokens_per_chunk):
+                yield " ".join(words[start:start + settings.tokens_per_chunk]) + " "
+
+        def do_GET(self):
+            if self.path.rstrip("/") == "/stats":
+                with stats.lock:
+                    self._send_json(200, {"settings": asdict(settings), **stats.counts})
+            else:
+                self._send_json(404, {"error": {"code": 404, "message": "Not found"}})
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            self.rfile.read(length)
+
+            path = self.path.split("?", 1)[0]
+            streaming = path.endswith(":streamGenerateContent")
+            if not streaming and not path.endswith(":generateContent"):
+                self._send_json(404, {"error": {"code": 404, "message": "Not found"}})
+                return
+
+            with rng_lock:
+                ttft = settings.sample_ttft(rng)
+                fail = rng.random() < settings.error_rate
+            time.sleep(ttft)
+
+            if fail:
+                stats.inc("errors")
+                self._send_json(500, {"error": {
+                    "code": 500, "message": "Injected failure", "status": "INTERNAL"
+                }})
+                return
+
+            chunks = list(self._answer_chunks())
+            if not streaming:
+                stats.inc("generate")
+                time.sleep(settings.token_ms * settings.tokens / 1000)
+                self._send_json(200, _candidate("".join(chunks).strip(), final=True))
+                return
+
+            # The REST transport reads a streamed JSON array of responses
+            stats.inc("stream")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+            self.wfile.write(b"[")
+            for i, chunk in enumerate(chunks):
+                if i:
+                    time.sleep(settings.token_ms * settings.tokens_per_chunk / 1000)
+                    self.wfile.write(b",\r\n")
+                final = i == len(chunks) - 1
+                self.wfile.write(json.dumps(_candidate(chunk, final)).encode("utf-8"))
+                self.wfile.flush()
+            self.wfile.write(b"]")
+            self.wfile.flush()
+
+    return Handler
+
+
+def start_fake_gemini(
+    settings: FakeGeminiSettings, host: str = "127.0.0.1", port: int = 0
+) -> ThreadingHTTPServer:
+    """
+    Start the stand-in on a background thread.
+
+    Returns:
+        The running server; ``server.server_address`` has the bound port
+    """
+    server = ThreadingHTTPServer((host, port), _make_handler(settings, _Stats()))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="fake-gemini", daemon=True).start()
+    return server
+
+
+def add_settings_arguments(parser: argparse.ArgumentParser) -> None:
+    """Register the stand-in's latency options on a CLI parser."""
+    defaults = FakeGeminiSettings()
+    parser.add_argument("--ttft-ms", type=float, default=defaults.ttft_ms,
+                        help="Median/mean time to first token")
+    parser.add_argument("--ttft-jitter-ms", type=float, default=defaults.ttft_jitter_ms,
+                        help="Spread of the time to first token")
+    parser.add_argument("--distribution", default=defaults.distribution,
+                        choices=["fixed", "uniform", "normal", "lognormal"])
+    parser.add_argument("--tokens", type=int, default=defaults.tokens,
+                        help="Words per generated answer")
+    parser.add_argument("--token-ms", type=float, default=defaults.token_ms,
+                        help="Generation delay per word")
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate,
+                        help="Fraction of calls answered with HTTP 500")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+
+
+def settings_from_args(args: argparse.Namespace) -> FakeGeminiSettings:
+    return FakeGeminiSettings(
+        ttft_ms=args.ttft_ms,
+        ttft_jitter_ms=args.ttft_jitter_ms,
+        distribution=args.distribution,
+        tokens=args.tokens,
+        token_ms=args.token_ms,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Gemini REST API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    add_settings_arguments(parser)
+    args = parser.parse_args()
+
+    server = start_fake_gemini(settings_from_args(args), args.host, args.port)
+    print(f"🤖 Fake Gemini listening on http://{args.host}:{server.server_address[1]}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Retrieval latency and recall: Chroma collection vs the NumPy flat index.
+
+Embeds a question corpus once, then times top-k retrieval per query and
+per batch against the persistent Chroma collection (HNSW) and the
+memory-mapped snapshot exported by phase 4, and reports the recall@k of
+Chroma's results (and of the flat index, when it scans compressed vectors)
+against the exact neighbours, as JSON. Run after phase 4.
+
+Examples:
+    python -m benchmarks.retrieval_benchmark
+    python -m benchmarks.retrieval_benchmark --top-k 10 --repeat 20 --output retrieval.json
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from benchmarks.run_benchmark import QUESTIONS_PATH, summarize_ms
+from config.config import config
+
+
+def time_calls(func: Callable[[], object], repeat: int) -> List[float]:
+    """Wall-clock seconds of ``repeat`` calls to ``func``."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def recall_at_k(found: List[List[str]], exact: List[List[str]]) -> float:
+    """Mean fraction of the exact top-k ids present in the approximate top-k."""
+    scores = [
+        len(set(approx) & set(truth)) / len(truth)
+        for approx, truth in zip(found, exact)
+        if truth
+    ]
+    return sum(scores) / len(scores) if scores else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare Chroma and NumPy flat index retrieval")
+    parser.add_argument("--questions", default=QUESTIONS_PATH, help="JSON list of questions")
+    parser.add_argument("--top-k", type=int, default=config.rag.top_k_results)
+    parser.add_argument("--repeat", type=int, default=10, help="Timed passes over the corpus")
+    parser.add_argument("--output", help="Write the JSON report here as well as to stdout")
+    args = parser.parse_args()
+
+    from phase4_vectorstore.index_version import get_index_version
+    from phase4_vectorstore.snapshot import read_snapshot_meta
+    from phase6_rag.embed_query import embed_queries
+    from phase6_rag.retrieve_context import get_retrieval_service
+    from phase6_rag.shared_index import SharedIndex
+
+    with open(args.questions, "r", encoding="utf-8") as f:
+        questions = json.load(f)
+
+    print(f"🔹 Embedding {len(questions)} questions...", file=sys.stderr)
+    embeddings = np.asarray(embed_queries(questions), dtype=np.float32)
+    query_lists = [e.tolist() for e in embeddings]
+
+    collection = get_retrieval_service().collection()
+    flat = SharedIndex(config.serving.snapshot_dir, config.vector_db.rescore_candidates)
+    if collection.count() != flat.count():
+        print(
+            f"⚠️ Chroma has {collection.count()} chunks but the snapshot has "
+            f"{flat.count()}; re-run phase 4 for a fair comparison",
+            file=sys.stderr,
+        )
+
+    def chroma_single():
+        return [
+            collection.query(query_embeddings=[q], n_results=args.top_k)["ids"][0]
+            for q in query_lists
+        ]
+
+    def chroma_batch():
+        return collection.query(query_embeddings=query_lists, n_results=args.top_k)["ids"]
+
+    def flat_single():
+        return [flat.top_k(e, args.top_k)[0][0] for e in embeddings]
+
+    def flat_batch():
+        return flat.top_k(embeddings, args.top_k)[0]
+
+    # Warm up both backends (HNSW index load, page cache) before timing
+    chroma_ids = chroma_batch()
+    ids = flat.ids
+    numpy_ids = [[ids[i] for i in row] for row in flat_batch()]
+    exact_ids = [[ids[i] for i in row] for row in flat.top_k(embeddings, args.top_k, exact=True)[0]]
+
+    print(f"🔹 Timing {args.repeat} passes per backend...", file=sys.stderr)
+    n = len(questions)
+    results: Dict[str, Dict[str, object]] = {}
+    mean_query: Dict[str, float] = {}
+    for name, single, batch in (
+        ("chroma", chroma_single, chroma_batch),
+        ("numpy", flat_single, flat_batch),
+    ):
+        per_query = [s / n for s in time_calls(single, args.repeat)]
+        per_batch = time_calls(batch, args.repeat)
+        mean_query[name] = sum(per_query) / len(per_query)
+        results[name] = {
+            "single_query_ms": summarize_ms(per_query),
+            "batch_ms": summarize_ms(per_batch),
+            "batch_per_query_ms": round(sum(per_batch) / len(per_batch) / n * 1000, 3),
+        }
+
+    report = {
+        "questions": n,
+        "top_k": args.top_k,
+        "repeat": args.repeat,
+        "chunks": flat.count(),
+        "index_version": get_index_version(config.vector_db.db_path),
+        "backends": results,
+        "compression": (read_snapshot_meta(config.serving.snapshot_dir) or {}).get("compression"),
+        "chroma_recall_at_k": round(recall_at_k(chroma_ids, exact_ids), 4),
+        "numpy_recall_at_k": round(recall_at_k(numpy_ids, exact_ids), 4),
+        "numpy_speedup": round(mean_query["chroma"] / max(mean_query["numpy"], 1e-9), 2),
+    }
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,360 @@
+"""
+Load test and latency benchmark for the Aloysius Chatbot API.
+
+Boots the FastAPI app against the local fake Gemini (no quota used),
+replays a question corpus at a fixed request rate (open loop) or a fixed
+number of concurrent clients (closed loop), and reports latency
+percentiles, throughput, error rate and a per-stage breakdown taken from
+the ``Server-Timing`` header, as JSON.
+
+Examples:
+    python -m benchmarks.run_benchmark --mode concurrency --concurrency 16 --requests 400
+    python -m benchmarks.run_benchmark --mode rps --rps 20 --duration 60 --endpoint stream
+    python -m benchmarks.run_benchmark --output new.json --baseline main.json --max-regression 0.15
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from benchmarks.fake_gemini import add_settings_arguments, settings_from_args, start_fake_gemini
+
+QUESTIONS_PATH = os.path.join(os.path.dirname(__file__), "questions.json")
+ENDPOINT_PATHS = {"chat": "/api/v1/chat", "stream": "/api/v1/chat/stream"}
+
+
+@dataclass
+class Sample:
+    """Outcome of one request."""
+    latency: float
+    status: int
+    first_token: Optional[float] = None
+    stages: Dict[str, float] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and 200 <= self.status < 300
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of ``values`` (0 when empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def summarize_ms(values: List[float]) -> Dict[str, float]:
+    """p50/p95/p99/mean/max of second-valued samples, in milliseconds."""
+    if not values:
+        return {}
+    return {
+        "p50": round(percentile(values, 50) * 1000, 2),
+        "p95": round(percentile(values, 95) * 1000, 2),
+        "p99": round(percentile(values, 99) * 1000, 2),
+        "mean": round(sum(values) / len(values) * 1000, 2),
+        "max": round(max(values) * 1000, 2),
+    }
+
+
+def parse_server_timing(header: Optional[str]) -> Dict[str, float]:
+    """Parse ``name;dur=12.3, ...`` into seconds per stage."""
+    stages = {}
+    for entry in (header or "").split(","):
+        name, _, params = entry.strip().partition(";")
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "dur" and name:
+                try:
+                    stages[name] = float(value) / 1000
+                except ValueError:
+                    pass
+    return stages
+
+
+class ApiClient:
+    """Keep-alive HTTP client, one connection per calling thread."""
+
+    def __init__(self, base_url: str, endpoint: str, timeout: float):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.path = ENDPOINT_PATHS[endpoint]
+        self.streaming = endpoint == "stream"
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self._local.conn = conn
+        return conn
+
+    def ask(self, question: str, started: float) -> Sample:
+        """
+        Send one question. ``started`` is when the request was due, so time
+        spent waiting for a free client thread counts toward latency.
+        """
+        body = json.dumps({"question": question})
+        conn = self._connection()
+        try:
+            conn.request("POST", self.path, body=body, headers={"Content-Type": "application/json"})
+            response = conn.getresponse()
+            stages = parse_server_timing(response.getheader("Server-Timing"))
+
+            first_token = None
+            if self.streaming and response.status == 200:
+                # Read line by line to time the first token event
+                while True:
+                    line = response.readline()
+                    if not line:
+                        break
+                    if first_token is None and line.startswith(b"event: token"):
+                        first_token = time.perf_counter() - started
+            else:
+                response.read()
+
+            if response.getheader("Connection", "").lower() == "close":
+                conn.close()
+                self._local.conn = None
+
+            error = None if response.status < 400 else f"HTTP {response.status}"
+            return Sample(time.perf_counter() - started, response.status, first_token, stages, error)
+        except (OSError, http.client.HTTPException) as e:
+            conn.close()
+            self._local.conn = None
+            return Sample(time.perf_counter() - started, 0, error=type(e).__name__)
+
+
+def run_closed_loop(client: ApiClient, questions: List[str], concurrency: int, total: int) -> List[Sample]:
+    """``concurrency`` clients, each sending its next request as soon as one completes."""
+    samples: List[Sample] = []
+    lock = threading.Lock()
+    counter = iter(range(total))
+
+    def worker():
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                return
+            sample = client.ask(questions[i % len(questions)], time.perf_counter())
+            with lock:
+                samples.append(sample)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return samples
+
+
+def run_open_loop(client: ApiClient, questions: List[str], rps: float, duration: float) -> List[Sample]:
+    """Send requests at a fixed rate regardless of how fast responses come back."""
+    total = int(rps * duration)
+    interval = 1.0 / rps
+    # Enough threads that slow responses do not throttle the arrival rate
+    pool = ThreadPoolExecutor(max_workers=max(16, int(rps * 30)))
+    futures = []
+    begin = time.perf_counter()
+    for i in range(total):
+        due = begin + i * interval
+        delay = due - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        futures.append(pool.submit(client.ask, questions[i % len(questions)], due))
+    samples = [f.result() for f in futures]
+    pool.shutdown()
+    return samples
+
+
+def build_report(samples: List[Sample], elapsed: float, scenario: Dict) -> Dict:
+    """Aggregate samples into the JSON report."""
+    ok = [s for s in samples if s.ok]
+    stage_values: Dict[str, List[float]] = defaultdict(list)
+    for s in ok:
+        for stage, seconds in s.stages.items():
+            stage_values[stage].append(seconds)
+
+    report = {
+        "scenario": scenario,
+        "requests": len(samples),
+        "errors": len(samples) - len(ok),
+        "error_rate": round((len(samples) - len(ok)) / len(samples), 4) if samples else 0.0,
+        "duration_seconds": round(elapsed, 2),
+        "throughput_rps": round(len(ok) / elapsed, 2) if elapsed > 0 else 0.0,
+        "status_counts": dict(Counter(str(s.status) for s in samples)),
+        "error_counts": dict(Counter(s.error for s in samples if s.error)),
+        "latency_ms": summarize_ms([s.latency for s in ok]),
+        "stages_ms": {stage: summarize_ms(v) for stage, v in sorted(stage_values.items())},
+    }
+    first_tokens = [s.first_token for s in ok if s.first_token is not None]
+    if first_tokens:
+        report["first_token_ms"] = summarize_ms(first_tokens)
+    return report
+
+
+def compare_to_baseline(report: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Return a description of every metric that regressed beyond ``tolerance``."""
+    problems = []
+    for key in ("p50", "p95", "p99"):
+        old = baseline.get("latency_ms", {}).get(key)
+        new = report["latency_ms"].get(key)
+        if old and new and new > old * (1 + tolerance):
+            problems.append(f"latency {key} {old}ms -> {new}ms")
+    old_tp, new_tp = baseline.get("throughput_rps"), report["throughput_rps"]
+    if old_tp and new_tp < old_tp * (1 - tolerance):
+        problems.append(f"throughput {old_tp} -> {new_tp} req/s")
+    if report["error_rate"] > baseline.get("error_rate", 0.0) + 0.01:
+        problems.append(f"error rate {baseline.get('error_rate', 0.0)} -> {report['error_rate']}")
+    return problems
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_ready(base_url: str, timeout: float) -> None:
+    parts = urlsplit(base_url)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=2)
+            conn.request("GET", "/api/v1/ready")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"API at {base_url} did not become ready within {timeout:.0f}s")
+
+
+def start_api(gemini_url: str, args: argparse.Namespace) -> Tuple[subprocess.Popen, str]:
+    """Start the API in a subprocess wired to the fake Gemini."""
+    port = _free_port()
+    env = dict(
+        os.environ,
+        GEMINI_API_KEY=os.environ.get("GEMINI_API_KEY") or "benchmark-fake-key",
+        GEMINI_API_ENDPOINT=gemini_url,
+        GEMINI_TRANSPORT="rest",
+        LLM_HEALTH_INTERVAL="3600",
+        LOG_LEVEL="WARNING",
+    )
+    if not args.with_caches:
+        # Measure the full pipeline on every request
+        env.update(ANSWER_CACHE_ENABLED="false", SEMANTIC_CACHE_ENABLED="false",
+                   FAQ_ENABLED="false", COALESCE_REQUESTS="false")
+    command = [
+        sys.executable, "-m", "uvicorn", "phase7_api.main:app",
+        "--host", "127.0.0.1", "--port", str(port),
+        "--workers", str(args.workers), "--log-level", "warning",
+    ]
+    process = subprocess.Popen(command, env=env)
+    return process, f"http://127.0.0.1:{port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the chat API against a fake Gemini")
+    parser.add_argument("--base-url", help="Benchmark an already running API instead of booting one")
+    parser.add_argument("--endpoint", choices=sorted(ENDPOINT_PATHS), default="chat")
+    parser.add_argument("--mode", choices=["concurrency", "rps"], default="concurrency")
+    parser.add_argument("--concurrency", type=int, default=8, help="Closed-loop clients")
+    parser.add_argument("--requests", type=int, default=200, help="Closed-loop request count")
+    parser.add_argument("--rps", type=float, default=10.0, help="Open-loop request rate")
+    parser.add_argument("--duration", type=float, default=30.0, help="Open-loop duration (s)")
+    parser.add_argument("--warmup-requests", type=int, default=10, help="Sent first, not measured")
+    parser.add_argument("--questions", default=QUESTIONS_PATH, help="JSON list of questions")
+    parser.add_argument("--shuffle", action="store_true", help="Shuffle the corpus (seeded)")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the booted API")
+    parser.add_argument("--with-caches", action="store_true",
+                        help="Keep answer caches, FAQ answers and coalescing on (default: off)")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout (s)")
+    parser.add_argument("--ready-timeout", type=float, default=180.0)
+    parser.add_argument("--output", help="Write the JSON report here as well as to stdout")
+    parser.add_argument("--baseline", help="Earlier report to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2,
+                        help="Allowed relative slowdown before failing (with --baseline)")
+    add_settings_arguments(parser)
+    args = parser.parse_args()
+
+    with open(args.questions, "r", encoding="utf-8") as f:
+        questions = json.load(f)
+    if args.shuffle:
+        random.Random(args.seed).shuffle(questions)
+
+    settings = settings_from_args(args)
+    fake_server, api_process = None, None
+    base_url = args.base_url
+    try:
+        if base_url is None:
+            fake_server = start_fake_gemini(settings)
+            gemini_url = f"http://127.0.0.1:{fake_server.server_address[1]}"
+            print(f"🤖 Fake Gemini at {gemini_url}", file=sys.stderr)
+            api_process, base_url = start_api(gemini_url, args)
+            print(f"🔹 Starting API at {base_url}...", file=sys.stderr)
+        _wait_ready(base_url, args.ready_timeout)
+
+        client = ApiClient(base_url, args.endpoint, args.timeout)
+        for question in questions[:args.warmup_requests]:
+            client.ask(question, time.perf_counter())
+
+        print(f"🔹 Running {args.mode} load on /{args.endpoint}...", file=sys.stderr)
+        begin = time.perf_counter()
+        if args.mode == "rps":
+            samples = run_open_loop(client, questions, args.rps, args.duration)
+        else:
+            samples = run_closed_loop(client, questions, args.concurrency, args.requests)
+        elapsed = time.perf_counter() - begin
+    finally:
+        if api_process is not None:
+            api_process.terminate()
+            api_process.wait(timeout=30)
+        if fake_server is not None:
+            fake_server.shutdown()
+
+    scenario = {
+        "endpoint": args.endpoint,
+        "mode": args.mode,
+        "concurrency": args.concurrency if args.mode == "concurrency" else None,
+        "target_rps": args.rps if args.mode == "rps" else None,
+        "workers": args.workers,
+        "with_caches": args.with_caches,
+        "fake_gemini": asdict(settings) if args.base_url is None else None,
+    }
+    report = build_report(samples, elapsed, scenario)
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            problems = compare_to_baseline(report, json.load(f), args.max_regression)
+        if problems:
+            print("❌ Regression vs baseline: " + "; ".join(problems), file=sys.stderr)
+            sys.exit(1)
+        print("✅ No regression vs baseline", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
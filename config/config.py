@@ -22,6 +22,13 @@ class GeminiConfig:
     model: str = "gemini-2.0-flash"
     temperature: float = 0.7
     max_tokens: int = 2048
+    # Override the Gemini endpoint/transport (e.g. a local stand-in for benchmarks)
+    api_endpoint: Optional[str] = None
+    transport: Optional[str] = None
+    # Upload fixed system instructions once as cached content (needs a model
+    # and instruction size the context cache accepts; falls back otherwise)
+    context_cache: bool = False
+    context_cache_ttl_seconds: int = 3600
     
     def __post_init__(self):
         if not self.api_key or self.api_key == "your_google_gemini_api_key_here":
@@ -31,16 +38,47 @@ class GeminiConfig:
             )
 
 
+@dataclass
+class LLMConfig:
+    """LLM backend selection, request hedging and failure handling configuration"""
+    backend: str = "gemini"
+    hedge_enabled: bool = False
+    hedge_backend: Optional[str] = None
+    hedge_percentile: float = 95.0
+    hedge_window: int = 200
+    hedge_min_samples: int = 20
+    hedge_initial_delay: float = 3.0
+    hedge_min_delay: float = 0.25
+    hedge_pool_size: int = 8
+    ollama_model: str = "llama3"
+    ollama_host: str = "http://localhost:11434"
+    timeout_seconds: float = 30.0
+    retries: int = 2
+    retry_base_delay: float = 0.25
+    retry_max_delay: float = 2.0
+    breaker_failure_threshold: int = 5
+    breaker_reset_seconds: float = 30.0
+    degraded_fallback: bool = True
+
+
 @dataclass
 class VectorDBConfig:
     """Vector Database configuration"""
     db_path: str = "data/vector_db"
     collection_name: str = "aloysius_knowledge"
     persist: bool = True
+    # "chroma" queries the persistent collection; "numpy" searches the
+    # memory-mapped snapshot exported by phase 4 with exact matrix products
+    retriever: str = "chroma"
+    # Candidates per query rescored at full precision when the snapshot
+    # has compressed vectors (run_phase4 --compression)
+    rescore_candidates: int = 50
     
     def __post_init__(self):
         # Create directory if it doesn't exist
         os.makedirs(self.db_path, exist_ok=True)
+        if self.retriever not in ("chroma", "numpy"):
+            raise ValueError(f"Unknown RETRIEVER_BACKEND {self.retriever!r} (expected chroma or numpy)")
 
 
 @dataclass
@@ -61,6 +99,68 @@ class RAGConfig:
     top_k_results: int = 5
     similarity_threshold: float = 0.6
     use_reranking: bool = False
+    pack_context: bool = False
+    context_token_budget: int = 1500
+    fast_path_enabled: bool = False
+    fast_path_max_distance: float = 0.2
+    fast_path_min_margin: float = 0.02
+    fast_path_min_term_coverage: float = 0.75
+    fast_path_max_chars: int = 300
+    # Fuse dense results with BM25 over the chunk text (reciprocal rank fusion)
+    hybrid_search: bool = False
+    hybrid_candidates: int = 20
+    rrf_k: int = 60
+    # Cross-encoder reranking (use_reranking): candidates over-retrieved and
+    # scored, wait limit before falling back to retrieval order, score cache
+    rerank_model: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    rerank_candidates: int = 20
+    rerank_time_budget_ms: float = 150.0
+    rerank_cache_size: int = 5000
+
+
+@dataclass
+class CacheConfig:
+    """Answer cache configuration"""
+    semantic_enabled: bool = False
+    semantic_max_distance: float = 0.1
+    semantic_ttl_seconds: float = 3600.0
+    semantic_max_entries: int = 2000
+    semantic_max_mb: int = 32
+    answer_enabled: bool = True
+    answer_db_path: str = "data/cache/answer_cache.sqlite3"
+    answer_memory_entries: int = 1000
+    answer_ttl_seconds: float = 86400.0
+    answer_max_rows: int = 50000
+    faq_enabled: bool = True
+    faq_dir: str = "data/faq"
+    faq_max_distance: float = 0.08
+
+
+@dataclass
+class ServingConfig:
+    """Request serving configuration"""
+    executor_workers: int = 8
+    coalesce_requests: bool = True
+    batch_max_questions: int = 50
+    batch_concurrency: int = 4
+    max_concurrent_requests: int = 32
+    max_queue_size: int = 64
+    queue_timeout_seconds: float = 5.0
+    ready_cache_seconds: float = 5.0
+    llm_health_interval: float = 300.0
+    workers: int = 1
+    shared_memory: bool = False
+    snapshot_dir: str = "data/vector_db/snapshot"
+
+
+@dataclass
+class SessionConfig:
+    """Conversation session configuration"""
+    enabled: bool = True
+    max_sessions: int = 10000
+    idle_ttl_seconds: float = 1800.0
+    history_token_budget: int = 800
+    summary_token_budget: int = 300
 
 
 @dataclass
@@ -103,15 +203,43 @@ class Config:
             self.gemini = GeminiConfig(
                 api_key=os.getenv("GEMINI_API_KEY", ""),
                 model=os.getenv("GEMINI_MODEL", "gemini-2.0-flash"),
+                api_endpoint=os.getenv("GEMINI_API_ENDPOINT") or None,
+                transport=os.getenv("GEMINI_TRANSPORT") or None,
+                context_cache=os.getenv("GEMINI_CONTEXT_CACHE", "false").lower() == "true",
+                context_cache_ttl_seconds=int(os.getenv("GEMINI_CONTEXT_CACHE_TTL_SECONDS", "3600")),
             )
         except ValueError as e:
             logger.error(f"Gemini configuration error: {e}")
             raise
         
+        # LLM Backend Configuration
+        self.llm = LLMConfig(
+            backend=os.getenv("LLM_BACKEND", "gemini"),
+            hedge_enabled=os.getenv("LLM_HEDGE_ENABLED", "false").lower() == "true",
+            hedge_backend=os.getenv("LLM_HEDGE_BACKEND") or None,
+            hedge_percentile=float(os.getenv("LLM_HEDGE_PERCENTILE", "95")),
+            hedge_window=int(os.getenv("LLM_HEDGE_WINDOW", "200")),
+            hedge_min_samples=int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20")),
+            hedge_initial_delay=float(os.getenv("LLM_HEDGE_INITIAL_DELAY", "3.0")),
+            hedge_min_delay=float(os.getenv("LLM_HEDGE_MIN_DELAY", "0.25")),
+            hedge_pool_size=int(os.getenv("LLM_HEDGE_POOL_SIZE", "8")),
+            ollama_model=os.getenv("OLLAMA_MODEL", "llama3"),
+            ollama_host=os.getenv("OLLAMA_HOST", "http://localhost:11434"),
+            timeout_seconds=float(os.getenv("LLM_TIMEOUT_SECONDS", "30")),
+            retries=int(os.getenv("LLM_RETRIES", "2")),
+            retry_base_delay=float(os.getenv("LLM_RETRY_BASE_DELAY", "0.25")),
+            retry_max_delay=float(os.getenv("LLM_RETRY_MAX_DELAY", "2.0")),
+            breaker_failure_threshold=int(os.getenv("LLM_BREAKER_FAILURES", "5")),
+            breaker_reset_seconds=float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30")),
+            degraded_fallback=os.getenv("LLM_DEGRADED_FALLBACK", "true").lower() == "true",
+        )
+        
         # Vector DB Configuration
         self.vector_db = VectorDBConfig(
             db_path=os.getenv("VECTOR_DB_PATH", "data/vector_db"),
             collection_name=os.getenv("COLLECTION_NAME", "aloysius_knowledge"),
+            retriever=os.getenv("RETRIEVER_BACKEND", "chroma").lower(),
+            rescore_candidates=int(os.getenv("VECTOR_RESCORE_CANDIDATES", "50")),
         )
         
         # Chunking Configuration
@@ -130,6 +258,62 @@ class Config:
             top_k_results=int(os.getenv("TOP_K_RESULTS", "5")),
             similarity_threshold=float(os.getenv("SIMILARITY_THRESHOLD", "0.6")),
             use_reranking=os.getenv("USE_RERANKING", "false").lower() == "true",
+            pack_context=os.getenv("PACK_CONTEXT", "false").lower() == "true",
+            context_token_budget=int(os.getenv("CONTEXT_TOKEN_BUDGET", "1500")),
+            fast_path_enabled=os.getenv("FAST_PATH_ENABLED", "false").lower() == "true",
+            fast_path_max_distance=float(os.getenv("FAST_PATH_MAX_DISTANCE", "0.2")),
+            fast_path_min_margin=float(os.getenv("FAST_PATH_MIN_MARGIN", "0.02")),
+            fast_path_min_term_coverage=float(os.getenv("FAST_PATH_MIN_TERM_COVERAGE", "0.75")),
+            fast_path_max_chars=int(os.getenv("FAST_PATH_MAX_CHARS", "300")),
+            hybrid_search=os.getenv("HYBRID_SEARCH", "false").lower() == "true",
+            hybrid_candidates=int(os.getenv("HYBRID_CANDIDATES", "20")),
+            rrf_k=int(os.getenv("RRF_K", "60")),
+            rerank_model=os.getenv("RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2"),
+            rerank_candidates=int(os.getenv("RERANK_CANDIDATES", "20")),
+            rerank_time_budget_ms=float(os.getenv("RERANK_TIME_BUDGET_MS", "150")),
+            rerank_cache_size=int(os.getenv("RERANK_CACHE_SIZE", "5000")),
+        )
+        
+        # Cache Configuration
+        self.cache = CacheConfig(
+            semantic_enabled=os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() == "true",
+            semantic_max_distance=float(os.getenv("SEMANTIC_CACHE_MAX_DISTANCE", "0.1")),
+            semantic_ttl_seconds=float(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", "3600")),
+            semantic_max_entries=int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "2000")),
+            semantic_max_mb=int(os.getenv("SEMANTIC_CACHE_MAX_MB", "32")),
+            answer_enabled=os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true",
+            answer_db_path=os.getenv("ANSWER_CACHE_PATH", "data/cache/answer_cache.sqlite3"),
+            answer_memory_entries=int(os.getenv("ANSWER_CACHE_MEMORY_ENTRIES", "1000")),
+            answer_ttl_seconds=float(os.getenv("ANSWER_CACHE_TTL_SECONDS", "86400")),
+            answer_max_rows=int(os.getenv("ANSWER_CACHE_MAX_ROWS", "50000")),
+            faq_enabled=os.getenv("FAQ_ENABLED", "true").lower() == "true",
+            faq_dir=os.getenv("FAQ_DIR", "data/faq"),
+            faq_max_distance=float(os.getenv("FAQ_MAX_DISTANCE", "0.08")),
+        )
+        
+        # Serving Configuration
+        self.serving = ServingConfig(
+            executor_workers=int(os.getenv("RAG_EXECUTOR_WORKERS", "8")),
+            coalesce_requests=os.getenv("COALESCE_REQUESTS", "true").lower() == "true",
+            batch_max_questions=int(os.getenv("BATCH_MAX_QUESTIONS", "50")),
+            batch_concurrency=int(os.getenv("BATCH_CONCURRENCY", "4")),
+            max_concurrent_requests=int(os.getenv("MAX_CONCURRENT_REQUESTS", "32")),
+            max_queue_size=int(os.getenv("MAX_QUEUE_SIZE", "64")),
+            queue_timeout_seconds=float(os.getenv("QUEUE_TIMEOUT_SECONDS", "5")),
+            ready_cache_seconds=float(os.getenv("READY_CACHE_SECONDS", "5")),
+            llm_health_interval=float(os.getenv("LLM_HEALTH_INTERVAL", "300")),
+            workers=int(os.getenv("WORKERS", "1")),
+            shared_memory=os.getenv("SHARED_MEMORY_MODE", "false").lower() == "true",
+            snapshot_dir=os.getenv("SNAPSHOT_DIR", "data/vector_db/snapshot"),
+        )
+        
+        # Session Configuration
+        self.sessions = SessionConfig(
+            enabled=os.getenv("SESSIONS_ENABLED", "true").lower() == "true",
+            max_sessions=int(os.getenv("SESSION_MAX_SESSIONS", "10000")),
+            idle_ttl_seconds=float(os.getenv("SESSION_IDLE_TTL_SECONDS", "1800")),
+            history_token_budget=int(os.getenv("SESSION_HISTORY_TOKEN_BUDGET", "800")),
+            summary_token_budget=int(os.getenv("SESSION_SUMMARY_TOKEN_BUDGET", "300")),
         )
         
         # Logging Configuration
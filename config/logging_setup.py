@@ -17,6 +17,9 @@ def setup_logging():
     log_dir = Path(config.logging.log_file).parent
     log_dir.mkdir(exist_ok=True)
     
+    # LOG_FORMAT=json switches both handlers to one JSON object per line
+    use_json = config.logging.format.lower() == "json"
+    
     # Basic configuration
     logging_config = {
         'version': 1,
@@ -28,18 +31,21 @@ def setup_logging():
             'detailed': {
                 'format': '%(asctime)s - %(name)s - %(levelname)s - %(filename)s:%(lineno)d - %(funcName)s() - %(message)s'
             },
+            'json': {
+                '()': JSONFormatter,
+            },
         },
         'handlers': {
             'console': {
                 'class': 'logging.StreamHandler',
                 'level': config.logging.level,
-                'formatter': 'standard',
+                'formatter': 'json' if use_json else 'standard',
                 'stream': 'ext://sys.stdout'
             },
             'file': {
                 'class': 'logging.handlers.RotatingFileHandler',
                 'level': config.logging.level,
-                'formatter': 'detailed',
+                'formatter': 'json' if use_json else 'detailed',
                 'filename': config.logging.log_file,
                 'maxBytes': 10485760,  # 10MB
                 'backupCount': 5,
@@ -68,10 +74,17 @@ def setup_logging():
     root_logger = logging.getLogger()
     root_logger.info(
         f"Logging initialized - Level: {config.logging.level}, "
-        f"File: {config.logging.log_file}, Environment: {config.app.environment}"
+        f"File: {config.logging.log_file}, Format: {config.logging.format}, "
+        f"Environment: {config.app.environment}"
     )
 
 
+# Attributes every LogRecord has; anything else was passed via ``extra``
+_RESERVED_ATTRS = set(
+    logging.LogRecord("", 0, "", 0, "", (), None).__dict__
+) | {"message", "asctime"}
+
+
 class JSONFormatter(logging.Formatter):
     """JSON logging formatter for structured logs"""
     
@@ -87,11 +100,16 @@ class JSONFormatter(logging.Formatter):
             'line': record.lineno,
         }
         
+        # Add structured fields passed via ``extra=``
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and key not in log_data:
+                log_data[key] = value
+        
         # Add exception info if present
         if record.exc_info:
             log_data['exception'] = self.formatException(record.exc_info)
         
-        return json.dumps(log_data)
+        return json.dumps(log_data, default=str)
 
 
 def get_logger(name: str) -> logging.Logger:
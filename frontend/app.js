@@ -6,6 +6,9 @@ const sendBtn = document.getElementById("sendBtn");
 const chatBox = document.getElementById("chatBox");
 const clearBtn = document.getElementById("clearChat");
 
+// Server-side conversation session; follow-up questions send it back
+let sessionId = sessionStorage.getItem("chat_session_id");
+
 // --- INITIALIZATION ---
 window.onload = () => {
     // 1. Restore Chat History
@@ -100,25 +103,15 @@ async function sendMessage(e) {
         stepEl.textContent = steps[i];
     }, 700);
 
-    try {
-        const res = await fetch(`${API_BASE_URL}/chat`, {
-            method: "POST",
-            headers: { "Content-Type": "application/json" },
-            body: JSON.stringify({ question })
-        });
-
-        const data = await res.json();
+    const stopProcessing = () => {
         clearInterval(interval);
         processing.remove();
+    };
 
-        addMessage(
-            data.answer || "I do not have this information from the official website.",
-            "bot",
-            data.sources || []
-        );
+    try {
+        await streamAnswer(question, stopProcessing);
     } catch {
-        clearInterval(interval);
-        processing.remove();
+        stopProcessing();
         addMessage("An error occurred. Please try again.", "bot");
     } finally {
         input.disabled = false;
@@ -127,6 +120,78 @@ async function sendMessage(e) {
     }
 }
 
+/* --- STREAMING (Server-Sent Events over fetch) --- */
+
+async function streamAnswer(question, onFirstEvent) {
+    const res = await fetch(`${API_BASE_URL}/chat/stream`, {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify(sessionId ? { question, session_id: sessionId } : { question, start_session: true })
+    });
+    if (!res.ok || !res.body) throw new Error(`HTTP ${res.status}`);
+
+    const reader = res.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+    let bubble = null;
+    let answer = "";
+    let sources = [];
+
+    const ensureBubble = () => {
+        if (bubble) return;
+        onFirstEvent();
+        bubble = createBotMessage();
+    };
+
+    const handleEvent = (event, data) => {
+        if (event === "meta") {
+            sources = data.sources || [];
+            if (data.session_id) {
+                sessionId = data.session_id;
+                sessionStorage.setItem("chat_session_id", sessionId);
+            }
+            ensureBubble();
+        } else if (event === "token") {
+            ensureBubble();
+            answer += data.text;
+            updateBotMessage(bubble, answer);
+        } else if (event === "error") {
+            ensureBubble();
+            answer += (answer ? "\n\n" : "") + (data.detail || "An error occurred. Please try again.");
+            updateBotMessage(bubble, answer);
+            sources = [];
+        }
+    };
+
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        // SSE frames are separated by a blank line
+        let sep;
+        while ((sep = buffer.indexOf("\n\n")) !== -1) {
+            const frame = buffer.slice(0, sep);
+            buffer = buffer.slice(sep + 2);
+
+            let event = "message";
+            let data = "";
+            frame.split("\n").forEach(line => {
+                if (line.startsWith("event:")) event = line.slice(6).trim();
+                else if (line.startsWith("data:")) data += line.slice(5).trim();
+            });
+            if (data) handleEvent(event, JSON.parse(data));
+        }
+    }
+
+    ensureBubble();
+    finalizeBotMessage(
+        bubble,
+        answer || "I do not have this information from the official website.",
+        sources
+    );
+}
+
 function renderMarkdownToHtml(text) {
     let safe = text
         .replace(/&/g, "&amp;")
@@ -171,20 +236,44 @@ function renderMarkdownToHtml(text) {
 }
 
 function addMessage(text, sender, sources = []) {
+    if (sender === "bot") {
+        finalizeBotMessage(createBotMessage(), text, sources);
+        return;
+    }
+
     const msg = document.createElement("div");
     msg.className = `message ${sender}-message`;
+    msg.innerHTML = `<div class="message-content">${escapeHtml(text)}</div>`;
+    chatBox.appendChild(msg);
+    scrollToBottom();
 
-    let html = `<div class="message-content">`;
+    sessionStorage.setItem("chat_history", chatBox.innerHTML);
+}
 
-    if (sender === "bot") {
-        html += `<div class="bot-badge">Official University Information</div>`;
-        html += renderMarkdownToHtml(text);
-        html += `<div class="answer-divider"></div>`;
-    } else {
-        html += escapeHtml(text);
-    }
+function createBotMessage() {
+    const msg = document.createElement("div");
+    msg.className = "message bot-message";
+    msg.innerHTML = `
+        <div class="message-content">
+            <div class="bot-badge">Official University Information</div>
+            <div class="answer-body"></div>
+        </div>`;
+    chatBox.appendChild(msg);
+    scrollToBottom();
+    return msg;
+}
+
+function updateBotMessage(msg, text) {
+    msg.querySelector(".answer-body").innerHTML = renderMarkdownToHtml(text);
+    scrollToBottom();
+}
+
+function finalizeBotMessage(msg, text, sources = []) {
+    updateBotMessage(msg, text);
 
-    if (sender === "bot" && sources.length) {
+    let html = `<div class="answer-divider"></div>`;
+
+    if (sources.length) {
         html += `<div class="sources"><strong>Sources:</strong>`;
         sources.forEach(src => {
             html += `<div><a href="${src}" target="_blank">${src}</a></div>`;
@@ -193,9 +282,7 @@ function addMessage(text, sender, sources = []) {
         html += `<button class="copy-btn" onclick="copyText(this)">Copy</button>`;
     }
 
-    html += `</div>`;
-    msg.innerHTML = html;
-    chatBox.appendChild(msg);
+    msg.querySelector(".message-content").insertAdjacentHTML("beforeend", html);
     scrollToBottom();
 
     sessionStorage.setItem("chat_history", chatBox.innerHTML);
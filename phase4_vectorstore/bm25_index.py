@@ -0,0 +1,172 @@
+"""
+BM25 inverted index over chunk text, stored next to the vector snapshot.
+
+MiniLM embeddings blur exact tokens such as course codes ("BCA301"),
+degree names ("B.Com"), fee amounts and years; a lexical index matches them
+exactly. Postings are stored in CSR form, one row per term, with the BM25
+weight of every (term, chunk) pair precomputed, so scoring a query is a sum
+of a few contiguous array slices. Rows follow the snapshot's chunk order.
+
+Files in the snapshot directory::
+
+    bm25-<version>-indptr.npy    (terms + 1,) int64 row offsets into the postings
+    bm25-<version>-docs.npy      (postings,) int32 chunk rows, ascending per term
+    bm25-<version>-weights.npy   (postings,) float32 BM25 weights
+    bm25-<version>-terms.json    term of each row
+"""
+
+import json
+import math
+import os
+import re
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+# Thousands separators inside numbers ("1,20,000") are dropped before tokenizing
+_DIGIT_GROUP = re.compile(r"(?<=\d),(?=\d)")
+# Words, numbers and dotted or hyphenated compounds such as "b.com" or "2024-25"
+_TOKEN = re.compile(r"[a-z0-9]+(?:[.\-][a-z0-9]+)*")
+
+K1 = 1.2
+B = 0.75
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercased index terms of ``text``. Compounds are also indexed joined
+    and by their parts, so "B.Com", "BCom" and "b com" all match.
+    """
+    terms = []
+    for token in _TOKEN.findall(_DIGIT_GROUP.sub("", text.lower())):
+        terms.append(token)
+        parts = re.split(r"[.\-]", token)
+        if len(parts) > 1:
+            terms.append("".join(parts))
+            terms.extend(parts)
+    return terms
+
+
+class BM25Index:
+    """
+    Okapi BM25 over a fixed list of documents.
+
+    Args:
+        terms: Vocabulary, one entry per postings row
+        indptr: Row offsets into ``docs`` and ``weights``
+        docs: Chunk row of each posting
+        weights: Precomputed BM25 weight of each posting
+        count: Number of documents
+    """
+
+    def __init__(
+        self,
+        terms: List[str],
+        indptr: np.ndarray,
+        docs: np.ndarray,
+        weights: np.ndarray,
+        count: int,
+    ):
+        self.term_ids = {term: i for i, term in enumerate(terms)}
+        self.indptr = indptr
+        self.docs = docs
+        self.weights = weights
+        self.count = count
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.indptr.nbytes + self.docs.nbytes + self.weights.nbytes)
+
+    @classmethod
+    def build(cls, documents: List[str], k1: float = K1, b: float = B) -> "BM25Index":
+        """Index ``documents``; row i of the index is ``documents[i]``."""
+        frequencies = [Counter(tokenize(doc)) for doc in documents]
+        lengths = np.array([sum(tf.values()) for tf in frequencies], dtype=np.float32)
+        avg_length = float(lengths.mean()) if len(lengths) and lengths.mean() > 0 else 1.0
+
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+        for row, tf in enumerate(frequencies):
+            for term, freq in tf.items():
+                postings.setdefault(term, []).append((row, freq))
+
+        terms = sorted(postings)
+        indptr = np.zeros(len(terms) + 1, dtype=np.int64)
+        docs, weights = [], []
+        for i, term in enumerate(terms):
+            rows = postings[term]
+            idf = math.log(1.0 + (len(documents) - len(rows) + 0.5) / (len(rows) + 0.5))
+            for row, freq in rows:
+                norm = k1 * (1.0 - b + b * lengths[row] / avg_length)
+                docs.append(row)
+                weights.append(idf * freq * (k1 + 1.0) / (freq + norm))
+            indptr[i + 1] = indptr[i] + len(rows)
+
+        return cls(
+            terms,
+            indptr,
+            np.asarray(docs, dtype=np.int32),
+            np.asarray(weights, dtype=np.float32),
+            len(documents),
+        )
+
+    def scores(self, query: str) -> np.ndarray:
+        """BM25 score of every document for ``query`` (zeros if no term matches)."""
+        scores = np.zeros(self.count, dtype=np.float32)
+        for term in set(tokenize(query)):
+            i = self.term_ids.get(term)
+            if i is None:
+                continue
+            start, end = self.indptr[i], self.indptr[i + 1]
+            # Rows are unique within a term's postings, so fancy-index += is safe
+            scores[self.docs[start:end]] += self.weights[start:end]
+        return scores
+
+    def top_k(self, query: str, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Rows and scores of the ``k`` best-matching documents, best first;
+        documents sharing no term with the query are left out.
+        """
+        scores = self.scores(query)
+        matched = int(np.count_nonzero(scores))
+        k = min(k, matched)
+        if k == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return top, scores[top]
+
+    def save(self, snapshot_dir: str, index_version: str) -> Dict[str, Any]:
+        """
+        Write the postings as memory-mappable ``.npy`` files.
+
+        Returns:
+            The ``bm25`` entry for the snapshot's ``meta.json``
+        """
+        prefix = f"bm25-{index_version}"
+        info = {"terms": len(self.term_ids), "postings": int(len(self.docs)), "count": self.count}
+        for name, array in (("indptr", self.indptr), ("docs", self.docs), ("weights", self.weights)):
+            filename = f"{prefix}-{name}.npy"
+            tmp_path = os.path.join(snapshot_dir, f"{filename}.tmp")
+            with open(tmp_path, "wb") as f:
+                np.save(f, array)
+            os.replace(tmp_path, os.path.join(snapshot_dir, filename))
+            info[f"{name}_file"] = filename
+
+        terms_file = f"{prefix}-terms.json"
+        tmp_path = os.path.join(snapshot_dir, f"{terms_file}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(sorted(self.term_ids, key=self.term_ids.get), f, ensure_ascii=False)
+        os.replace(tmp_path, os.path.join(snapshot_dir, terms_file))
+        info["terms_file"] = terms_file
+        return info
+
+    @classmethod
+    def load(cls, snapshot_dir: str, info: Dict[str, Any]) -> "BM25Index":
+        """Load an index written by ``save``; the postings are memory-mapped."""
+        def array(name):
+            return np.load(os.path.join(snapshot_dir, info[f"{name}_file"]), mmap_mode="r")
+
+        with open(os.path.join(snapshot_dir, info["terms_file"]), "r", encoding="utf-8") as f:
+            terms = json.load(f)
+        return cls(terms, array("indptr"), array("docs"), array("weights"), info["count"])
@@ -0,0 +1,247 @@
+"""
+Compressed copies of the snapshot embedding matrix.
+
+The flat index (``phase6_rag.shared_index``) can scan a compressed matrix
+instead of the float32 one and rescore only the best candidates at full
+precision, so the float32 rows are read from disk for a few dozen chunks
+per query instead of the whole corpus. Vectors are centered on the corpus
+mean, optionally projected onto their top principal components (PCA), and
+stored as:
+
+    float16   half precision, 2 bytes per dimension
+    int8      symmetric scalar quantization with one scale per dimension,
+              1 byte per dimension
+
+For a query q and a chunk x ~= mean + components.T @ z, the approximate
+similarity is ``q . mean + (components @ q) . z``; the first term is the
+same for every chunk, so ranking only needs the second.
+"""
+
+import os
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+METHODS = ("none", "float16", "int8")
+
+# Rows converted to float32 at a time while scanning; small blocks stay in the CPU cache
+SCAN_BLOCK_ROWS = 1024
+
+
+class CompressedVectors:
+    """
+    A compressed embedding matrix and the transform that produced it.
+
+    Args:
+        codes: (count, dims) float16 or int8 matrix, possibly memory-mapped
+        mean: (dim,) corpus mean subtracted before projection
+        components: (dims, dim) projection, or None for no PCA
+        scale: (dims,) per-dimension int8 step, or None for float16
+    """
+
+    def __init__(
+        self,
+        codes: np.ndarray,
+        mean: np.ndarray,
+        components: Optional[np.ndarray] = None,
+        scale: Optional[np.ndarray] = None,
+    ):
+        self.codes = codes
+        self.mean = mean
+        self.components = components
+        self.scale = scale
+
+    @property
+    def method(self) -> str:
+        return "int8" if self.codes.dtype == np.int8 else "float16"
+
+    @property
+    def dims(self) -> int:
+        return int(self.codes.shape[1])
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes of the compressed matrix plus its transform."""
+        extra = sum(a.nbytes for a in (self.mean, self.components, self.scale) if a is not None)
+        return int(self.codes.nbytes) + extra
+
+    @classmethod
+    def build(cls, embeddings: np.ndarray, method: str, pca_dims: int = 0) -> "CompressedVectors":
+        """
+        Compress an (count, dim) matrix of L2-normalized embeddings.
+
+        Args:
+            embeddings: Full-precision embeddings
+            method: ``float16`` or ``int8``
+            pca_dims: Keep this many principal components (0 keeps all dimensions)
+        """
+        if method not in ("float16", "int8"):
+            raise ValueError(f"Unknown vector compression {method!r} (expected float16 or int8)")
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        mean = embeddings.mean(axis=0) if len(embeddings) else np.zeros(embeddings.shape[1], np.float32)
+        centered = embeddings - mean
+
+        components = None
+        if 0 < pca_dims < embeddings.shape[1]:
+            # Eigenvectors of the (dim, dim) covariance; cheaper than an SVD of the corpus
+            eigenvalues, eigenvectors = np.linalg.eigh(centered.T @ centered)
+            components = eigenvectors[:, np.argsort(eigenvalues)[::-1][:pca_dims]].T
+            components = np.ascontiguousarray(components, dtype=np.float32)
+            centered = centered @ components.T
+
+        if method == "float16":
+            return cls(centered.astype(np.float16), mean, components)
+
+        scale = np.abs(centered).max(axis=0) / 127.0 if len(centered) else np.ones(centered.shape[1])
+        scale = np.maximum(scale, 1e-12).astype(np.float32)
+        codes = np.clip(np.rint(centered / scale), -127, 127).astype(np.int8)
+        return cls(codes, mean, components, scale)
+
+    def project(self, queries: np.ndarray) -> np.ndarray:
+        """Map (n, dim) queries onto the code space, scales folded in."""
+        projected = queries if self.components is None else queries @ self.components.T
+        if self.scale is not None:
+            projected = projected * self.scale
+        return np.ascontiguousarray(projected, dtype=np.float32)
+
+    def scores(self, queries: np.ndarray) -> np.ndarray:
+        """
+        Approximate similarities of each query to every chunk, up to a
+        per-query constant (fine for ranking, not for thresholds).
+
+        Returns:
+            (n, count) float32 array
+        """
+        projected = self.project(queries)
+        count = self.codes.shape[0]
+        scores = np.empty((len(projected), count), dtype=np.float32)
+        for start in range(0, count, SCAN_BLOCK_ROWS):
+            block = np.asarray(self.codes[start:start + SCAN_BLOCK_ROWS], dtype=np.float32)
+            scores[:, start:start + len(block)] = projected @ block.T
+        return scores
+
+    def save(self, snapshot_dir: str, index_version: str) -> Dict[str, Any]:
+        """
+        Write the codes (memory-mappable ``.npy``) and transform (``.npz``).
+
+        Returns:
+            The ``compression`` entry for the snapshot's ``meta.json``
+        """
+        codes_file = f"codes-{index_version}.npy"
+        params_file = f"codes-{index_version}.npz"
+
+        tmp_path = os.path.join(snapshot_dir, f"{codes_file}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.save(f, self.codes)
+        os.replace(tmp_path, os.path.join(snapshot_dir, codes_file))
+
+        params = {"mean": self.mean}
+        if self.components is not None:
+            params["components"] = self.components
+        if self.scale is not None:
+            params["scale"] = self.scale
+        tmp_path = os.path.join(snapshot_dir, f"{params_file}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **params)
+        os.replace(tmp_path, os.path.join(snapshot_dir, params_file))
+
+        return {
+            "method": self.method,
+            "pca_dims": self.dims if self.components is not None else 0,
+            "codes_file": codes_file,
+            "params_file": params_file,
+        }
+
+    @classmethod
+    def load(cls, snapshot_dir: str, info: Dict[str, Any]) -> "CompressedVectors":
+        """Load a compressed matrix written by ``save``; the codes are memory-mapped."""
+        codes = np.load(os.path.join(snapshot_dir, info["codes_file"]), mmap_mode="r")
+        with np.load(os.path.join(snapshot_dir, info["params_file"])) as params:
+            return cls(
+                codes,
+                params["mean"],
+                params["components"] if "components" in params else None,
+                params["scale"] if "scale" in params else None,
+            )
+
+
+def rescore(
+    embeddings: np.ndarray,
+    queries: np.ndarray,
+    candidates: np.ndarray,
+    k: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Exact top ``k`` among each query's candidate rows.
+
+    Only the candidate rows of ``embeddings`` are read, so a memory-mapped
+    float32 matrix is paged in for those rows alone.
+
+    Returns:
+        Tuple of (n, k) arrays (indices, similarities), nearest first
+    """
+    rows = np.sort(candidates, axis=1)
+    vectors = np.asarray(embeddings[rows.ravel()], dtype=np.float32).reshape(
+        rows.shape[0], rows.shape[1], -1
+    )
+    similarities = np.einsum("nd,ncd->nc", queries, vectors)
+    order = np.argsort(-similarities, axis=1)[:, :k]
+    return (
+        np.take_along_axis(rows, order, axis=1),
+        np.take_along_axis(similarities, order, axis=1),
+    )
+
+
+def evaluate(
+    embeddings: np.ndarray,
+    compressed: CompressedVectors,
+    k: int = 5,
+    candidates: int = 50,
+    sample: int = 200,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """
+    Memory saved and recall@k of compressed search against exact search,
+    using a sample of the corpus vectors as queries.
+
+    Returns:
+        Dict with full and compressed bytes, the saved fraction, and
+        recall@k of the compressed scan alone and after rescoring
+    """
+    count = len(embeddings)
+    full_bytes = int(np.asarray(embeddings[:1]).nbytes) * count
+    report = {
+        "method": compressed.method,
+        "dims": compressed.dims,
+        "full_bytes": full_bytes,
+        "compressed_bytes": compressed.nbytes,
+        "saved": round(1.0 - compressed.nbytes / full_bytes, 4) if full_bytes else 0.0,
+    }
+    k = min(k, count)
+    if k == 0:
+        return report
+
+    rng = np.random.default_rng(seed)
+    queries = np.asarray(
+        embeddings[np.sort(rng.choice(count, size=min(sample, count), replace=False))],
+        dtype=np.float32,
+    )
+    exact = np.argpartition(-(queries @ np.asarray(embeddings, dtype=np.float32).T), k - 1, axis=1)[:, :k]
+
+    approx_scores = compressed.scores(queries)
+    scan_top = np.argpartition(-approx_scores, k - 1, axis=1)[:, :k]
+    n_candidates = min(max(candidates, k), count)
+    shortlist = np.argpartition(-approx_scores, n_candidates - 1, axis=1)[:, :n_candidates]
+    rescored, _ = rescore(embeddings, queries, shortlist, k)
+
+    def recall(found: np.ndarray) -> float:
+        return float(np.mean([len(set(a) & set(b)) / k for a, b in zip(found, exact)]))
+
+    report.update({
+        "k": k,
+        "candidates": n_candidates,
+        "queries": len(queries),
+        "recall_at_k": round(recall(scan_top), 4),
+        "recall_at_k_rescored": round(recall(rescored), 4),
+    })
+    return report
@@ -1,8 +1,13 @@
 from sentence_transformers import SentenceTransformer
 from typing import List
 
-def embed_texts(texts: List[str]):
-    model = SentenceTransformer("all-MiniLM-L6-v2")
+MODEL_NAME = "all-MiniLM-L6-v2"
+
+def load_model() -> SentenceTransformer:
+    return SentenceTransformer(MODEL_NAME)
+
+def embed_texts(texts: List[str], model: SentenceTransformer = None):
+    model = model or load_model()
     embeddings = model.encode(
         texts,
         batch_size=32,
@@ -0,0 +1,71 @@
+"""
+Knowledge-base version marker for the persistent vector store.
+
+Every rebuild (phase 4) or incremental update (phase 5) of the Chroma
+collection writes a new version id next to the index. Serving code keys
+its caches on this id, so anything derived from an older index is never
+reused once the knowledge base changes.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+
+VERSION_FILENAME = "index_version.json"
+UNVERSIONED = "unversioned"
+
+_lock = threading.Lock()
+# persist_dir -> (mtime_ns, version)
+_cache = {}
+
+
+def _version_path(persist_dir: str) -> str:
+    return os.path.join(os.path.abspath(persist_dir), VERSION_FILENAME)
+
+
+def get_index_version(persist_dir: str = "data/vector_db") -> str:
+    """
+    Return the current index version id.
+
+    The marker file is only re-read when its mtime changes, so this is a
+    single ``stat`` call on the hot path.
+    """
+    path = _version_path(persist_dir)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return UNVERSIONED
+
+    with _lock:
+        cached = _cache.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            version = json.load(f).get("version", UNVERSIONED)
+    except (OSError, ValueError):
+        return UNVERSIONED
+
+    with _lock:
+        _cache[path] = (mtime, version)
+    return version
+
+
+def bump_index_version(persist_dir: str = "data/vector_db") -> str:
+    """
+    Record that the index contents changed and return the new version id.
+    """
+    path = _version_path(persist_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    version = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": version, "updated_at": time.time()}, f)
+    # Atomic swap so readers never observe a half-written marker
+    os.replace(tmp_path, path)
+
+    return version
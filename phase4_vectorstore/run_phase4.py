@@ -1,15 +1,30 @@
 from phase4_vectorstore.load_chunks import load_chunks
-from phase4_vectorstore.embed_chunks import embed_texts
+from phase4_vectorstore.embed_chunks import embed_texts, load_model
 from phase4_vectorstore.create_collection import get_collection
+from phase4_vectorstore.index_version import bump_index_version
+from phase4_vectorstore.compression import METHODS
+from phase4_vectorstore.snapshot import export_model_weights, export_snapshot
+import argparse
 import os
 
 CHUNKS_PATH = os.path.abspath("data/processed_chunks/chunks.json")
 VECTOR_DB_DIR = os.path.abspath("data/vector_db")
+SNAPSHOT_DIR = os.path.join(VECTOR_DB_DIR, "snapshot")
 COLLECTION_NAME = "aloysius_knowledge"
 
 BATCH_SIZE = 500
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Embed chunks and build the vector store")
+    parser.add_argument("--compression", choices=METHODS, default="none",
+                        help="Also store compressed vectors for the flat index (RETRIEVER_BACKEND=numpy)")
+    parser.add_argument("--pca-dims", type=int, default=0,
+                        help="Principal components kept when compressing (0 keeps all 384)")
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
+
     print("🔹 Loading processed chunks...")
     chunks = load_chunks(CHUNKS_PATH)
 
@@ -18,7 +33,8 @@ def main():
     ids = [c["id"] for c in chunks]
 
     print("🔹 Generating embeddings...")
-    embeddings = embed_texts(texts)
+    model = load_model()
+    embeddings = embed_texts(texts, model)
 
     print("🔹 Creating persistent vector store...")
     collection = get_collection(VECTOR_DB_DIR, COLLECTION_NAME)
@@ -38,6 +54,26 @@ def main():
 
         print(f"   ✔ Inserted {min(end, total)}/{total}")
 
+    version = bump_index_version(VECTOR_DB_DIR)
+    print(f"🔖 Index version: {version}")
+
+    # Memory-mappable copies for the flat index (RETRIEVER_BACKEND=numpy, SHARED_MEMORY_MODE)
+    print("🔹 Exporting serving snapshot...")
+    meta = export_snapshot(collection, SNAPSHOT_DIR, version, args.compression, args.pca_dims)
+    export_model_weights(model, SNAPSHOT_DIR)
+    if meta is None:
+        print("   ⚠ No vectors in the collection; snapshot not exported")
+    else:
+        print(f"   ✔ {meta['count']} vectors -> {SNAPSHOT_DIR}")
+        if "compression" in meta:
+            report = meta["compression"]["evaluation"]
+            print(
+                f"   ✔ {report['method']} x {report['dims']} dims: "
+                f"{report['full_bytes'] / 2**20:.1f} MiB -> {report['compressed_bytes'] / 2**20:.1f} MiB "
+                f"({report['saved']:.0%} saved), recall@{report.get('k', 0)} "
+                f"{report.get('recall_at_k', 0):.3f} scan / {report.get('recall_at_k_rescored', 0):.3f} rescored"
+            )
+
     print("✅ Phase 4 completed successfully.")
     print(f"📦 Total vectors stored: {collection.count()}")
 
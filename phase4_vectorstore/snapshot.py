@@ -0,0 +1,180 @@
+"""
+Read-only serving snapshot of the vector index and embedding model.
+
+Phase 4 (and phase 5, when something changed) exports the Chroma collection
+as a normalized float32 ``.npy`` matrix plus the chunk texts and metadata,
+and the embedding model's weights as a torch checkpoint. API workers
+memory-map both files, so N workers on a node share one physical copy
+through the page cache instead of holding N private copies.
+
+Layout of the snapshot directory::
+
+    meta.json                    pointer to the current files, written last
+    embeddings-<version>.npy     (count, dim) float32, L2-normalized rows
+    codes-<version>.npy/.npz     optional compressed rows and their transform
+                                 (see ``phase4_vectorstore.compression``)
+    bm25-<version>-*             BM25 postings over the chunk texts
+                                 (see ``phase4_vectorstore.bm25_index``)
+    chunks-<version>.json        {"ids": [...], "documents": [...], "metadatas": [...]}
+    model_weights.pt             embedding model state dict (torch zip format)
+"""
+
+import glob
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from phase4_vectorstore.bm25_index import BM25Index
+from phase4_vectorstore.compression import CompressedVectors, evaluate
+
+logger = logging.getLogger(__name__)
+
+META_FILENAME = "meta.json"
+MODEL_WEIGHTS_FILENAME = "model_weights.pt"
+
+# Rows fetched from Chroma per page while exporting
+EXPORT_PAGE_SIZE = 1000
+
+
+def _atomic_write_json(path: str, data: Dict[str, Any]) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def export_snapshot(
+    collection,
+    snapshot_dir: str,
+    index_version: str,
+    compression: Optional[str] = None,
+    pca_dims: Optional[int] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Export every vector, document and metadata of a collection.
+
+    Files for the new version are written first and ``meta.json`` is swapped
+    last, so a worker reloading mid-export always sees a complete snapshot.
+    Files of older versions are removed afterwards; workers that still map
+    them keep a valid mapping until they reload.
+
+    Args:
+        collection: Chroma collection to export
+        snapshot_dir: Snapshot directory
+        index_version: Version the files are named after
+        compression: ``none``, ``float16`` or ``int8`` to also write a
+            compressed matrix; None keeps the previous snapshot's setting
+        pca_dims: Principal components kept when compressing (0 for all);
+            None keeps the previous snapshot's setting
+
+    Returns:
+        The snapshot metadata written to ``meta.json``, or None if the
+        collection is empty and nothing was exported
+    """
+    total = collection.count()
+    if total == 0:
+        # An empty or failed crawl; keep serving the previous snapshot, if any
+        logger.warning(f"Collection is empty; not exporting a snapshot to {snapshot_dir}")
+        return None
+
+    snapshot_dir = os.path.abspath(snapshot_dir)
+    os.makedirs(snapshot_dir, exist_ok=True)
+
+    previous = (read_snapshot_meta(snapshot_dir) or {}).get("compression") or {}
+    if compression is None:
+        compression = previous.get("method", "none")
+    if pca_dims is None:
+        pca_dims = previous.get("pca_dims", 0)
+
+    ids, documents, metadatas, vectors = [], [], [], []
+    for offset in range(0, total, EXPORT_PAGE_SIZE):
+        page = collection.get(
+            include=["embeddings", "documents", "metadatas"],
+            limit=EXPORT_PAGE_SIZE,
+            offset=offset,
+        )
+        ids.extend(page["ids"])
+        documents.extend(page["documents"])
+        metadatas.extend(page["metadatas"])
+        vectors.extend(page["embeddings"])
+
+    embeddings = np.asarray(vectors, dtype=np.float32).reshape(len(ids), -1)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    embeddings /= np.maximum(norms, 1e-12)
+
+    embeddings_file = f"embeddings-{index_version}.npy"
+    chunks_file = f"chunks-{index_version}.json"
+
+    tmp_path = os.path.join(snapshot_dir, f"{embeddings_file}.tmp")
+    with open(tmp_path, "wb") as f:
+        np.save(f, embeddings)
+    os.replace(tmp_path, os.path.join(snapshot_dir, embeddings_file))
+
+    _atomic_write_json(
+        os.path.join(snapshot_dir, chunks_file),
+        {"ids": ids, "documents": documents, "metadatas": metadatas},
+    )
+
+    meta = {
+        "index_version": index_version,
+        "count": int(embeddings.shape[0]),
+        "dim": int(embeddings.shape[1]) if embeddings.size else 0,
+        "embeddings_file": embeddings_file,
+        "chunks_file": chunks_file,
+        "created_at": time.time(),
+    }
+    current_files = {embeddings_file, chunks_file}
+
+    bm25 = BM25Index.build(documents).save(snapshot_dir, index_version)
+    meta["bm25"] = bm25
+    current_files.update(bm25[key] for key in bm25 if key.endswith("_file"))
+
+    if compression != "none":
+        compressed = CompressedVectors.build(embeddings, compression, pca_dims)
+        info = compressed.save(snapshot_dir, index_version)
+        info["evaluation"] = evaluate(embeddings, compressed)
+        meta["compression"] = info
+        current_files.update((info["codes_file"], info["params_file"]))
+
+    _atomic_write_json(os.path.join(snapshot_dir, META_FILENAME), meta)
+
+    for pattern in ("embeddings-*.npy", "chunks-*.json", "codes-*.npy", "codes-*.npz", "bm25-*"):
+        for path in glob.glob(os.path.join(snapshot_dir, pattern)):
+            if os.path.basename(path) not in current_files:
+                os.remove(path)
+
+    return meta
+
+
+def export_model_weights(model, snapshot_dir: str) -> str:
+    """
+    Save a SentenceTransformer's weights for memory-mapped loading.
+
+    Returns:
+        Path of the written checkpoint
+    """
+    import torch
+
+    snapshot_dir = os.path.abspath(snapshot_dir)
+    os.makedirs(snapshot_dir, exist_ok=True)
+    path = os.path.join(snapshot_dir, MODEL_WEIGHTS_FILENAME)
+
+    state_dict = {name: tensor.contiguous() for name, tensor in model.state_dict().items()}
+    tmp_path = f"{path}.tmp"
+    torch.save(state_dict, tmp_path)
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_snapshot_meta(snapshot_dir: str) -> Optional[Dict[str, Any]]:
+    """Return the current snapshot metadata, or None if no snapshot exists."""
+    path = os.path.join(os.path.abspath(snapshot_dir), META_FILENAME)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
@@ -4,10 +4,13 @@ from phase5_updates.load_previous_state import load_previous_state, save_state
 from phase5_updates.compute_hash import compute_content_hash
 from phase5_updates.detect_changes import detect_change
 from phase4_vectorstore.create_collection import get_collection
+from phase4_vectorstore.index_version import bump_index_version
+from phase4_vectorstore.snapshot import export_snapshot
 
 URL_REGISTRY = "data/url_registry.json"
 RAW_MD_DIR = "data/raw_markdown"
 VECTOR_DB_DIR = "data/vector_db"
+SNAPSHOT_DIR = os.path.join(VECTOR_DB_DIR, "snapshot")
 COLLECTION_NAME = "aloysius_knowledge"
 
 def main():
@@ -20,6 +23,7 @@ def main():
         urls = json.load(f)
 
     collection = get_collection(VECTOR_DB_DIR, COLLECTION_NAME)
+    changed = 0
 
     for entry in urls:
         url = entry["url"]
@@ -47,12 +51,20 @@ def main():
         else:
             continue
 
+        changed += 1
+
         new_state[url] = {
             "lastmod": lastmod,
             "hash": content_hash
         }
 
     save_state(new_state)
+
+    if changed:
+        version = bump_index_version(VECTOR_DB_DIR)
+        print(f"🔖 {changed} page(s) changed, index version: {version}")
+        export_snapshot(collection, SNAPSHOT_DIR, version)
+
     print("✅ Phase 5 completed successfully.")
 
 if __name__ == "__main__":
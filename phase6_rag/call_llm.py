@@ -1,10 +1,4 @@
-import ollama
+from phase6_rag.llm_backends import OllamaBackend
 
 def call_llm(prompt: str):
-    response = ollama.chat(
-        model="llama3",
-        messages=[
-            {"role": "user", "content": prompt}
-        ]
-    )
-    return response["message"]["content"]
+    return OllamaBackend(model="llama3").generate(prompt)
@@ -0,0 +1,185 @@
+"""
+Circuit breaker and retry with jittered backoff for LLM calls.
+
+During a provider incident every call would otherwise wait for its own
+timeout. The breaker opens after consecutive failures and rejects calls
+immediately until a cool-down has passed; then a single probe call decides
+whether to close it again.
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a dependency whose circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker, safe to share across threads and
+    event loops.
+
+    Args:
+        name: Dependency name used in logs
+        failure_threshold: Consecutive failed calls that open the circuit
+        reset_timeout: Seconds the circuit stays open before a probe call
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.opened_total = 0
+        self.rejected_total = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may proceed; counts the call as rejected if not."""
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._state = HALF_OPEN
+                self._probe_in_flight = False
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.rejected_total += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != CLOSED:
+                logger.info(f"Circuit for {self.name} closed")
+            self._state = CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state == HALF_OPEN or (
+                self._state == CLOSED and self._failures >= self.failure_threshold
+            ):
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+                self.opened_total += 1
+                logger.warning(
+                    f"Circuit for {self.name} opened after {self._failures} "
+                    f"consecutive failures; retrying in {self.reset_timeout:.0f}s"
+                )
+
+    def release_probe(self) -> None:
+        """Give up a call without an outcome (e.g. cancelled by the client)."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        state = self.state
+        with self._lock:
+            return {
+                "state": state,
+                "consecutive_failures": self._failures,
+                "opened_total": self.opened_total,
+                "rejected_total": self.rejected_total,
+            }
+
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    """Full-jitter exponential backoff before retry number ``attempt`` (0-based)."""
+    return random.uniform(0.0, min(max_delay, base_delay * (2 ** attempt)))
+
+
+def call_with_retry(
+    func: Callable[[], T],
+    breaker: CircuitBreaker,
+    retries: int = 2,
+    base_delay: float = 0.25,
+    max_delay: float = 2.0,
+) -> T:
+    """
+    Call ``func`` through the breaker, retrying failures with backoff.
+
+    The breaker sees one outcome per logical call, so retries of a single
+    request do not open the circuit on their own.
+
+    Raises:
+        CircuitOpenError: If the circuit is open
+        Exception: The last error once retries are exhausted
+    """
+    if not breaker.allow():
+        raise CircuitOpenError(f"Circuit for {breaker.name} is open")
+    for attempt in range(retries + 1):
+        try:
+            result = func()
+        except Exception as e:
+            if attempt == retries:
+                breaker.record_failure()
+                raise
+            delay = backoff_delay(attempt, base_delay, max_delay)
+            logger.warning(f"{breaker.name} call failed ({e}); retrying in {delay:.2f}s")
+            time.sleep(delay)
+        else:
+            breaker.record_success()
+            return result
+
+
+async def call_with_retry_async(
+    func: Callable[[], Awaitable[T]],
+    breaker: CircuitBreaker,
+    retries: int = 2,
+    base_delay: float = 0.25,
+    max_delay: float = 2.0,
+    timeout: Optional[float] = None,
+) -> T:
+    """
+    Async variant of ``call_with_retry``; ``func`` creates a fresh awaitable
+    per attempt and each attempt is bounded by ``timeout`` seconds.
+    """
+    if not breaker.allow():
+        raise CircuitOpenError(f"Circuit for {breaker.name} is open")
+    try:
+        for attempt in range(retries + 1):
+            try:
+                result = await asyncio.wait_for(func(), timeout)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if attempt == retries:
+                    breaker.record_failure()
+                    raise
+                delay = backoff_delay(attempt, base_delay, max_delay)
+                logger.warning(f"{breaker.name} call failed ({e!r}); retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+            else:
+                breaker.record_success()
+                return result
+    except asyncio.CancelledError:
+        # The client went away; that says nothing about the provider
+        breaker.release_probe()
+        raise
@@ -0,0 +1,154 @@
+"""
+Token-budget-aware packing of retrieved chunks into the RAG prompt.
+
+Sits between retrieval and prompt building: strips markdown noise, drops
+duplicate chunks, merges overlapping chunks from the same source and keeps
+the most relevant context that fits the token budget.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+# Markdown images carry only URLs; links keep their visible text
+_IMAGE = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+_LINK = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+_BLANK_LINES = re.compile(r"\n\s*\n+")
+_SPACES = re.compile(r"[ \t]+")
+_SENTENCE_END = re.compile(r"[.!?](?=\s)")
+
+# Prompt overhead per context block ("[Context n]" header and separators)
+BLOCK_OVERHEAD_TOKENS = 6
+# Smallest truncated block worth including
+MIN_BLOCK_TOKENS = 32
+# Shortest suffix/prefix overlap treated as two pieces of the same passage
+MIN_OVERLAP_CHARS = 40
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for Gemini prompts (~4 characters per token)."""
+    return (len(text) + 3) // 4
+
+
+def clean_chunk(text: str) -> str:
+    """Remove image markup, unwrap links and collapse whitespace."""
+    text = _IMAGE.sub("", text)
+    text = _LINK.sub(r"\1", text)
+    text = _SPACES.sub(" ", text)
+    text = _BLANK_LINES.sub("\n\n", text)
+    return "\n".join(line.strip() for line in text.strip().splitlines())
+
+
+def _dedupe_key(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def _overlap_merge(first: str, second: str) -> Optional[str]:
+    """
+    Join two passages if the end of ``first`` is the start of ``second``
+    (as produced by overlapping chunking). Returns None if they do not overlap.
+    """
+    probe = second[:MIN_OVERLAP_CHARS]
+    if len(probe) < MIN_OVERLAP_CHARS:
+        return None
+    start = first.find(probe, max(0, len(first) - len(second)))
+    while start != -1:
+        if second.startswith(first[start:]):
+            return first[:start] + second
+        start = first.find(probe, start + 1)
+    return None
+
+
+def _truncate(text: str, max_tokens: int) -> str:
+    """Cut ``text`` to roughly ``max_tokens``, preferring a sentence boundary."""
+    limit = max_tokens * 4
+    if len(text) <= limit:
+        return text
+    cut = text[:limit]
+    ends = [m.end() for m in _SENTENCE_END.finditer(cut)]
+    if ends and ends[-1] > limit // 2:
+        return cut[:ends[-1]]
+    return cut.rsplit(" ", 1)[0] + " ..."
+
+
+@dataclass
+class PackedContext:
+    """Context selected for the prompt, most relevant first."""
+    chunks: List[str] = field(default_factory=list)
+    metadatas: List[dict] = field(default_factory=list)
+    tokens: int = 0
+    duplicates: int = 0
+    merged: int = 0
+    dropped: int = 0
+    truncated: int = 0
+
+
+def pack_context(chunks: List[str], metadatas: List[dict], token_budget: int) -> PackedContext:
+    """
+    Select and clean retrieved chunks to fit ``token_budget``.
+
+    Args:
+        chunks: Retrieved chunk texts, most relevant first
+        metadatas: Metadata for each chunk (``url`` identifies the source)
+        token_budget: Maximum estimated tokens of context in the prompt
+
+    Returns:
+        PackedContext with the blocks to send and packing counters
+    """
+    packed = PackedContext()
+
+    # Clean, drop duplicates and merge overlapping pieces of the same source;
+    # a merged block keeps the rank of its most relevant piece
+    blocks: List[List] = []  # [text, metadata]
+    seen = set()
+    for text, meta in zip(chunks, metadatas):
+        text = clean_chunk(text)
+        key = _dedupe_key(text)
+        if not key or key in seen:
+            packed.duplicates += 1
+            continue
+        seen.add(key)
+
+        url = (meta or {}).get("url")
+        absorbed = False
+        for block in blocks:
+            if (block[1] or {}).get("url") != url:
+                continue
+            block_key = _dedupe_key(block[0])
+            if key in block_key:
+                packed.duplicates += 1
+                absorbed = True
+            elif block_key in key:
+                block[0] = text
+                packed.duplicates += 1
+                absorbed = True
+            else:
+                merged = _overlap_merge(block[0], text) or _overlap_merge(text, block[0])
+                if merged is not None:
+                    block[0] = merged
+                    packed.merged += 1
+                    absorbed = True
+            if absorbed:
+                break
+        if not absorbed:
+            blocks.append([text, meta])
+
+    # Fill the budget in relevance order, skipping blocks that do not fit
+    remaining = token_budget
+    for text, meta in blocks:
+        cost = estimate_tokens(text) + BLOCK_OVERHEAD_TOKENS
+        if cost > remaining:
+            # Only the most relevant block is worth truncating to fit
+            available = remaining - BLOCK_OVERHEAD_TOKENS
+            if packed.chunks or available < MIN_BLOCK_TOKENS:
+                packed.dropped += 1
+                continue
+            text = _truncate(text, available)
+            cost = estimate_tokens(text) + BLOCK_OVERHEAD_TOKENS
+            packed.truncated += 1
+        packed.chunks.append(text)
+        packed.metadatas.append(meta)
+        packed.tokens += cost
+        remaining -= cost
+
+    return packed
@@ -1,6 +1,50 @@
+import logging
+import os
+import threading
+from typing import List
 from sentence_transformers import SentenceTransformer
+from config.config import config
+from phase4_vectorstore.snapshot import MODEL_WEIGHTS_FILENAME
 
-_model = SentenceTransformer("all-MiniLM-L6-v2")
+MODEL_NAME = "all-MiniLM-L6-v2"
+
+logger = logging.getLogger(__name__)
+
+_model = None
+_model_lock = threading.Lock()
+
+def _map_shared_weights(model: SentenceTransformer) -> None:
+    # Replace the private copy of the weights with tensors backed by the
+    # snapshot file, so all workers on the node share the same physical pages
+    import torch
+
+    path = os.path.join(config.serving.snapshot_dir, MODEL_WEIGHTS_FILENAME)
+    if not os.path.exists(path):
+        logger.warning(f"No shared model weights at {path}; using a private copy")
+        return
+    state_dict = torch.load(path, map_location="cpu", mmap=True, weights_only=True)
+    model.load_state_dict(state_dict, assign=True)
+    model.eval()
+    logger.info(f"Embedding model weights memory-mapped from {path}")
+
+def get_model() -> SentenceTransformer:
+    # Loaded on first use (or by the API warm-up), once per process
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                model = SentenceTransformer(MODEL_NAME)
+                if config.serving.shared_memory:
+                    _map_shared_weights(model)
+                _model = model
+    return _model
 
 def embed_query(query: str):
-    return _model.encode([query])[0]
+    return get_model().encode([query])[0]
+
+def is_model_loaded() -> bool:
+    return _model is not None
+
+def embed_queries(queries: List[str]):
+    # One forward pass for the whole batch
+    return get_model().encode(queries)
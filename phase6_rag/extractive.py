@@ -0,0 +1,211 @@
+"""
+Extractive answers built from retrieved chunks, without calling an LLM.
+
+Used when the LLM is unavailable (circuit open, retries exhausted) so users
+still get the most relevant passages from the official website, with their
+sources, in milliseconds; and as a fast path for questions the top chunk
+answers verbatim (phone numbers, fees, addresses).
+"""
+
+import logging
+import re
+import threading
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from config.config import config
+from phase6_rag.context_packer import clean_chunk
+
+logger = logging.getLogger(__name__)
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+|\n+")
+_WORD = re.compile(r"[a-z0-9]+")
+_STOPWORDS = {
+    "a", "an", "and", "are", "at", "be", "can", "do", "does", "for", "how",
+    "i", "in", "is", "it", "me", "of", "on", "or", "tell", "the", "there",
+    "to", "what", "when", "where", "which", "who", "with", "you", "your",
+}
+
+DEGRADED_PREAMBLE = (
+    "I can't generate a full answer right now, but here is the most relevant "
+    "information from the official website:"
+)
+
+
+def query_terms(text: str) -> Set[str]:
+    """Lowercased content words of a question."""
+    return {w for w in _WORD.findall(text.lower()) if w not in _STOPWORDS}
+
+
+def split_sentences(text: str) -> List[str]:
+    return [s.strip() for s in _SENTENCE_SPLIT.split(text) if s.strip()]
+
+
+def best_span(question: str, chunk: str, max_chars: int = 400) -> Tuple[str, float]:
+    """
+    The window of consecutive sentences in ``chunk`` that covers most
+    question terms, at most ``max_chars`` long (leading sentences if none
+    match).
+
+    Returns:
+        Tuple of (passage, fraction of question terms it contains)
+    """
+    sentences = split_sentences(clean_chunk(chunk))
+    if not sentences:
+        return "", 0.0
+    terms = query_terms(question)
+
+    best_start, best_end, best_score = 0, 1, -1
+    for start in range(len(sentences)):
+        covered: Set[str] = set()
+        length = 0
+        for end in range(start, len(sentences)):
+            length += len(sentences[end]) + 1
+            if length > max_chars and end > start:
+                break
+            covered |= terms & set(_WORD.findall(sentences[end].lower()))
+            if len(covered) > best_score:
+                best_start, best_end, best_score = start, end + 1, len(covered)
+
+    passage = " ".join(sentences[best_start:best_end])
+    if len(passage) > max_chars:
+        passage = passage[:max_chars].rsplit(" ", 1)[0] + " ..."
+    return passage, (best_score / len(terms) if terms else 0.0)
+
+
+def best_passage(question: str, chunk: str, max_chars: int = 400) -> str:
+    """The passage of ``best_span`` without its coverage."""
+    return best_span(question, chunk, max_chars)[0]
+
+
+def degraded_answer(
+    question: str,
+    chunks: List[str],
+    metadatas: List[dict],
+    max_passages: int = 3,
+    max_chars: int = 400,
+) -> str:
+    """
+    Build a plain answer from the top retrieved passages and their sources.
+
+    Args:
+        question: User's question
+        chunks: Retrieved chunks, most relevant first
+        metadatas: Metadata for each chunk
+        max_passages: Passages to include
+        max_chars: Maximum length of each passage
+
+    Returns:
+        Markdown answer listing the passages with their source URLs
+    """
+    lines = [DEGRADED_PREAMBLE, ""]
+    seen = set()
+    for chunk, meta in zip(chunks, metadatas):
+        passage = best_passage(question, chunk, max_chars)
+        if not passage or passage in seen:
+            continue
+        seen.add(passage)
+        url = (meta or {}).get("url")
+        lines.append(f"- {passage}" + (f" (Source: {url})" if url else ""))
+        if len(seen) >= max_passages:
+            break
+    return "\n".join(lines)
+
+
+class ExtractiveFastPath:
+    """
+    Answers a question from its nearest retrieved chunk, skipping the LLM,
+    when retrieval is confident: the nearest chunk is within
+    ``max_distance`` (cosine) of the question, ahead of the runner-up by
+    ``min_margin``, and a short span of it contains at least
+    ``min_term_coverage`` of the question's content words.
+
+    Nearness is judged by distance, not list position: hybrid search and
+    reranking reorder chunks but keep each chunk's own distance.
+    """
+
+    def __init__(
+        self,
+        max_distance: float,
+        min_margin: float,
+        min_term_coverage: float,
+        max_chars: int,
+    ):
+        self.max_distance = max_distance
+        self.min_margin = min_margin
+        self.min_term_coverage = min_term_coverage
+        self.max_chars = max_chars
+        self._lock = threading.Lock()
+        self.considered = 0
+        self.answered = 0
+
+    def try_answer(
+        self,
+        question: str,
+        chunks: List[str],
+        metadatas: List[dict],
+        distances: List[float],
+    ) -> Optional[Tuple[str, int]]:
+        """
+        Returns:
+            Tuple of (concise extractive answer with its source, index of
+            the chunk it was taken from), or None if the question should go
+            to the LLM
+        """
+        result = self._answer(question, chunks, metadatas, distances)
+        with self._lock:
+            self.considered += 1
+            if result is not None:
+                self.answered += 1
+        return result
+
+    def _answer(self, question, chunks, metadatas, distances) -> Optional[Tuple[str, int]]:
+        if not chunks or not distances:
+            return None
+        order = sorted(range(min(len(chunks), len(distances))), key=distances.__getitem__)
+        nearest = order[0]
+        if distances[nearest] > self.max_distance:
+            return None
+        if len(order) > 1 and distances[order[1]] - distances[nearest] < self.min_margin:
+            # The runner-up is about as close, so no single chunk is clearly the answer
+            return None
+        passage, coverage = best_span(question, chunks[nearest], self.max_chars)
+        if not passage or coverage < self.min_term_coverage:
+            return None
+        url = (metadatas[nearest] or {}).get("url")
+        return passage + (f"\n\nSource: {url}" if url else ""), nearest
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": True,
+                "considered": self.considered,
+                "answered": self.answered,
+                "rate": self.answered / self.considered if self.considered else 0.0,
+            }
+
+
+# Singleton instance
+_fast_path_instance: Optional[ExtractiveFastPath] = None
+_fast_path_lock = threading.Lock()
+
+
+def get_fast_path() -> Optional[ExtractiveFastPath]:
+    """Get the global extractive fast path, or None if disabled."""
+    global _fast_path_instance
+    if not config.rag.fast_path_enabled:
+        return None
+    if _fast_path_instance is None:
+        with _fast_path_lock:
+            if _fast_path_instance is None:
+                _fast_path_instance = ExtractiveFastPath(
+                    max_distance=config.rag.fast_path_max_distance,
+                    min_margin=config.rag.fast_path_min_margin,
+                    min_term_coverage=config.rag.fast_path_min_term_coverage,
+                    max_chars=config.rag.fast_path_max_chars,
+                )
+                logger.info(
+                    f"Extractive fast path enabled (max distance "
+                    f"{config.rag.fast_path_max_distance}, min coverage "
+                    f"{config.rag.fast_path_min_term_coverage})"
+                )
+    return _fast_path_instance
@@ -3,30 +3,195 @@ Google Gemini API integration for LLM calls.
 Handles all interactions with Google's Gemini models.
 """
 
+import asyncio
 import logging
-from typing import Optional
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Set, Tuple
 import google.generativeai as genai
 from config.config import config
+from phase6_rag.llm_backends import LLMBackend
 
 logger = logging.getLogger(__name__)
 
+# Distinct (system instruction, generation config) models kept per process
+MODEL_POOL_SIZE = 32
+# Cached content is replaced this many seconds before it expires
+CONTEXT_CACHE_REFRESH_MARGIN = 300
 
-class GeminiLLM:
+ModelKey = Tuple[str, Optional[str], float, int]
+
+
+class GeminiModelPool:
+    """
+    Thread-safe pool of ``GenerativeModel`` instances.
+
+    Models are keyed by (model, system instruction, temperature, max output
+    tokens) and never modified after construction, so concurrent calls share
+    them safely. With ``GEMINI_CONTEXT_CACHE`` enabled, a system instruction
+    is uploaded once as cached content and its models are built on top of
+    that cache; if the API refuses (too few tokens, unsupported model) the
+    instruction is sent inline as usual.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        max_size: int = MODEL_POOL_SIZE,
+        context_cache: bool = False,
+        context_cache_ttl_seconds: int = 3600,
+    ):
+        self.model_name = model_name
+        self.max_size = max_size
+        self.context_cache = context_cache
+        self.context_cache_ttl_seconds = context_cache_ttl_seconds
+        self._lock = threading.Lock()
+        # Builds may create cached content over the network; they are rare,
+        # so one lock keeps concurrent first calls from uploading twice
+        self._build_lock = threading.Lock()
+        # key -> (model, generation config, monotonic expiry or None)
+        self._models: "OrderedDict[ModelKey, Tuple[Any, Any, Optional[float]]]" = OrderedDict()
+        # system instruction -> (cached content, monotonic expiry)
+        self._cached_contents: Dict[str, Tuple[Any, float]] = {}
+        self._cache_refused: Set[str] = set()
+
+    def _lookup(self, key: ModelKey):
+        with self._lock:
+            entry = self._models.get(key)
+            if entry is None:
+                return None
+            if entry[2] is not None and entry[2] <= time.monotonic():
+                del self._models[key]
+                return None
+            self._models.move_to_end(key)
+            return entry
+
+    def get(
+        self, system_instruction: Optional[str], temperature: float, max_tokens: int
+    ) -> Tuple[Any, Any]:
+        """Return a (model, generation config) pair for the given settings."""
+        key = (self.model_name, system_instruction or None, temperature, max_tokens)
+        entry = self._lookup(key)
+        if entry is None:
+            with self._build_lock:
+                entry = self._lookup(key)
+                if entry is None:
+                    entry = self._build(key)
+                    with self._lock:
+                        self._models[key] = entry
+                        while len(self._models) > self.max_size:
+                            self._models.popitem(last=False)
+        return entry[0], entry[1]
+
+    def _build(self, key: ModelKey) -> Tuple[Any, Any, Optional[float]]:
+        _, system_instruction, temperature, max_tokens = key
+        generation_config = genai.types.GenerationConfig(
+            temperature=temperature,
+            max_output_tokens=max_tokens,
+        )
+
+        if system_instruction and self.context_cache:
+            cached = self._cached_content(system_instruction)
+            if cached is not None:
+                cached_content, expires_at = cached
+                model = genai.GenerativeModel.from_cached_content(
+                    cached_content, generation_config=generation_config
+                )
+                return model, generation_config, expires_at
+
+        model = genai.GenerativeModel(
+            model_name=self.model_name,
+            system_instruction=system_instruction,
+            generation_config=generation_config,
+        )
+        return model, generation_config, None
+
+    def _cached_content(self, system_instruction: str) -> Optional[Tuple[Any, float]]:
+        """Upload (or reuse) the cached content for a system instruction."""
+        cached = self._cached_contents.get(system_instruction)
+        if cached is not None and cached[1] > time.monotonic():
+            return cached
+        if system_instruction in self._cache_refused:
+            return None
+
+        try:
+            cached_content = genai.caching.CachedContent.create(
+                model=self.model_name,
+                display_name="aloysius-system-prompt",
+                system_instruction=system_instruction,
+                ttl=self.context_cache_ttl_seconds,
+            )
+        except Exception as e:
+            # Typically the instruction is below the model's minimum cacheable size
+            logger.warning(
+                f"Gemini context cache unavailable, sending system prompt inline: {e}"
+            )
+            self._cache_refused.add(system_instruction)
+            return None
+
+        expires_at = time.monotonic() + max(
+            self.context_cache_ttl_seconds - CONTEXT_CACHE_REFRESH_MARGIN,
+            self.context_cache_ttl_seconds / 2,
+        )
+        cached = (cached_content, expires_at)
+        self._cached_contents[system_instruction] = cached
+        logger.info(f"Uploaded system prompt as Gemini cached content {cached_content.name}")
+        return cached
+
+
+class GeminiLLM(LLMBackend):
     """
     Wrapper for Google Gemini API interactions.
     Handles model initialization, API calls, and error handling.
     """
 
+    name = "gemini"
+
     def __init__(self):
         """Initialize Gemini API client"""
         try:
-            genai.configure(api_key=config.gemini.api_key)
-            self.model = genai.GenerativeModel(config.gemini.model)
-            logger.info(f"Gemini API initialized with model: {config.gemini.model}")
+            client_options = (
+                {"api_endpoint": config.gemini.api_endpoint}
+                if config.gemini.api_endpoint else None
+            )
+            genai.configure(
+                api_key=config.gemini.api_key,
+                transport=config.gemini.transport,
+                client_options=client_options,
+            )
+            # The SDK's async client only speaks gRPC; with another transport
+            # the async methods run the sync client on a worker thread instead
+            self._native_async = config.gemini.transport in (None, "grpc", "grpc_asyncio")
+            self._pool = GeminiModelPool(
+                config.gemini.model,
+                context_cache=config.gemini.context_cache,
+                context_cache_ttl_seconds=config.gemini.context_cache_ttl_seconds,
+            )
+            self.model, _ = self._pool.get(
+                None, config.gemini.temperature, config.gemini.max_tokens
+            )
+            logger.info(
+                f"Gemini API initialized with model: {config.gemini.model}"
+                + (f" at {config.gemini.api_endpoint}" if config.gemini.api_endpoint else "")
+            )
         except Exception as e:
             logger.error(f"Failed to initialize Gemini API: {e}")
             raise
 
+    def _prepare_model(
+        self,
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+        system_instruction: Optional[str],
+    ):
+        """
+        Resolve the pooled model instance and generation config for a call.
+        """
+        temperature = temperature if temperature is not None else config.gemini.temperature
+        max_tokens = max_tokens if max_tokens is not None else config.gemini.max_tokens
+        return self._pool.get(system_instruction, temperature, max_tokens)
+
     def generate(
         self,
         prompt: str,
@@ -39,25 +204,10 @@ class GeminiLLM:
         """
 
         try:
-            temperature = temperature if temperature is not None else config.gemini.temperature
-            max_tokens = max_tokens if max_tokens is not None else config.gemini.max_tokens
-
-            generation_config = genai.types.GenerationConfig(
-                temperature=temperature,
-                max_output_tokens=max_tokens,
+            model, generation_config = self._prepare_model(
+                temperature, max_tokens, system_instruction
             )
 
-            # Create model WITH system instruction if provided
-            if system_instruction:
-                model = genai.GenerativeModel(
-                    model_name=config.gemini.model,
-                    system_instruction=system_instruction,
-                    generation_config=generation_config,
-                )
-            else:
-                model = self.model
-                model.generation_config = generation_config
-
             # IMPORTANT: pass generation_config here to preserve formatting
             response = model.generate_content(
                 prompt,
@@ -71,41 +221,109 @@ class GeminiLLM:
             logger.error(f"Error calling Gemini API: {e}")
             raise
 
-    def generate_with_context(
+    def generate_stream(
+        self,
+        prompt: str,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        system_instruction: Optional[str] = None,
+    ) -> Iterator[str]:
+        """
+        Generate text using Gemini API, yielding text chunks as they arrive.
+        """
+
+        try:
+            model, generation_config = self._prepare_model(
+                temperature, max_tokens, system_instruction
+            )
+
+            response = model.generate_content(
+                prompt,
+                generation_config=generation_config,
+                stream=True,
+            )
+
+            for chunk in response:
+                text = _chunk_text(chunk)
+                if text:
+                    yield text
+
+            logger.debug("Gemini API streaming call successful")
+
+        except Exception as e:
+            logger.error(f"Error streaming from Gemini API: {e}")
+            raise
+
+    async def generate_async(
         self,
-        query: str,
-        context: list[str],
-        system_instruction: str,
+        prompt: str,
         temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        system_instruction: Optional[str] = None,
     ) -> str:
         """
-        Generate response using RAG context.
+        Generate text using Gemini's async API without blocking a thread.
         """
+        if not self._native_async:
+            return await asyncio.to_thread(
+                self.generate, prompt, temperature, max_tokens, system_instruction
+            )
 
         try:
-            # Format context clearly (important for Gemini reasoning)
-            context_text = "\n\n".join(
-                [f"[Context {i+1}]\n{chunk}" for i, chunk in enumerate(context)]
+            model, generation_config = self._prepare_model(
+                temperature, max_tokens, system_instruction
+            )
+
+            response = await model.generate_content_async(
+                prompt,
+                generation_config=generation_config
             )
 
-            prompt = f"""
-RELEVANT INFORMATION:
-{context_text}
+            logger.debug("Gemini API async call successful")
+            return response.text.strip()
 
-USER QUESTION:
-{query}
+        except Exception as e:
+            logger.error(f"Error calling Gemini API: {e}")
+            raise
 
-ANSWER:
-""".strip()
+    async def generate_stream_async(
+        self,
+        prompt: str,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        system_instruction: Optional[str] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Stream text from Gemini's async API, yielding chunks as they arrive.
+        """
+        if not self._native_async:
+            chunks = self.generate_stream(prompt, temperature, max_tokens, system_instruction)
+            while True:
+                text = await asyncio.to_thread(next, chunks, None)
+                if text is None:
+                    return
+                yield text
 
-            return self.generate(
-                prompt=prompt,
-                system_instruction=system_instruction,
-                temperature=temperature,
+        try:
+            model, generation_config = self._prepare_model(
+                temperature, max_tokens, system_instruction
+            )
+
+            response = await model.generate_content_async(
+                prompt,
+                generation_config=generation_config,
+                stream=True,
             )
 
+            async for chunk in response:
+                text = _chunk_text(chunk)
+                if text:
+                    yield text
+
+            logger.debug("Gemini API async streaming call successful")
+
         except Exception as e:
-            logger.error(f"Error generating response with context: {e}")
+            logger.error(f"Error streaming from Gemini API: {e}")
             raise
 
     def health_check(self) -> bool:
@@ -119,13 +337,10 @@ ANSWER:
             return False
 
 
-# Singleton instance
-_llm_instance: Optional[GeminiLLM] = None
-
-
-def get_llm() -> GeminiLLM:
-    """Get or create the global Gemini LLM instance."""
-    global _llm_instance
-    if _llm_instance is None:
-        _llm_instance = GeminiLLM()
-    return _llm_instance
+def _chunk_text(chunk) -> str:
+    """Extract text from a streamed response chunk (empty for non-text chunks)."""
+    try:
+        return chunk.text
+    except ValueError:
+        # Chunks carrying only finish reasons / safety data have no text parts
+        return ""
@@ -0,0 +1,578 @@
+"""
+Pluggable LLM backends for the RAG pipeline.
+Defines the backend interface, a local Ollama implementation and a hedging
+wrapper that races a second request against a slow first one.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED as FUTURES_FIRST_COMPLETED
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+from concurrent.futures import wait as futures_wait
+from contextlib import suppress
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, Optional
+
+from config.config import config
+
+logger = logging.getLogger(__name__)
+
+
+class LLMBackend(ABC):
+    """
+    Interface every LLM backend implements.
+
+    Backends provide plain and streaming generation, sync and async. The
+    RAG prompt helpers below are shared and built on top of them.
+    """
+
+    name = "llm"
+
+    @abstractmethod
+    def generate(
+        self,
+        prompt: str,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        system_instruction: Optional[str] = None,
+    ) -> str:
+        """Generate a complete answer."""
+
+    @abstractmethod
+    def generate_stream(
+        self,
+        prompt: str,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        system_instruction: Optional[str] = None,
+    ) -> Iterator[str]:
+        """Yield the answer in chunks as they are generated."""
+
+    @abstractmethod
+    async def generate_async(
+        self,
+        prompt: str,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        system_instruction: Optional[str] = None,
+    ) -> str:
+        """Generate a complete answer without blocking the event loop."""
+
+    @abstractmethod
+    def generate_stream_async(
+        self,
+        prompt: str,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        system_instruction: Optional[str] = None,
+    ) -> AsyncIterator[str]:
+        """Async generator yielding the answer in chunks."""
+
+    @abstractmethod
+    def health_check(self) -> bool:
+        """Check that the backend is reachable."""
+
+    @staticmethod
+    def build_context_prompt(
+        query: str, context: list[str], history: Optional[str] = None
+    ) -> str:
+        """
+        Build the RAG prompt from the user query and retrieved context.
+        ``history`` is the (already bounded) conversation so far, if any.
+        """
+        # Format context clearly (important for Gemini reasoning)
+        context_text = "\n\n".join(
+            [f"[Context {i+1}]\n{chunk}" for i, chunk in enumerate(context)]
+        )
+
+        if history:
+            return f"""
+CONVERSATION SO FAR:
+{history}
+
+RELEVANT INFORMATION:
+{context_text}
+
+USER QUESTION (may refer to the conversation above):
+{query}
+
+ANSWER:
+""".strip()
+
+        return f"""
+RELEVANT INFORMATION:
+{context_text}
+
+USER QUESTION:
+{query}
+
+ANSWER:
+""".strip()
+
+    def generate_with_context(
+        self,
+        query: str,
+        context: list[str],
+        system_instruction: str,
+        temperature: Optional[float] = None,
+        history: Optional[str] = None,
+    ) -> str:
+        """
+        Generate response using RAG context.
+        """
+
+        try:
+            prompt = self.build_context_prompt(query, context, history)
+
+            return self.generate(
+                prompt=prompt,
+                system_instruction=system_instruction,
+                temperature=temperature,
+            )
+
+        except Exception as e:
+            logger.error(f"Error generating response with context: {e}")
+            raise
+
+    def generate_with_context_stream(
+        self,
+        query: str,
+        context: list[str],
+        system_instruction: str,
+        temperature: Optional[float] = None,
+        history: Optional[str] = None,
+    ) -> Iterator[str]:
+        """
+        Stream a response using RAG context, chunk by chunk.
+        """
+        prompt = self.build_context_prompt(query, context, history)
+
+        yield from self.generate_stream(
+            prompt=prompt,
+            system_instruction=system_instruction,
+            temperature=temperature,
+        )
+
+    async def generate_with_context_async(
+        self,
+        query: str,
+        context: list[str],
+        system_instruction: str,
+        temperature: Optional[float] = None,
+        history: Optional[str] = None,
+    ) -> str:
+        """
+        Generate response using RAG context via the async API.
+        """
+
+        try:
+            prompt = self.build_context_prompt(query, context, history)
+
+            return await self.generate_async(
+                prompt=prompt,
+                system_instruction=system_instruction,
+                temperature=temperature,
+            )
+
+        except Exception as e:
+            logger.error(f"Error generating response with context: {e}")
+            raise
+
+    async def generate_with_context_stream_async(
+        self,
+        query: str,
+        context: list[str],
+        system_instruction: str,
+        temperature: Optional[float] = None,
+        history: Optional[str] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Stream a response using RAG context via the async API.
+        """
+        prompt = self.build_context_prompt(query, context, history)
+
+        async for text in self.generate_stream_async(
+            prompt=prompt,
+            system_instruction=system_instruction,
+            temperature=temperature,
+        ):
+            yield text
+
+
+class OllamaBackend(LLMBackend):
+    """
+    Local model served by Ollama (``ollama serve``).
+    Requires the optional ``ollama`` package.
+    """
+
+    name = "ollama"
+
+    def __init__(self, model: Optional[str] = None, host: Optional[str] = None):
+        try:
+            import ollama
+        except ImportError as e:
+            raise RuntimeError(
+                "The Ollama backend needs the 'ollama' package (pip install ollama)"
+            ) from e
+
+        self.model = model or config.llm.ollama_model
+        self.host = host or config.llm.ollama_host
+        self._client = ollama.Client(host=self.host)
+        self._async_client = ollama.AsyncClient(host=self.host)
+        logger.info(f"Ollama backend initialized with model: {self.model} at {self.host}")
+
+    def _request(
+        self,
+        prompt: str,
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+        system_instruction: Optional[str],
+    ) -> Dict[str, Any]:
+        messages = []
+        if system_instruction:
+            messages.append({"role": "system", "content": system_instruction})
+        messages.append({"role": "user", "content": prompt})
+        return {
+            "model": self.model,
+            "messages": messages,
+            "options": {
+                "temperature": temperature if temperature is not None else config.gemini.temperature,
+                "num_predict": max_tokens if max_tokens is not None else config.gemini.max_tokens,
+            },
+        }
+
+    def generate(self, prompt, temperature=None, max_tokens=None, system_instruction=None) -> str:
+        try:
+            response = self._client.chat(
+                **self._request(prompt, temperature, max_tokens, system_instruction)
+            )
+            return response["message"]["content"].strip()
+        except Exception as e:
+            logger.error(f"Error calling Ollama: {e}")
+            raise
+
+    def generate_stream(self, prompt, temperature=None, max_tokens=None, system_instruction=None) -> Iterator[str]:
+        try:
+            for chunk in self._client.chat(
+                **self._request(prompt, temperature, max_tokens, system_instruction), stream=True
+            ):
+                text = chunk["message"]["content"]
+                if text:
+                    yield text
+        except Exception as e:
+            logger.error(f"Error streaming from Ollama: {e}")
+            raise
+
+    async def generate_async(self, prompt, temperature=None, max_tokens=None, system_instruction=None) -> str:
+        try:
+            response = await self._async_client.chat(
+                **self._request(prompt, temperature, max_tokens, system_instruction)
+            )
+            return response["message"]["content"].strip()
+        except Exception as e:
+            logger.error(f"Error calling Ollama: {e}")
+            raise
+
+    async def generate_stream_async(
+        self, prompt, temperature=None, max_tokens=None, system_instruction=None
+    ) -> AsyncIterator[str]:
+        try:
+            stream = await self._async_client.chat(
+                **self._request(prompt, temperature, max_tokens, system_instruction), stream=True
+            )
+            async for chunk in stream:
+                text = chunk["message"]["content"]
+                if text:
+                    yield text
+        except Exception as e:
+            logger.error(f"Error streaming from Ollama: {e}")
+            raise
+
+    def health_check(self) -> bool:
+        """Check that Ollama is up and the model is pulled."""
+        try:
+            self._client.show(self.model)
+            return True
+        except Exception as e:
+            logger.error(f"Ollama health check failed: {e}")
+            return False
+
+
+class LatencyWindow:
+    """Rolling window of recent latencies for percentile estimates."""
+
+    def __init__(self, size: int):
+        self._values: Deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float) -> None:
+        with self._lock:
+            self._values.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def percentile(self, pct: float) -> float:
+        with self._lock:
+            ordered = sorted(self._values)
+        index = min(len(ordered) - 1, int(len(ordered) * pct / 100))
+        return ordered[index]
+
+
+class HedgedLLM(LLMBackend):
+    """
+    Hedged requests over a primary and a hedge backend.
+
+    A call goes to the primary first. If it has not completed (or, when
+    streaming, produced its first chunk) by the ``percentile``-th latency of
+    the recent window, the same request is also sent to the hedge backend
+    (which may be the primary itself). The first successful response wins
+    and the other request is cancelled. Until ``min_samples`` latencies are
+    known, ``initial_delay`` is used as the deadline.
+    """
+
+    name = "hedged"
+
+    def __init__(
+        self,
+        primary: LLMBackend,
+        hedge: LLMBackend,
+        percentile: float,
+        window_size: int,
+        min_samples: int,
+        initial_delay: float,
+        min_delay: float,
+        pool_size: int = 8,
+    ):
+        self.primary = primary
+        self.hedge = hedge
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+
+        self._latency = LatencyWindow(window_size)
+        self._first_chunk = LatencyWindow(window_size)
+        # Sync hedging needs a second thread while the first call blocks
+        self._pool = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="llm-hedge")
+
+        # Guards the counters, which sync calls update from many threads
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def _deadline(self, window: LatencyWindow) -> float:
+        if len(window) < self.min_samples:
+            return self.initial_delay
+        return max(self.min_delay, window.percentile(self.percentile))
+
+    def _record(self, window: LatencyWindow, started: float) -> None:
+        # A cancelled primary contributes its elapsed time as a lower bound,
+        # so hedging does not hide the slow tail from the window
+        window.add(time.perf_counter() - started)
+
+    def generate(self, prompt, temperature=None, max_tokens=None, system_instruction=None) -> str:
+        args = (prompt, temperature, max_tokens, system_instruction)
+        with self._lock:
+            self.calls += 1
+        started = time.perf_counter()
+        primary = self._pool.submit(self.primary.generate, *args)
+        try:
+            result = primary.result(timeout=self._deadline(self._latency))
+            self._record(self._latency, started)
+            return result
+        except FuturesTimeout:
+            pass
+
+        with self._lock:
+            self.hedged += 1
+        hedge = self._pool.submit(self.hedge.generate, *args)
+        pending = {primary, hedge}
+        try:
+            error = None
+            while pending:
+                done, pending = futures_wait(pending, return_when=FUTURES_FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is None:
+                        if future is hedge:
+                            with self._lock:
+                                self.hedge_wins += 1
+                        return future.result()
+                    error = future.exception()
+            raise error
+        finally:
+            self._record(self._latency, started)
+            # A running thread cannot be interrupted; the loser's result is discarded
+            for future in pending:
+                future.cancel()
+
+    def generate_stream(self, prompt, temperature=None, max_tokens=None, system_instruction=None) -> Iterator[str]:
+        # Sync streaming is only used by tooling; it is not hedged
+        yield from self.primary.generate_stream(prompt, temperature, max_tokens, system_instruction)
+
+    async def generate_async(self, prompt, temperature=None, max_tokens=None, system_instruction=None) -> str:
+        args = (prompt, temperature, max_tokens, system_instruction)
+        with self._lock:
+            self.calls += 1
+        started = time.perf_counter()
+        primary = asyncio.ensure_future(self.primary.generate_async(*args))
+        pending = {primary}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=self._deadline(self._latency))
+            if done:
+                return primary.result()
+
+            with self._lock:
+                self.hedged += 1
+            logger.debug(f"LLM call hedged after {time.perf_counter() - started:.2f}s")
+            hedge = asyncio.ensure_future(self.hedge.generate_async(*args))
+            pending = {primary, hedge}
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            with self._lock:
+                                self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            self._record(self._latency, started)
+            # Also reached when the caller is cancelled mid-wait: no request
+            # is left running unawaited
+            for task in pending:
+                task.cancel()
+
+    async def generate_stream_async(
+        self, prompt, temperature=None, max_tokens=None, system_instruction=None
+    ) -> AsyncIterator[str]:
+        args = (prompt, temperature, max_tokens, system_instruction)
+        with self._lock:
+            self.calls += 1
+        started = time.perf_counter()
+
+        primary_stream = self.primary.generate_stream_async(*args)
+        primary_first = asyncio.ensure_future(primary_stream.__anext__())
+        streams = {primary_first: primary_stream}
+
+        winner = None
+        try:
+            # Hedge on time to first chunk, which is what the user waits for
+            done, _ = await asyncio.wait({primary_first}, timeout=self._deadline(self._first_chunk))
+            if not done:
+                with self._lock:
+                    self.hedged += 1
+                hedge_stream = self.hedge.generate_stream_async(*args)
+                hedge_first = asyncio.ensure_future(hedge_stream.__anext__())
+                streams[hedge_first] = hedge_stream
+
+            pending = set(streams)
+            error = None
+            while pending and winner is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None or isinstance(task.exception(), StopAsyncIteration):
+                        winner = task
+                        break
+                    error = task.exception()
+            if winner is None:
+                raise error
+        finally:
+            self._record(self._first_chunk, started)
+            for task in streams:
+                if task is not winner:
+                    task.cancel()
+                    with suppress(BaseException):
+                        await task
+                    await streams[task].aclose()
+
+        if len(streams) > 1 and winner is not primary_first:
+            with self._lock:
+                self.hedge_wins += 1
+
+        stream = streams[winner]
+        if isinstance(winner.exception(), StopAsyncIteration):
+            return
+        yield winner.result()
+        async for text in stream:
+            yield text
+
+    def health_check(self) -> bool:
+        healthy = self.primary.health_check()
+        if self.hedge is not self.primary:
+            healthy = self.hedge.health_check() and healthy
+        return healthy
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hedging counters and the current deadlines."""
+        with self._lock:
+            calls, hedged, hedge_wins = self.calls, self.hedged, self.hedge_wins
+        return {
+            "primary": self.primary.name,
+            "hedge": self.hedge.name,
+            "calls": calls,
+            "hedged": hedged,
+            "hedge_rate": hedged / calls if calls else 0.0,
+            "hedge_wins": hedge_wins,
+            "deadline_seconds": self._deadline(self._latency),
+            "first_chunk_deadline_seconds": self._deadline(self._first_chunk),
+        }
+
+
+def create_backend(name: str) -> LLMBackend:
+    """Instantiate a backend by name (``gemini`` or ``ollama``)."""
+    if name == "gemini":
+        from phase6_rag.gemini_llm import GeminiLLM
+        return GeminiLLM()
+    if name == "ollama":
+        return OllamaBackend()
+    raise ValueError(f"Unknown LLM backend: {name}")
+
+
+# Singleton instance
+_llm_instance: Optional[LLMBackend] = None
+_llm_lock = threading.Lock()
+
+
+def get_llm() -> LLMBackend:
+    """
+    Get or create the global LLM backend (``LLM_BACKEND``), wrapped in
+    ``HedgedLLM`` when ``LLM_HEDGE_ENABLED`` is set.
+    """
+    global _llm_instance
+    if _llm_instance is None:
+        # Warm-up and the health task may race to create it
+        with _llm_lock:
+            if _llm_instance is None:
+                primary = create_backend(config.llm.backend)
+                llm = primary
+                if config.llm.hedge_enabled:
+                    hedge_name = config.llm.hedge_backend or config.llm.backend
+                    hedge = primary if hedge_name == config.llm.backend else create_backend(hedge_name)
+                    llm = HedgedLLM(
+                        primary,
+                        hedge,
+                        percentile=config.llm.hedge_percentile,
+                        window_size=config.llm.hedge_window,
+                        min_samples=config.llm.hedge_min_samples,
+                        initial_delay=config.llm.hedge_initial_delay,
+                        min_delay=config.llm.hedge_min_delay,
+                        pool_size=config.llm.hedge_pool_size,
+                    )
+                    logger.info(
+                        f"LLM hedging enabled: {primary.name} -> {hedge.name} "
+                        f"at p{config.llm.hedge_percentile:g}"
+                    )
+                _llm_instance = llm
+    return _llm_instance
+
+
+def current_llm() -> Optional[LLMBackend]:
+    """The global LLM backend if it has been created, without creating it."""
+    return _llm_instance
@@ -0,0 +1,196 @@
+"""
+Cross-encoder reranking of retrieved chunks (``USE_RERANKING``).
+
+Retrieval over-fetches ``RERANK_CANDIDATES`` chunks; a cross-encoder scores
+every (question, chunk) pair in one batched CPU pass and the best
+``TOP_K_RESULTS`` are kept, so fewer, sharper chunks go to the LLM. Scoring
+is bounded by ``RERANK_TIME_BUDGET_MS``: past the budget the retrieval order
+is used instead, and the late scores still land in the cache for the next
+time the question is asked.
+"""
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Dict, List, Optional, Tuple
+
+from config.config import config
+
+logger = logging.getLogger(__name__)
+
+Retrieved = Tuple[List[str], List[dict], List[float]]
+
+
+def _chunk_key(chunk: str) -> str:
+    # Chunks are identified by their text, so re-chunked pages never reuse stale scores
+    return hashlib.sha1(chunk.encode("utf-8")).hexdigest()[:16]
+
+
+class CrossEncoderReranker:
+    """
+    Reorders retrieved chunks by cross-encoder relevance.
+
+    Args:
+        model_name: sentence-transformers cross-encoder
+        max_candidates: Most chunks scored per question
+        time_budget_seconds: Wait at most this long for scores
+        cache_size: (question, chunk) scores kept in the LRU cache
+        workers: Questions scored concurrently
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        max_candidates: int = 20,
+        time_budget_seconds: float = 0.15,
+        cache_size: int = 5000,
+        workers: int = 1,
+    ):
+        self.model_name = model_name
+        self.max_candidates = max_candidates
+        self.time_budget_seconds = time_budget_seconds
+        self.cache_size = cache_size
+        self._model = None
+        self._model_lock = threading.Lock()
+        self._cache: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+        self._lock = threading.Lock()
+        # One scoring thread per RAG worker, so concurrent questions do not
+        # queue behind each other and time out against the budget
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="rerank")
+
+        self.reranked = 0
+        self.fallbacks = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def get_model(self):
+        """Load the cross-encoder on first use (or by the API warm-up)."""
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    from sentence_transformers import CrossEncoder
+
+                    self._model = CrossEncoder(self.model_name, device="cpu")
+                    logger.info(f"Loaded reranker {self.model_name}")
+        return self._model
+
+    def warm_up(self) -> None:
+        """Load the model and score one pair, outside any time budget."""
+        self._score("warm up", [("warm-up", "warm up")])
+
+    def _score(self, query: str, pairs: List[Tuple[str, str]]) -> Dict[str, float]:
+        """Score uncached chunks in one batch and cache the results."""
+        model = self.get_model()
+        scores = model.predict(
+            [(query, chunk) for _, chunk in pairs],
+            batch_size=max(len(pairs), 1),
+            show_progress_bar=False,
+        )
+        scored = {key: float(score) for (key, _), score in zip(pairs, scores)}
+        with self._lock:
+            for key, score in scored.items():
+                self._cache[(query, key)] = score
+                self._cache.move_to_end((query, key))
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return scored
+
+    def rerank(
+        self,
+        question: str,
+        chunks: List[str],
+        metadatas: List[dict],
+        distances: List[float],
+        top_k: int,
+    ) -> Retrieved:
+        """
+        Keep the ``top_k`` most relevant of the first ``max_candidates``
+        chunks, or the first ``top_k`` in retrieval order if scoring does
+        not finish within the time budget.
+
+        Returns:
+            Tuple of (chunks, metadatas, distances), most relevant first
+        """
+        candidates = min(len(chunks), self.max_candidates)
+        if candidates <= 1:
+            return chunks[:top_k], metadatas[:top_k], distances[:top_k]
+
+        query = " ".join(question.lower().split())
+        keys = [_chunk_key(chunk) for chunk in chunks[:candidates]]
+        scores: Dict[str, float] = {}
+        with self._lock:
+            for key in keys:
+                score = self._cache.get((query, key))
+                if score is not None:
+                    self._cache.move_to_end((query, key))
+                    scores[key] = score
+            self.cache_hits += len(scores)
+            self.cache_misses += len(keys) - len(scores)
+
+        pending = [(key, chunk) for key, chunk in zip(keys, chunks) if key not in scores]
+        if pending:
+            future = self._executor.submit(self._score, query, pending)
+            try:
+                scores.update(future.result(timeout=self.time_budget_seconds))
+            except FutureTimeoutError:
+                # Drop the work if it has not started; otherwise let it finish into the cache
+                future.cancel()
+                with self._lock:
+                    self.fallbacks += 1
+                logger.warning(
+                    f"Reranking exceeded {self.time_budget_seconds * 1000:.0f} ms; "
+                    f"keeping retrieval order"
+                )
+                return chunks[:top_k], metadatas[:top_k], distances[:top_k]
+            except Exception as e:
+                with self._lock:
+                    self.fallbacks += 1
+                logger.error(f"Reranking failed ({e}); keeping retrieval order")
+                return chunks[:top_k], metadatas[:top_k], distances[:top_k]
+
+        order = sorted(range(candidates), key=lambda i: scores[keys[i]], reverse=True)[:top_k]
+        with self._lock:
+            self.reranked += 1
+        return (
+            [chunks[i] for i in order],
+            [metadatas[i] for i in order],
+            [distances[i] for i in order],
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.cache_hits + self.cache_misses
+            return {
+                "enabled": True,
+                "model": self.model_name,
+                "reranked": self.reranked,
+                "fallbacks": self.fallbacks,
+                "cache_entries": len(self._cache),
+                "cache_hit_rate": self.cache_hits / lookups if lookups else 0.0,
+            }
+
+
+# Singleton instance
+_reranker_instance: Optional[CrossEncoderReranker] = None
+_reranker_lock = threading.Lock()
+
+
+def get_reranker() -> Optional[CrossEncoderReranker]:
+    """Get the global reranker, or None if reranking is disabled."""
+    global _reranker_instance
+    if not config.rag.use_reranking:
+        return None
+    if _reranker_instance is None:
+        with _reranker_lock:
+            if _reranker_instance is None:
+                _reranker_instance = CrossEncoderReranker(
+                    model_name=config.rag.rerank_model,
+                    max_candidates=config.rag.rerank_candidates,
+                    time_budget_seconds=config.rag.rerank_time_budget_ms / 1000,
+                    cache_size=config.rag.rerank_cache_size,
+                    workers=config.serving.executor_workers,
+                )
+    return _reranker_instance
@@ -1,20 +1,140 @@
 import chromadb
+from chromadb.api.client import SharedSystemClient
 from chromadb.config import Settings
+import logging
 import os
+import threading
+from typing import Optional
+from config.config import config
+from phase4_vectorstore.index_version import get_index_version
+from phase6_rag.shared_index import get_shared_index
 
-VECTOR_DB_DIR = os.path.abspath("data/vector_db")
-COLLECTION_NAME = "aloysius_knowledge"
+logger = logging.getLogger(__name__)
 
-def retrieve_context(query_embedding, top_k=5):
-    client = chromadb.Client(
-        Settings(
-            persist_directory=VECTOR_DB_DIR,
-            anonymized_telemetry=False,
-            is_persistent=True
+
+class RetrievalService:
+    """
+    Process-wide handle on the persistent Chroma collection.
+
+    The client is created and the collection opened once, then reused by
+    every query from any thread. When phase 4 or 5 writes a new index
+    version, the next query reopens the collection so it sees the updated
+    index (one ``stat`` of the version marker per query).
+    """
+
+    def __init__(self, persist_dir: str, collection_name: str):
+        self.persist_dir = os.path.abspath(persist_dir)
+        self.collection_name = collection_name
+        self._lock = threading.Lock()
+        self._collection = None
+        self._index_version: Optional[str] = None
+
+    def _open(self, reopening: bool = False):
+        if reopening:
+            # Chroma caches one System (segments and in-memory HNSW index)
+            # per persist directory; without dropping it a new client would
+            # get the stale index back and miss vectors written by phase 4/5.
+            SharedSystemClient.clear_system_cache()
+        client = chromadb.Client(
+            Settings(
+                persist_directory=self.persist_dir,
+                anonymized_telemetry=False,
+                is_persistent=True
+            )
         )
-    )
+        return client.get_or_create_collection(self.collection_name)
+
+    def collection(self):
+        """The open collection, reopened first if the index version changed."""
+        version = get_index_version(self.persist_dir)
+        collection = self._collection
+        if collection is not None and version == self._index_version:
+            return collection
+
+        with self._lock:
+            if self._collection is None or self._index_version != version:
+                reopening = self._collection is not None
+                self._collection = self._open(reopening)
+                self._index_version = version
+                logger.info(
+                    f"{'Reopened' if reopening else 'Opened'} vector store "
+                    f"{self.persist_dir} at index version {version}"
+                )
+            return self._collection
+
+
+# Singleton instance
+_service_instance: Optional[RetrievalService] = None
+_service_lock = threading.Lock()
 
-    collection = client.get_or_create_collection(COLLECTION_NAME)
+
+def get_retrieval_service() -> RetrievalService:
+    """Get or create the process-wide retrieval service."""
+    global _service_instance
+    if _service_instance is None:
+        with _service_lock:
+            if _service_instance is None:
+                # Same directory the API keys its index version on
+                _service_instance = RetrievalService(
+                    config.vector_db.db_path, config.vector_db.collection_name
+                )
+    return _service_instance
+
+
+def _get_collection():
+    return get_retrieval_service().collection()
+
+def _use_flat_index() -> bool:
+    """Whether queries go to the memory-mapped snapshot instead of Chroma."""
+    return config.vector_db.retriever == "numpy" or config.serving.shared_memory
+
+def _hybrid_search(query_embeddings, query_texts, top_k):
+    """
+    Dense results fused with BM25 results over the snapshot's chunk text.
+    Dense candidates come from the configured backend.
+    """
+    candidates = max(config.rag.hybrid_candidates, top_k)
+    dense_ids = None
+    if not _use_flat_index():
+        results = _get_collection().query(
+            query_embeddings=[e.tolist() for e in query_embeddings],
+            n_results=candidates,
+            include=["distances"]
+        )
+        dense_ids = results.get("ids") or [[] for _ in query_embeddings]
+    return [
+        (documents, metadatas, [d / 2 for d in distances])
+        for documents, metadatas, distances in get_shared_index().hybrid_search(
+            query_embeddings,
+            query_texts,
+            top_k,
+            candidates=candidates,
+            rrf_k=config.rag.rrf_k,
+            dense_ids=dense_ids,
+        )
+    ]
+
+def retrieve_context(query_embedding, top_k=5, query_text=None):
+    documents, metadatas, _ = retrieve_context_scored(query_embedding, top_k, query_text)
+    return documents, metadatas
+
+def retrieve_context_scored(query_embedding, top_k=5, query_text=None):
+    """
+    Like ``retrieve_context``, plus the cosine distance of each chunk.
+
+    Query and chunk embeddings are unit vectors, so the squared L2 distance
+    reported by Chroma (and the flat snapshot index) is twice the cosine
+    distance. With ``HYBRID_SEARCH`` and a ``query_text``, results are
+    dense and BM25 matches in fused order.
+    """
+    if config.rag.hybrid_search and query_text is not None:
+        return _hybrid_search([query_embedding], [query_text], top_k)[0]
+
+    if _use_flat_index():
+        documents, metadatas, distances = get_shared_index().search([query_embedding], top_k)[0]
+        return documents, metadatas, [d / 2 for d in distances]
+
+    collection = _get_collection()
 
     results = collection.query(
         query_embeddings=[query_embedding.tolist()],
@@ -23,5 +143,49 @@ def retrieve_context(query_embedding, top_k=5):
 
     documents = results.get("documents", [[]])[0]
     metadatas = results.get("metadatas", [[]])[0]
+    distances = (results.get("distances") or [[]])[0]
 
-    return documents, metadatas
+    return documents, metadatas, [d / 2 for d in distances]
+
+def collection_count() -> int:
+    """Number of chunks in the persistent collection (0 if not built yet)."""
+    if _use_flat_index():
+        return get_shared_index().count()
+    return _get_collection().count()
+
+def retrieve_context_batch(query_embeddings, top_k=5, query_texts=None):
+    """Retrieve context for several queries with a single collection query."""
+    return [
+        (documents, metadatas)
+        for documents, metadatas, _ in retrieve_context_batch_scored(query_embeddings, top_k, query_texts)
+    ]
+
+def retrieve_context_batch_scored(query_embeddings, top_k=5, query_texts=None):
+    """Batch variant of ``retrieve_context_scored``."""
+    if len(query_embeddings) == 0:
+        return []
+
+    if config.rag.hybrid_search and query_texts is not None:
+        return _hybrid_search(query_embeddings, query_texts, top_k)
+
+    if _use_flat_index():
+        return [
+            (documents, metadatas, [d / 2 for d in distances])
+            for documents, metadatas, distances in get_shared_index().search(query_embeddings, top_k)
+        ]
+
+    collection = _get_collection()
+
+    results = collection.query(
+        query_embeddings=[e.tolist() for e in query_embeddings],
+        n_results=top_k
+    )
+
+    documents = results.get("documents") or [[] for _ in query_embeddings]
+    metadatas = results.get("metadatas") or [[] for _ in query_embeddings]
+    distances = results.get("distances") or [[] for _ in query_embeddings]
+
+    return [
+        (docs, metas, [d / 2 for d in dists])
+        for docs, metas, dists in zip(documents, metadatas, distances)
+    ]
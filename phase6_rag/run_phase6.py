@@ -1,7 +1,7 @@
 from phase6_rag.embed_query import embed_query
 from phase6_rag.retrieve_context import retrieve_context
 from phase6_rag.prompt_template import build_prompt
-from phase6_rag.gemini_llm import get_llm
+from phase6_rag.llm_backends import get_llm
 
 def main():
     print("[*] Testing RAG System with Google Gemini")
@@ -0,0 +1,296 @@
+"""
+Memory-mapped, read-only flat vector index.
+
+Searches the snapshot exported by phase 4 (see
+``phase4_vectorstore.snapshot``) with exact cosine similarity over an
+``np.load(mmap_mode="r")`` matrix: one matrix product per batch of queries
+and ``argpartition`` for the top k. For a corpus of up to tens of thousands
+of chunks this is faster than a vector database round trip
+(``RETRIEVER_BACKEND=numpy``), and the matrix pages live in the OS page
+cache, shared by every worker process on the node (``SHARED_MEMORY_MODE``).
+"""
+
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config.config import config
+from phase4_vectorstore.bm25_index import BM25Index
+from phase4_vectorstore.compression import CompressedVectors, rescore
+from phase4_vectorstore.snapshot import META_FILENAME, read_snapshot_meta
+
+logger = logging.getLogger(__name__)
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[Hashable]], k: int = 60) -> List[Hashable]:
+    """
+    Merge ranked lists by reciprocal rank fusion: an item scores
+    ``sum(1 / (k + rank))`` over the lists it appears in (rank from 1).
+
+    Returns:
+        All items, best fused score first (ties keep first-seen order)
+    """
+    scores: Dict[Hashable, float] = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, start=1):
+            scores[item] = scores.get(item, 0.0) + 1.0 / (k + rank)
+    return sorted(scores, key=scores.get, reverse=True)
+
+
+@dataclass(frozen=True)
+class _Snapshot:
+    """One loaded snapshot version; replaced whole on reload, never mutated."""
+    meta_mtime: int
+    index_version: str
+    embeddings: np.ndarray
+    compressed: Optional[CompressedVectors]
+    bm25: Optional[BM25Index]
+    ids: List[str]
+    row_by_id: Dict[str, int]
+    documents: List[str]
+    metadatas: List[dict]
+
+
+class SharedIndex:
+    """
+    Exact nearest-neighbour search over the memory-mapped snapshot.
+
+    The snapshot is reloaded when its ``meta.json`` changes (a phase 4/5
+    run exported a new index version), checked with one ``stat`` per search.
+    Distances are squared L2 between unit vectors, the same scale Chroma
+    reports for its default space.
+
+    If phase 4 also exported a compressed matrix (``--compression``), the
+    scan runs over the compressed rows and the best ``rescore_candidates``
+    per query are rescored against the full-precision rows. The BM25 index
+    exported with the snapshot backs ``hybrid_search``.
+    """
+
+    def __init__(self, snapshot_dir: str, rescore_candidates: int = 50):
+        self.snapshot_dir = os.path.abspath(snapshot_dir)
+        self.rescore_candidates = rescore_candidates
+        self._lock = threading.Lock()
+        # Swapped in with one assignment; each query reads it once, so a
+        # concurrent reload can never mix rows and chunks of two versions
+        self._snapshot: Optional[_Snapshot] = None
+
+    @property
+    def index_version(self) -> Optional[str]:
+        snapshot = self._snapshot
+        return snapshot.index_version if snapshot is not None else None
+
+    def _load_if_changed(self) -> _Snapshot:
+        """The current snapshot, reloaded first if ``meta.json`` changed."""
+        meta_path = os.path.join(self.snapshot_dir, META_FILENAME)
+        try:
+            mtime = os.stat(meta_path).st_mtime_ns
+        except FileNotFoundError:
+            raise RuntimeError(
+                f"No vector snapshot in {self.snapshot_dir}; run phase 4 first"
+            )
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.meta_mtime == mtime:
+            return snapshot
+
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None and snapshot.meta_mtime == mtime:
+                return snapshot
+            meta = read_snapshot_meta(self.snapshot_dir)
+            if meta is None:
+                raise RuntimeError(f"Unreadable vector snapshot in {self.snapshot_dir}")
+
+            embeddings = np.load(
+                os.path.join(self.snapshot_dir, meta["embeddings_file"]), mmap_mode="r"
+            )
+            with open(os.path.join(self.snapshot_dir, meta["chunks_file"]), "r", encoding="utf-8") as f:
+                chunks = json.load(f)
+            compressed = None
+            if meta.get("compression"):
+                compressed = CompressedVectors.load(self.snapshot_dir, meta["compression"])
+            bm25 = BM25Index.load(self.snapshot_dir, meta["bm25"]) if meta.get("bm25") else None
+
+            snapshot = _Snapshot(
+                meta_mtime=mtime,
+                index_version=meta["index_version"],
+                embeddings=embeddings,
+                compressed=compressed,
+                bm25=bm25,
+                ids=chunks["ids"],
+                row_by_id={chunk_id: row for row, chunk_id in enumerate(chunks["ids"])},
+                documents=chunks["documents"],
+                metadatas=chunks["metadatas"],
+            )
+            self._snapshot = snapshot
+            logger.info(
+                f"Mapped vector snapshot {snapshot.index_version}: "
+                f"{embeddings.shape[0]} vectors from {self.snapshot_dir}"
+                + (f" ({compressed.method} x {compressed.dims} dims)" if compressed else "")
+            )
+            return snapshot
+
+    def count(self) -> int:
+        return int(self._load_if_changed().embeddings.shape[0])
+
+    @property
+    def ids(self) -> List[str]:
+        """Chunk ids, in row order of the embedding matrix."""
+        return self._load_if_changed().ids
+
+    def _top_k(
+        self,
+        embeddings: np.ndarray,
+        compressed: Optional[CompressedVectors],
+        query_embeddings,
+        k: int,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        if queries.ndim == 1:
+            queries = queries[None, :]
+        queries = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+
+        k = min(k, embeddings.shape[0])
+        if k == 0:
+            empty = np.empty((len(queries), 0))
+            return empty.astype(np.int64), empty.astype(np.float32)
+
+        candidates = min(max(self.rescore_candidates, k), embeddings.shape[0])
+        if compressed is not None and candidates < embeddings.shape[0]:
+            approximate = compressed.scores(queries)
+            shortlist = np.argpartition(-approximate, candidates - 1, axis=1)[:, :candidates]
+            return rescore(embeddings, queries, shortlist, k)
+
+        similarities = queries @ embeddings.T
+        top = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(similarities, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        return (
+            np.take_along_axis(top, order, axis=1),
+            np.take_along_axis(top_scores, order, axis=1),
+        )
+
+    def top_k(self, query_embeddings, k: int, exact: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Row indices and cosine similarities of the ``k`` nearest chunks.
+
+        Args:
+            query_embeddings: (n, dim) array or list of query vectors
+            k: Number of results per query
+            exact: Scan the full-precision rows even if compressed ones exist
+
+        Returns:
+            Tuple of (n, k) arrays (indices, similarities), nearest first
+        """
+        snapshot = self._load_if_changed()
+        compressed = None if exact else snapshot.compressed
+        return self._top_k(snapshot.embeddings, compressed, query_embeddings, k)
+
+    def search(self, query_embeddings, top_k: int) -> List[Tuple[List[str], List[dict], List[float]]]:
+        """
+        Find the ``top_k`` nearest chunks for each query.
+
+        Args:
+            query_embeddings: (n, dim) array or list of query vectors
+            top_k: Number of results per query
+
+        Returns:
+            One (documents, metadatas, distances) tuple per query, nearest first
+        """
+        snapshot = self._load_if_changed()
+        documents, metadatas = snapshot.documents, snapshot.metadatas
+        indices, similarities = self._top_k(
+            snapshot.embeddings, snapshot.compressed, query_embeddings, top_k
+        )
+
+        return [
+            (
+                [documents[i] for i in rows],
+                [metadatas[i] for i in rows],
+                [float(2.0 - 2.0 * score) for score in scores],
+            )
+            for rows, scores in zip(indices, similarities)
+        ]
+
+    def hybrid_search(
+        self,
+        query_embeddings,
+        query_texts: List[str],
+        top_k: int,
+        candidates: int = 20,
+        rrf_k: int = 60,
+        dense_ids: Optional[List[List[str]]] = None,
+    ) -> List[Tuple[List[str], List[dict], List[float]]]:
+        """
+        Fuse dense and BM25 results with reciprocal rank fusion.
+
+        Args:
+            query_embeddings: (n, dim) array or list of query vectors
+            query_texts: Query text for each embedding
+            top_k: Number of fused results per query
+            candidates: Results taken from each list before fusion
+            rrf_k: Rank offset of reciprocal rank fusion
+            dense_ids: Dense results (chunk ids, best first) from another
+                backend such as Chroma; None ranks with this index
+
+        Returns:
+            One (documents, metadatas, distances) tuple per query in fused
+            order, with each chunk's distance to the query as in ``search``
+        """
+        snapshot = self._load_if_changed()
+        embeddings, compressed, bm25 = snapshot.embeddings, snapshot.compressed, snapshot.bm25
+        documents, metadatas, row_by_id = snapshot.documents, snapshot.metadatas, snapshot.row_by_id
+        if bm25 is None:
+            raise RuntimeError(
+                f"Vector snapshot in {self.snapshot_dir} has no BM25 index; re-run phase 4"
+            )
+
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        if queries.ndim == 1:
+            queries = queries[None, :]
+        queries = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+
+        candidates = max(candidates, top_k)
+        if dense_ids is None:
+            dense_rows = list(self._top_k(embeddings, compressed, queries, candidates)[0])
+        else:
+            dense_rows = [
+                [row_by_id[chunk_id] for chunk_id in ids if chunk_id in row_by_id]
+                for ids in dense_ids
+            ]
+
+        results = []
+        for query, text, dense in zip(queries, query_texts, dense_rows):
+            sparse = bm25.top_k(text, candidates)[0]
+            rows = reciprocal_rank_fusion(
+                [[int(row) for row in dense], [int(row) for row in sparse]], rrf_k
+            )[:top_k]
+            similarities = np.asarray(embeddings[np.asarray(rows, dtype=np.int64)], dtype=np.float32) @ query
+            results.append((
+                [documents[row] for row in rows],
+                [metadatas[row] for row in rows],
+                [float(2.0 - 2.0 * score) for score in similarities],
+            ))
+        return results
+
+
+# Singleton instance
+_index_instance: Optional[SharedIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_shared_index() -> SharedIndex:
+    """Get or create the process-wide memory-mapped index."""
+    global _index_instance
+    if _index_instance is None:
+        with _index_lock:
+            if _index_instance is None:
+                _index_instance = SharedIndex(
+                    config.serving.snapshot_dir,
+                    rescore_candidates=config.vector_db.rescore_candidates,
+                )
+    return _index_instance
@@ -0,0 +1,151 @@
+"""
+Admission control for the chat endpoints.
+Caps concurrent RAG executions and bounds how many requests may wait for
+a slot, so overload turns into fast 429 responses instead of timeouts.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from typing import Dict, Optional
+
+from config.config import config
+
+logger = logging.getLogger(__name__)
+
+
+class Overloaded(Exception):
+    """Raised when a request cannot be admitted."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionTicket:
+    """A held execution slot. Releasing it more than once is a no-op."""
+
+    def __init__(self, controller: "AdmissionController"):
+        self._controller = controller
+        self._admitted_at = time.monotonic()
+        self._released = False
+
+    def release(self) -> None:
+        if self._released:
+            return
+        self._released = True
+        self._controller._release(time.monotonic() - self._admitted_at)
+
+
+class AdmissionController:
+    """
+    Concurrency limiter with a bounded wait queue and a queue-time deadline.
+
+    At most ``max_concurrent`` requests execute at once. Up to ``max_queue``
+    more may wait, each for at most ``queue_timeout`` seconds. Anything
+    beyond that is rejected immediately with a Retry-After estimate derived
+    from recent service times.
+    """
+
+    def __init__(self, max_concurrent: int, max_queue: int, queue_timeout: float):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._in_flight = 0
+        self._waiting = 0
+        self._service_time_avg = 1.0
+        self._wait_times = deque(maxlen=1000)
+
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+        self.max_wait_seconds = 0.0
+
+    def _retry_after(self) -> int:
+        """Seconds until a slot is likely to be free for a new request."""
+        backlog = (self._waiting + 1) / max(self.max_concurrent, 1)
+        return max(1, math.ceil(backlog * self._service_time_avg))
+
+    async def acquire(self) -> AdmissionTicket:
+        """
+        Wait for an execution slot.
+
+        Returns:
+            Ticket that must be released when the request finishes
+
+        Raises:
+            Overloaded: If the queue is full or the queue deadline passes
+        """
+        if self._in_flight + self._waiting >= self.max_concurrent + self.max_queue:
+            self.rejected_queue_full += 1
+            raise Overloaded("Server is busy (queue full)", self._retry_after())
+
+        started = time.monotonic()
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected_timeout += 1
+            raise Overloaded("Server is busy (queue timeout)", self._retry_after())
+        finally:
+            self._waiting -= 1
+
+        waited = time.monotonic() - started
+        self._wait_times.append(waited)
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        self._in_flight += 1
+        self.admitted += 1
+        return AdmissionTicket(self)
+
+    def _release(self, service_time: float) -> None:
+        self._in_flight -= 1
+        self._semaphore.release()
+        # Exponentially weighted so Retry-After tracks current LLM latency
+        self._service_time_avg = 0.9 * self._service_time_avg + 0.1 * service_time
+
+    @property
+    def queue_depth(self) -> int:
+        return self._waiting
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def stats(self) -> Dict[str, float]:
+        """Return queue depth, in-flight count, rejections and wait times."""
+        waits = sorted(self._wait_times)
+        p95 = waits[min(len(waits) - 1, int(len(waits) * 0.95))] if waits else 0.0
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "queue_depth": self._waiting,
+            "admitted": self.admitted,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout,
+            "wait_seconds_avg": sum(waits) / len(waits) if waits else 0.0,
+            "wait_seconds_p95": p95,
+            "wait_seconds_max": self.max_wait_seconds,
+            "service_seconds_avg": self._service_time_avg,
+        }
+
+
+# Singleton instance
+_controller_instance: Optional[AdmissionController] = None
+
+
+def get_admission_controller() -> AdmissionController:
+    """Get or create the global admission controller."""
+    global _controller_instance
+    if _controller_instance is None:
+        _controller_instance = AdmissionController(
+            max_concurrent=config.serving.max_concurrent_requests,
+            max_queue=config.serving.max_queue_size,
+            queue_timeout=config.serving.queue_timeout_seconds,
+        )
+    return _controller_instance
@@ -0,0 +1,374 @@
+"""
+Exact answer cache for the RAG pipeline.
+Two tiers: an in-process LRU in front of a SQLite store (WAL mode) that is
+shared by every uvicorn worker on the host and survives restarts.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from config.config import config
+
+logger = logging.getLogger(__name__)
+
+CachedAnswer = Tuple[str, List[str], float]
+
+# Minimum seconds between TTL / row-cap sweeps of the shared store
+MAINTENANCE_INTERVAL_SECONDS = 60.0
+# Minimum seconds between write-backs of in-process hits to the shared store
+HIT_FLUSH_INTERVAL_SECONDS = 10.0
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_TRAILING_PUNCT_RE = re.compile(r"[\s?.!]+$")
+
+
+def normalize_question(question: str) -> str:
+    """
+    Normalize a question for exact matching.
+
+    Case, Unicode width, repeated whitespace and trailing punctuation do
+    not change the meaning of a question, so they are folded away.
+    """
+    text = unicodedata.normalize("NFKC", question).lower()
+    text = _WHITESPACE_RE.sub(" ", text).strip()
+    return _TRAILING_PUNCT_RE.sub("", text)
+
+
+def compute_prompt_version(*parts) -> str:
+    """Hash everything that shapes generation (prompt text, model settings)."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\x1f")
+    return digest.hexdigest()[:16]
+
+
+class AnswerCache:
+    """
+    Two-tier exact answer cache.
+
+    Keys combine the normalized question, the knowledge-base index version
+    and the prompt version, so a rebuilt index or a changed system prompt
+    never serves stale answers. The in-process tier is cleared as soon as a
+    new index version is observed; the shared store is purged of rows from
+    other index or prompt versions by the next on-disk access (``get_shared``
+    or ``put``, which the async pipeline runs off the event loop). The shared
+    store also drops expired rows and keeps at most ``max_rows``, checked at
+    most once per ``MAINTENANCE_INTERVAL_SECONDS``.
+
+    Hits served from memory are counted in process and added to the rows'
+    ``hits`` in batches (``flush_hits``), so the shared store ranks questions
+    by how often they are served, whichever tier serves them.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        memory_entries: int,
+        ttl_seconds: float,
+        max_rows: int = 50000,
+    ):
+        self.db_path = os.path.abspath(db_path)
+        self.memory_entries = memory_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_rows = max_rows
+
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, Tuple[float, CachedAnswer]]" = OrderedDict()
+        self._local = threading.local()
+        self._index_version: Optional[str] = None
+        self._prompt_version: Optional[str] = None
+        self._purge_pending = False
+        self._last_maintenance = 0.0
+        self._pending_hits: Dict[str, int] = {}
+        self._last_hit_flush = time.time()
+
+        self.memory_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return this thread's connection to the shared store."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self) -> None:
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS answers (
+                    key TEXT PRIMARY KEY,
+                    question TEXT NOT NULL,
+                    index_version TEXT NOT NULL,
+                    prompt_version TEXT NOT NULL,
+                    answer TEXT NOT NULL,
+                    sources TEXT NOT NULL,
+                    confidence REAL NOT NULL,
+                    created_at REAL NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS answers_created_at ON answers (created_at)"
+            )
+
+    @staticmethod
+    def make_key(question: str, index_version: str, prompt_version: str) -> str:
+        """Build the cache key for a question."""
+        raw = f"{normalize_question(question)}\x1f{index_version}\x1f{prompt_version}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _check_version(self, index_version: str) -> None:
+        """
+        Clear the in-process tier when the index version changes and
+        schedule a purge of the shared store (no disk I/O here).
+        """
+        with self._lock:
+            if self._index_version == index_version:
+                return
+            self._index_version = index_version
+            self._memory.clear()
+            self._purge_pending = True
+
+    def _check_prompt_version(self, prompt_version: str) -> None:
+        with self._lock:
+            if self._prompt_version != prompt_version:
+                self._prompt_version = prompt_version
+                self._purge_pending = True
+
+    def _maintain(self, conn: sqlite3.Connection) -> None:
+        """
+        Purge rows of other index/prompt versions when one changed, and
+        periodically drop expired rows and enforce the row cap.
+        """
+        now = time.time()
+        with self._lock:
+            purge = self._purge_pending
+            self._purge_pending = False
+            index_version, prompt_version = self._index_version, self._prompt_version
+            sweep = now - self._last_maintenance >= MAINTENANCE_INTERVAL_SECONDS
+            if sweep:
+                self._last_maintenance = now
+
+        if purge and index_version is not None:
+            with conn:
+                if prompt_version is None:
+                    deleted = conn.execute(
+                        "DELETE FROM answers WHERE index_version != ?", (index_version,)
+                    ).rowcount
+                else:
+                    deleted = conn.execute(
+                        "DELETE FROM answers WHERE index_version != ? OR prompt_version != ?",
+                        (index_version, prompt_version),
+                    ).rowcount
+            if deleted:
+                logger.info(
+                    f"Index version is now {index_version}, "
+                    f"purged {deleted} stale cached answers"
+                )
+
+        if self.hits_due():
+            self.flush_hits()
+
+        if sweep:
+            with conn:
+                expired = conn.execute(
+                    "DELETE FROM answers WHERE created_at < ?", (now - self.ttl_seconds,)
+                ).rowcount
+                excess = conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0] - self.max_rows
+                if excess > 0:
+                    conn.execute(
+                        """
+                        DELETE FROM answers WHERE key IN (
+                            SELECT key FROM answers ORDER BY created_at ASC LIMIT ?
+                        )
+                        """,
+                        (excess,),
+                    )
+            if expired or excess > 0:
+                logger.info(
+                    f"Answer cache maintenance: {expired} expired, "
+                    f"{max(excess, 0)} over the {self.max_rows}-row cap removed"
+                )
+
+    def _remember(self, key: str, created_at: float, value: CachedAnswer) -> None:
+        with self._lock:
+            self._memory[key] = (created_at, value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def get_local(self, key: str, index_version: str) -> Optional[CachedAnswer]:
+        """
+        Look up the in-process tier only. Never touches disk, so it is safe
+        to call on the event loop.
+        """
+        if self._index_version != index_version:
+            self._check_version(index_version)
+
+        with self._lock:
+            item = self._memory.get(key)
+            if item is None:
+                return None
+            created_at, value = item
+            if time.time() - created_at > self.ttl_seconds:
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            self._pending_hits[key] = self._pending_hits.get(key, 0) + 1
+        return value
+
+    def hits_due(self) -> bool:
+        """Whether in-process hits are waiting and the flush interval has passed."""
+        with self._lock:
+            return bool(self._pending_hits) and (
+                time.time() - self._last_hit_flush >= HIT_FLUSH_INTERVAL_SECONDS
+            )
+
+    def flush_hits(self) -> None:
+        """Add the hits served from memory to the shared store in one batch."""
+        with self._lock:
+            pending, self._pending_hits = self._pending_hits, {}
+            self._last_hit_flush = time.time()
+        if not pending:
+            return
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                "UPDATE answers SET hits = hits + ? WHERE key = ?",
+                [(count, key) for key, count in pending.items()],
+            )
+
+    def get_shared(self, key: str) -> Optional[CachedAnswer]:
+        """
+        Look up the shared on-disk tier and promote hits into memory.
+        """
+        conn = self._connect()
+        self._maintain(conn)
+        row = conn.execute(
+            "SELECT answer, sources, confidence, created_at FROM answers WHERE key = ?",
+            (key,),
+        ).fetchone()
+
+        if row is None or time.time() - row[3] > self.ttl_seconds:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with conn:
+            conn.execute("UPDATE answers SET hits = hits + 1 WHERE key = ?", (key,))
+
+        value = (row[0], json.loads(row[1]), row[2])
+        self._remember(key, row[3], value)
+        with self._lock:
+            self.shared_hits += 1
+        return value
+
+    def get(self, key: str, index_version: str) -> Optional[CachedAnswer]:
+        """Look up both tiers in order."""
+        value = self.get_local(key, index_version)
+        if value is not None:
+            if self.hits_due():
+                self.flush_hits()
+            return value
+        return self.get_shared(key)
+
+    def put(
+        self,
+        key: str,
+        question: str,
+        index_version: str,
+        prompt_version: str,
+        answer: str,
+        sources: List[str],
+        confidence: float,
+    ) -> None:
+        """Store an answer in both tiers."""
+        self._check_version(index_version)
+        self._check_prompt_version(prompt_version)
+        created_at = time.time()
+        self._remember(key, created_at, (answer, list(sources), confidence))
+
+        conn = self._connect()
+        self._maintain(conn)
+        with conn:
+            # A re-answered question keeps its hit count
+            conn.execute(
+                """
+                INSERT INTO answers
+                    (key, question, index_version, prompt_version,
+                     answer, sources, confidence, created_at, hits)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0)
+                ON CONFLICT (key) DO UPDATE SET
+                    answer = excluded.answer,
+                    sources = excluded.sources,
+                    confidence = excluded.confidence,
+                    created_at = excluded.created_at
+                """,
+                (
+                    key,
+                    normalize_question(question),
+                    index_version,
+                    prompt_version,
+                    answer,
+                    json.dumps(sources),
+                    confidence,
+                    created_at,
+                ),
+            )
+
+    def stats(self) -> Dict[str, float]:
+        """Return per-tier hit counters."""
+        with self._lock:
+            lookups = self.memory_hits + self.shared_hits + self.misses
+            hits = self.memory_hits + self.shared_hits
+            return {
+                "memory_hits": self.memory_hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "hit_ratio": hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "index_version": self._index_version,
+            }
+
+
+# Singleton instance
+_cache_instance: Optional[AnswerCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_answer_cache() -> Optional[AnswerCache]:
+    """Get or create the global answer cache (None when disabled)."""
+    global _cache_instance
+    if not config.cache.answer_enabled:
+        return None
+    if _cache_instance is None:
+        with _cache_lock:
+            if _cache_instance is None:
+                _cache_instance = AnswerCache(
+                    db_path=config.cache.answer_db_path,
+                    memory_entries=config.cache.answer_memory_entries,
+                    ttl_seconds=config.cache.answer_ttl_seconds,
+                    max_rows=config.cache.answer_max_rows,
+                )
+    return _cache_instance
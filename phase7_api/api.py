@@ -3,40 +3,152 @@ FastAPI routes for the Aloysius Chatbot.
 Implements REST endpoints for chatbot interactions and health checks.
 """
 
+import functools
+import json
 import logging
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
 from fastapi import APIRouter, HTTPException, status
-from phase7_api.schemas import ChatRequest, ChatResponse, HealthResponse
-from phase7_api.rag_service import run_rag
-from phase6_rag.gemini_llm import get_llm
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.background import BackgroundTask
+from phase7_api.schemas import (
+    BatchChatRequest,
+    BatchChatResponse,
+    BatchChatResult,
+    ChatRequest,
+    ChatResponse,
+    HealthResponse,
+)
+from phase7_api.rag_service import (
+    get_llm_breaker,
+    get_single_flight,
+    run_rag_async,
+    run_rag_batch_async,
+    run_rag_stream,
+)
+from config.config import config
+from phase7_api.admission import AdmissionTicket, Overloaded, get_admission_controller
+from phase7_api.answer_cache import get_answer_cache
+from phase7_api.faq_store import get_faq_store
+from phase7_api.health import get_health_monitor
+from phase7_api.metrics import REGISTRY, RequestTracker, render_metrics
+from phase7_api.semantic_cache import get_semantic_cache
+from phase7_api.sessions import Session, SessionStore, get_session_store
+from phase6_rag.extractive import get_fast_path
+from phase6_rag.reranker import get_reranker
+from phase6_rag.llm_backends import HedgedLLM, current_llm
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1", tags=["chat"])
 
+# Served at the root path, where Prometheus scrapers expect it
+metrics_router = APIRouter(tags=["metrics"])
+
+
+def _tracked(endpoint: str):
+    """Record request count, status, duration and in-flight for an endpoint."""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with RequestTracker(endpoint):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+async def _admit() -> AdmissionTicket:
+    """
+    Acquire an execution slot or fail fast.
+    
+    Raises:
+        HTTPException: 429 with Retry-After when the server is at capacity
+    """
+    try:
+        return await get_admission_controller().acquire()
+    except Overloaded as e:
+        logger.warning(f"Request rejected by admission control: {e.reason}")
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"{e.reason}. Please retry shortly.",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
+
+def _session_for(
+    session_id: Optional[str], start_session: bool
+) -> Tuple[Optional[Session], Optional[SessionStore]]:
+    """
+    The request's conversation session and its store. Sessions are only
+    created when the client asks for one, so stateless requests stay so.
+    """
+    sessions = get_session_store()
+    if sessions is None or not (session_id or start_session):
+        return None, sessions
+    return sessions.get_or_create(session_id), sessions
+
+
+@router.get("/live")
+def liveness_check():
+    """
+    Liveness probe: the process is up and serving requests.
+    
+    Returns:
+        Dictionary with a constant status
+    """
+    return {"status": "alive"}
+
+
+@router.get("/ready")
+def readiness_check():
+    """
+    Readiness probe: the embedder is loaded and the vector store is open
+    and non-empty. Uses only local state.
+    
+    Returns:
+        200 with component details when ready, otherwise 503
+    """
+    ready, checks = get_health_monitor().check_ready()
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"status": "ready" if ready else "not_ready", "checks": checks},
+    )
+
 
 @router.get("/health", response_model=HealthResponse)
 def health_check():
     """
-    Health check endpoint to verify service availability.
+    Deep health check to verify service availability.
+    
+    Combines local readiness with the last Gemini check, which is refreshed
+    by a background task rather than on each request.
     
     Returns:
         HealthResponse with service status
     """
     try:
-        # Check Gemini API availability
-        llm = get_llm()
-        is_healthy = llm.health_check()
+        monitor = get_health_monitor()
+        ready, ready_checks = monitor.check_ready()
+        llm = monitor.llm_status()
+        checks = {"ready": ready_checks, "llm": llm}
         
-        if is_healthy:
+        if not ready:
             return HealthResponse(
-                status="healthy",
-                message="All services operational"
+                status="unhealthy",
+                message="Knowledge base not ready",
+                checks=checks
             )
-        else:
+        if llm["healthy"]:
             return HealthResponse(
-                status="degraded",
-                message="LLM service unavailable"
+                status="healthy",
+                message="All services operational",
+                checks=checks
             )
+        return HealthResponse(
+            status="degraded",
+            message="LLM status not checked yet" if llm["healthy"] is None
+            else "LLM service unavailable",
+            checks=checks
+        )
     except Exception as e:
         logger.error(f"Health check failed: {e}")
         return HealthResponse(
@@ -46,7 +158,8 @@ def health_check():
 
 
 @router.post("/chat", response_model=ChatResponse)
-def chat(request: ChatRequest):
+@_tracked("chat")
+async def chat(request: ChatRequest):
     """
     Main chat endpoint for user queries.
     
@@ -69,15 +182,30 @@ def chat(request: ChatRequest):
                 detail="Question cannot be empty"
             )
         
-        # Run RAG pipeline
-        answer, sources, confidence = run_rag(request.question)
+        # Follow-ups are answered with the session's bounded history
+        session, sessions = _session_for(request.session_id, request.start_session)
+        history, previous_question = sessions.context(session) if session else (None, None)
+        
+        # Run RAG pipeline (within the concurrency limit)
+        ticket = await _admit()
+        try:
+            answer, sources, confidence, degraded = await run_rag_async(
+                request.question, history, previous_question
+            )
+        finally:
+            ticket.release()
+        
+        if session is not None:
+            sessions.append(session, request.question, answer)
         
         logger.info(f"Chat response generated - Confidence: {confidence:.2f}")
         
         return ChatResponse(
             answer=answer,
             sources=sources,
-            confidence=confidence
+            confidence=confidence,
+            session_id=session.session_id if session else None,
+            degraded=degraded
         )
         
     except HTTPException:
@@ -90,6 +218,310 @@ def chat(request: ChatRequest):
         )
 
 
+@router.post("/chat/batch", response_model=BatchChatResponse)
+@_tracked("chat_batch")
+async def chat_batch(request: BatchChatRequest):
+    """
+    Answer a list of questions in one request.
+    
+    Questions are embedded and retrieved together, then answered with
+    bounded concurrency. A failure on one question is reported in its own
+    result and does not fail the batch.
+    
+    Args:
+        request: BatchChatRequest containing the questions
+        
+    Returns:
+        BatchChatResponse with one result per question, in order
+        
+    Raises:
+        HTTPException: If the batch is invalid or cannot be processed
+    """
+    questions = [q.strip() for q in request.questions]
+    logger.info(f"Batch chat request received: {len(questions)} questions")
+    
+    if len(questions) > config.serving.batch_max_questions:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {config.serving.batch_max_questions} questions per batch"
+        )
+    if any(not q or len(q) > 1000 for q in questions):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Each question must be between 1 and 1000 characters"
+        )
+    
+    ticket = await _admit()
+    try:
+        outcomes = await run_rag_batch_async(questions)
+    except Exception as e:
+        logger.error(f"Error processing batch chat request: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error processing your request. Please try again."
+        )
+    finally:
+        ticket.release()
+    
+    results = []
+    for question, outcome in zip(questions, outcomes):
+        if isinstance(outcome, Exception):
+            results.append(BatchChatResult(
+                question=question,
+                error="Error processing this question. Please try again."
+            ))
+        else:
+            answer, sources, confidence, degraded = outcome
+            results.append(BatchChatResult(
+                question=question,
+                answer=answer,
+                sources=sources,
+                confidence=confidence,
+                degraded=degraded
+            ))
+    
+    return BatchChatResponse(results=results)
+
+
+def _format_sse(event: Dict[str, Any]) -> str:
+    """Serialize an event dictionary as a Server-Sent Events frame."""
+    return f"event: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+
+
+async def _stream_events(
+    question: str,
+    ticket: AdmissionTicket,
+    tracker: RequestTracker,
+    session_id: Optional[str] = None,
+    start_session: bool = False,
+) -> AsyncIterator[str]:
+    """Run the streaming pipeline and convert its events to SSE frames."""
+    stream_status = status.HTTP_200_OK
+    session, sessions = _session_for(session_id, start_session)
+    history, previous_question = sessions.context(session) if session else (None, None)
+    parts = []
+    try:
+        async for event in run_rag_stream(question, history, previous_question):
+            if event["event"] == "meta" and session is not None:
+                event["data"]["session_id"] = session.session_id
+            elif event["event"] == "token":
+                parts.append(event["data"]["text"])
+            elif event["event"] == "done" and session is not None:
+                sessions.append(session, question, "".join(parts).strip())
+            yield _format_sse(event)
+    except Exception as e:
+        # Headers are already sent, so report the failure in-band
+        logger.error(f"Error processing streaming chat request: {e}", exc_info=True)
+        stream_status = status.HTTP_500_INTERNAL_SERVER_ERROR
+        yield _format_sse({
+            "event": "error",
+            "data": {"detail": "Error processing your request. Please try again."}
+        })
+    finally:
+        ticket.release()
+        tracker.finish(stream_status)
+
+
+@router.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Streaming chat endpoint using Server-Sent Events.
+    
+    Emits a ``meta`` event with sources, confidence and the session id as
+    soon as retrieval finishes, then ``token`` events as Gemini generates the answer, and a
+    final ``done`` event (or ``error`` if generation fails mid-stream).
+    
+    Args:
+        request: ChatRequest containing the user's question
+        
+    Returns:
+        StreamingResponse with ``text/event-stream`` content
+    """
+    logger.info(f"Streaming chat request received: {request.question[:100]}...")
+    
+    # Finished by the stream generator, or here if the stream never starts
+    tracker = RequestTracker("chat_stream")
+    
+    if not request.question or len(request.question.strip()) == 0:
+        tracker.finish(status.HTTP_400_BAD_REQUEST)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Question cannot be empty"
+        )
+    
+    # The slot is held for the whole stream; the background task covers
+    # streams that end before the generator ever runs
+    try:
+        ticket = await _admit()
+    except HTTPException as e:
+        tracker.finish(e.status_code)
+        raise
+    
+    def release():
+        ticket.release()
+        tracker.finish(status.HTTP_200_OK)
+    
+    return StreamingResponse(
+        _stream_events(
+            request.question, ticket, tracker, request.session_id, request.start_session
+        ),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        },
+        background=BackgroundTask(release),
+    )
+
+
+@router.get("/stats")
+def get_stats():
+    """
+    Get runtime statistics for the serving layer.
+    
+    Returns:
+        Dictionary with cache hit/miss counters, occupancy, request
+        coalescing counters, admission queue state, session counts,
+        LLM hedging counters, the LLM circuit breaker state, extractive
+        fast path usage, FAQ store hits and reranker fallbacks
+    """
+    answer_cache = get_answer_cache()
+    semantic_cache = get_semantic_cache()
+    sessions = get_session_store()
+    fast_path = get_fast_path()
+    faq_store = get_faq_store()
+    reranker = get_reranker()
+    return {
+        "answer_cache": answer_cache.stats() if answer_cache else {"enabled": False},
+        "semantic_cache": semantic_cache.stats() if semantic_cache else {"enabled": False},
+        "coalescing": get_single_flight().stats(),
+        "admission": get_admission_controller().stats(),
+        "sessions": sessions.stats() if sessions else {"enabled": False},
+        "llm_hedging": _hedging_stats() or {"enabled": False},
+        "llm_breaker": get_llm_breaker().stats(),
+        "fast_path": fast_path.stats() if fast_path else {"enabled": False},
+        "faq": faq_store.stats() if faq_store else {"enabled": False},
+        "reranker": reranker.stats() if reranker else {"enabled": False},
+    }
+
+
+def _hedging_stats():
+    """Hedging counters if the LLM backend is hedged and already created."""
+    llm = current_llm()
+    return llm.stats() if isinstance(llm, HedgedLLM) else None
+
+
+def _collect_serving_stats():
+    """Expose cache, coalescing and admission statistics as gauges."""
+    metrics = []
+    
+    for name, cache in (("answer", get_answer_cache()), ("semantic", get_semantic_cache())):
+        if cache is None:
+            continue
+        stats = cache.stats()
+        metrics.append((
+            f"rag_{name}_cache_hit_ratio",
+            f"Hit ratio of the {name} cache since start.",
+            "gauge",
+            [({}, stats["hit_ratio"])],
+        ))
+    
+    coalescing = get_single_flight().stats()
+    metrics.append((
+        "rag_coalesced_requests",
+        "Requests served by joining an identical in-flight execution.",
+        "gauge",
+        [({}, coalescing["coalesced"])],
+    ))
+    
+    admission = get_admission_controller().stats()
+    metrics.append((
+        "admission_queue_depth",
+        "Requests waiting for an execution slot.",
+        "gauge",
+        [({}, admission["queue_depth"])],
+    ))
+    metrics.append((
+        "admission_rejected",
+        "Requests rejected by admission control since start.",
+        "gauge",
+        [
+            ({"reason": "queue_full"}, admission["rejected_queue_full"]),
+            ({"reason": "queue_timeout"}, admission["rejected_timeout"]),
+        ],
+    ))
+    
+    hedging = _hedging_stats()
+    if hedging is not None:
+        metrics.append((
+            "llm_hedged_requests",
+            "LLM calls that fired a hedge request, and how many the hedge won.",
+            "gauge",
+            [
+                ({"outcome": "hedged"}, hedging["hedged"]),
+                ({"outcome": "hedge_won"}, hedging["hedge_wins"]),
+            ],
+        ))
+        metrics.append((
+            "llm_hedge_deadline_seconds",
+            "Current latency deadline after which a hedge request is sent.",
+            "gauge",
+            [({}, hedging["deadline_seconds"])],
+        ))
+    
+    fast_path = get_fast_path()
+    if fast_path is not None:
+        metrics.append((
+            "rag_fast_path_ratio",
+            "Share of retrieved questions answered by the extractive fast path.",
+            "gauge",
+            [({}, fast_path.stats()["rate"])],
+        ))
+    
+    reranker = get_reranker()
+    if reranker is not None:
+        metrics.append((
+            "rag_rerank_fallbacks",
+            "Reranks that kept retrieval order (time budget exceeded or error) since start.",
+            "gauge",
+            [({}, reranker.stats()["fallbacks"])],
+        ))
+    
+    breaker = get_llm_breaker().stats()
+    metrics.append((
+        "llm_circuit_open",
+        "1 while the LLM circuit breaker is open or probing, else 0.",
+        "gauge",
+        [({}, 0 if breaker["state"] == "closed" else 1)],
+    ))
+    metrics.append((
+        "llm_circuit_rejected",
+        "LLM calls rejected by the open circuit since start.",
+        "gauge",
+        [({}, breaker["rejected_total"])],
+    ))
+    
+    return metrics
+
+
+REGISTRY.register_collector(_collect_serving_stats)
+
+
+@metrics_router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """
+    Prometheus scrape endpoint (text exposition format).
+    
+    Returns:
+        Per-stage latency histograms, request counters by status,
+        in-flight gauges, retrieved-chunk counts and cache hit ratios
+    """
+    return PlainTextResponse(
+        render_metrics(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
 @router.get("/info")
 def get_info():
     """
@@ -110,8 +542,14 @@ def get_info():
             "Provide general university information"
         ],
         "endpoints": [
-            "/api/v1/health - Health check",
+            "/api/v1/live - Liveness probe",
+            "/api/v1/ready - Readiness probe",
+            "/api/v1/health - Health check (cached LLM status)",
             "/api/v1/chat - Send a question",
-            "/api/v1/info - This endpoint"
+            "/api/v1/chat/stream - Send a question, stream the answer (SSE)",
+            "/api/v1/chat/batch - Send a list of questions",
+            "/api/v1/stats - Serving statistics",
+            "/api/v1/info - This endpoint",
+            "/metrics - Prometheus metrics"
         ]
     }
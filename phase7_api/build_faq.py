@@ -0,0 +1,148 @@
+"""
+Build the FAQ answer store (run after phase 4, and after phase 5 updates).
+
+Collects frequent questions from the curated list in
+``data/faq_questions.json`` and the most frequently served questions in the
+shared answer cache, answers each one offline with the full RAG pipeline,
+and writes the answers with their sources and the current index version to
+``FAQ_DIR`` (see ``phase7_api.faq_store``).
+
+    python -m phase7_api.build_faq
+    python -m phase7_api.build_faq --mine 300 --min-hits 3
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sqlite3
+from typing import Any, Dict, List
+
+from config.config import config
+from phase7_api.answer_cache import normalize_question
+
+CURATED_PATH = "data/faq_questions.json"
+
+# Questions embedded, retrieved and answered together
+BUILD_BATCH_SIZE = 32
+
+
+def load_curated(path: str) -> List[str]:
+    """Curated questions (a JSON list of strings); empty if the file is missing."""
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [q.strip() for q in json.load(f) if q.strip()]
+
+
+def mine_answer_cache(db_path: str, limit: int, min_hits: int) -> List[str]:
+    """
+    Most frequently served questions in the shared answer cache.
+
+    ``hits`` counts answers served from either cache tier (in-process hits
+    are written back in batches), summed over prompt versions; questions
+    are stored normalized.
+    """
+    if limit <= 0 or not os.path.exists(db_path):
+        return []
+    conn = sqlite3.connect(f"file:{os.path.abspath(db_path)}?mode=ro", uri=True)
+    try:
+        rows = conn.execute(
+            """
+            SELECT question, SUM(hits) AS total FROM answers
+            GROUP BY question HAVING total >= ?
+            ORDER BY total DESC LIMIT ?
+            """,
+            (min_hits, limit),
+        ).fetchall()
+    except sqlite3.Error as e:
+        print(f"⚠️ Could not read answer cache {db_path}: {e}")
+        return []
+    finally:
+        conn.close()
+    return [row[0] for row in rows]
+
+
+def collect_questions(curated: List[str], mined: List[str], max_questions: int) -> List[str]:
+    """Curated questions first, then mined ones, without normalized duplicates."""
+    seen = set()
+    questions = []
+    for question in curated + mined:
+        key = normalize_question(question)
+        if key and key not in seen:
+            seen.add(key)
+            questions.append(question)
+    return questions[:max_questions]
+
+
+async def answer_questions(questions: List[str]) -> List[Dict[str, Any]]:
+    """Answer questions with the RAG pipeline, keeping only grounded answers."""
+    from phase7_api.rag_service import NO_CONTEXT_ANSWER, run_rag_batch_async
+
+    entries = []
+    for start in range(0, len(questions), BUILD_BATCH_SIZE):
+        batch = questions[start:start + BUILD_BATCH_SIZE]
+        outcomes = await run_rag_batch_async(batch)
+        for question, outcome in zip(batch, outcomes):
+            if isinstance(outcome, Exception):
+                print(f"   ✖ {question}: {outcome}")
+                continue
+            answer, sources, confidence, degraded = outcome
+            if degraded or answer == NO_CONTEXT_ANSWER:
+                print(f"   ✖ {question}: no generated answer")
+                continue
+            entries.append({
+                "question": question,
+                "answer": answer,
+                "sources": sources,
+                "confidence": confidence,
+            })
+        print(f"   ✔ Answered {min(start + BUILD_BATCH_SIZE, len(questions))}/{len(questions)}")
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the precomputed FAQ answer store")
+    parser.add_argument("--questions", default=CURATED_PATH, help="Curated questions (JSON list)")
+    parser.add_argument("--mine", type=int, default=200,
+                        help="Most-hit answer cache questions to add (0 to disable)")
+    parser.add_argument("--min-hits", type=int, default=2,
+                        help="Minimum answer cache hits for a mined question")
+    parser.add_argument("--max-questions", type=int, default=500)
+    args = parser.parse_args()
+
+    # Answers must come from the pipeline itself, not from earlier answers
+    config.cache.answer_enabled = False
+    config.cache.semantic_enabled = False
+    config.cache.faq_enabled = False
+
+    from phase4_vectorstore.index_version import get_index_version
+    from phase6_rag.embed_query import embed_queries
+    from phase7_api.faq_store import write_faq_store
+    from phase7_api.rag_service import PROMPT_VERSION
+
+    print("🔹 Collecting questions...")
+    curated = load_curated(args.questions)
+    mined = mine_answer_cache(config.cache.answer_db_path, args.mine, args.min_hits)
+    questions = collect_questions(curated, mined, args.max_questions)
+    print(f"   {len(curated)} curated, {len(mined)} mined, {len(questions)} unique")
+    if not questions:
+        print("⚠️ No questions to answer")
+        return
+
+    index_version = get_index_version(config.vector_db.db_path)
+    print(f"🔹 Answering with the RAG pipeline (index version {index_version})...")
+    entries = asyncio.run(answer_questions(questions))
+    if not entries:
+        print("⚠️ No answers generated, keeping the existing FAQ store")
+        return
+
+    print("🔹 Embedding questions and writing the store...")
+    embeddings = embed_queries([entry["question"] for entry in entries])
+    write_faq_store(config.cache.faq_dir, entries, embeddings, index_version, PROMPT_VERSION)
+
+    print(f"✅ FAQ store built: {len(entries)} answers -> {os.path.abspath(config.cache.faq_dir)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Single-flight request coalescing for the async RAG pipeline.
+Concurrent calls with the same key share one in-flight execution.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Deduplicate concurrent async calls by key.
+
+    The first caller for a key (the leader) starts the work as its own task;
+    callers arriving while it runs await the same task instead of starting
+    another one. The task is shielded, so a leader whose client disconnects
+    does not cancel the work for everyone else.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def run(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run ``func`` for ``key``, or join the execution already in flight.
+
+        Args:
+            key: Identity of the work (e.g. the normalized question)
+            func: Zero-argument coroutine function performing the work
+
+        Returns:
+            The result of the shared execution (exceptions propagate to all)
+        """
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            logger.debug(f"Coalesced request onto in-flight execution: {key[:80]}")
+        else:
+            self.leaders += 1
+            task = asyncio.ensure_future(func())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, k=key: self._finish(k, t))
+
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception as retrieved even if every waiter went away
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, float]:
+        """Return leader/coalesced counters and the current in-flight count."""
+        total = self.leaders + self.coalesced
+        return {
+            "executions": self.leaders,
+            "coalesced": self.coalesced,
+            "coalesced_ratio": self.coalesced / total if total else 0.0,
+            "in_flight": len(self._inflight),
+        }
@@ -0,0 +1,256 @@
+"""
+Precomputed answers to frequent questions.
+
+Built offline after phase 4 by ``python -m phase7_api.build_faq``, which runs
+the full RAG pipeline for curated and mined questions. At serve time a
+question is matched against the store by normalized text, or by embedding
+similarity to a stored question, before any cache or LLM is consulted.
+Answers are only served for the index and prompt version they were built
+with.
+
+Layout of the store directory::
+
+    faq.json                     index/prompt version and entries, written last
+    questions-<version>.npy      (count, dim) float32, L2-normalized question embeddings
+"""
+
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config.config import config
+from phase7_api.answer_cache import normalize_question
+
+logger = logging.getLogger(__name__)
+
+STORE_FILENAME = "faq.json"
+
+CachedAnswer = Tuple[str, List[str], float]
+
+
+def write_faq_store(
+    store_dir: str,
+    entries: List[Dict[str, Any]],
+    embeddings: np.ndarray,
+    index_version: str,
+    prompt_version: str,
+) -> Dict[str, Any]:
+    """
+    Write a new FAQ store, replacing the previous one atomically.
+
+    Args:
+        store_dir: Store directory
+        entries: Dicts with ``question``, ``answer``, ``sources`` and ``confidence``
+        embeddings: One question embedding per entry
+        index_version: Index version the answers were generated from
+        prompt_version: Prompt version the answers were generated with
+
+    Returns:
+        The metadata written to ``faq.json`` (without the entries)
+    """
+    store_dir = os.path.abspath(store_dir)
+    os.makedirs(store_dir, exist_ok=True)
+
+    vectors = np.asarray(embeddings, dtype=np.float32).reshape(len(entries), -1)
+    vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+    embeddings_file = f"questions-{index_version}.npy"
+    tmp_path = os.path.join(store_dir, f"{embeddings_file}.tmp")
+    with open(tmp_path, "wb") as f:
+        np.save(f, vectors)
+    os.replace(tmp_path, os.path.join(store_dir, embeddings_file))
+
+    meta = {
+        "index_version": index_version,
+        "prompt_version": prompt_version,
+        "count": len(entries),
+        "embeddings_file": embeddings_file,
+        "created_at": time.time(),
+    }
+    path = os.path.join(store_dir, STORE_FILENAME)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump({**meta, "entries": entries}, f, ensure_ascii=False)
+    os.replace(f"{path}.tmp", path)
+
+    for old in glob.glob(os.path.join(store_dir, "questions-*.npy")):
+        if os.path.basename(old) != embeddings_file:
+            os.remove(old)
+
+    return meta
+
+
+@dataclass(frozen=True)
+class _Store:
+    """One loaded version of the store; replaced whole on reload, never mutated."""
+    mtime: int
+    versions: Tuple[str, str]
+    by_question: Dict[str, CachedAnswer]
+    answers: List[CachedAnswer]
+    vectors: np.ndarray
+
+
+class FAQStore:
+    """
+    Read side of the FAQ store.
+
+    The store is reloaded when ``faq.json`` changes (checked with one
+    ``stat`` per lookup). Lookups return nothing while the store was built
+    for another index or prompt version. Each lookup reads one loaded
+    version, so a concurrent reload never pairs vectors and answers of two.
+    """
+
+    def __init__(self, store_dir: str, max_distance: float):
+        self.store_dir = os.path.abspath(store_dir)
+        self.max_distance = max_distance
+        self._lock = threading.Lock()
+        self._store: Optional[_Store] = None
+
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+
+    def _path(self) -> str:
+        return os.path.join(self.store_dir, STORE_FILENAME)
+
+    def is_stale(self) -> bool:
+        """Whether ``faq.json`` changed since it was last loaded (one ``stat``)."""
+        try:
+            mtime = os.stat(self._path()).st_mtime_ns
+        except FileNotFoundError:
+            return False
+        store = self._store
+        return store is None or store.mtime != mtime
+
+    def refresh(self) -> None:
+        """Reload the store if it changed; blocking (file reads)."""
+        self._load_if_changed()
+
+    def _load_if_changed(self) -> Optional[_Store]:
+        """The current store, reloaded on change; None if there is no usable store."""
+        path = self._path()
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        store = self._store
+        if store is not None and store.mtime == mtime:
+            return store
+
+        with self._lock:
+            store = self._store
+            if store is not None and store.mtime == mtime:
+                return store
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                vectors = np.load(os.path.join(self.store_dir, data["embeddings_file"]))
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Could not load FAQ store from {self.store_dir}: {e}")
+                return None
+
+            answers = [
+                (entry["answer"], entry["sources"], entry["confidence"])
+                for entry in data["entries"]
+            ]
+            store = _Store(
+                mtime=mtime,
+                versions=(data["index_version"], data["prompt_version"]),
+                by_question={
+                    normalize_question(entry["question"]): answer
+                    for entry, answer in zip(data["entries"], answers)
+                },
+                answers=answers,
+                vectors=vectors,
+            )
+            self._store = store
+            logger.info(
+                f"Loaded {len(answers)} FAQ answers built for index version "
+                f"{data['index_version']}"
+            )
+        return store
+
+    def _usable(self, index_version: str, prompt_version: str, reload: bool) -> Optional[_Store]:
+        if reload:
+            store = self._load_if_changed()
+        else:
+            # The caller refreshed the store off the event loop beforehand
+            store = self._store if os.path.exists(self._path()) else None
+        if store is None or store.versions != (index_version, prompt_version):
+            return None
+        return store
+
+    def lookup_exact(
+        self, question: str, index_version: str, prompt_version: str, reload: bool = True
+    ) -> Optional[CachedAnswer]:
+        """
+        Answer for a stored question with the same normalized text.
+        With ``reload=False`` a changed store is not reloaded (see ``refresh``).
+        """
+        store = self._usable(index_version, prompt_version, reload)
+        if store is None:
+            return None
+        answer = store.by_question.get(normalize_question(question))
+        if answer is not None:
+            with self._lock:
+                self.exact_hits += 1
+        return answer
+
+    def lookup_similar(
+        self, query_embedding, index_version: str, prompt_version: str, reload: bool = True
+    ) -> Optional[CachedAnswer]:
+        """Answer for the closest stored question within ``max_distance`` (cosine)."""
+        store = self._usable(index_version, prompt_version, reload)
+        if store is None or not len(store.answers):
+            return None
+
+        query = np.asarray(query_embedding, dtype=np.float32).ravel()
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+        similarities = store.vectors @ query
+        best = int(np.argmax(similarities))
+        distance = 1.0 - float(similarities[best])
+
+        with self._lock:
+            if distance > self.max_distance:
+                self.misses += 1
+                return None
+            self.similar_hits += 1
+        logger.info(f"FAQ hit by similarity (distance={distance:.3f})")
+        return store.answers[best]
+
+    def stats(self) -> Dict[str, Any]:
+        store = self._store
+        with self._lock:
+            return {
+                "entries": len(store.answers) if store else 0,
+                "index_version": store.versions[0] if store else None,
+                "exact_hits": self.exact_hits,
+                "similar_hits": self.similar_hits,
+                "misses": self.misses,
+            }
+
+
+# Singleton instance
+_store_instance: Optional[FAQStore] = None
+_store_lock = threading.Lock()
+
+
+def get_faq_store() -> Optional[FAQStore]:
+    """Get or create the global FAQ store (None when disabled)."""
+    global _store_instance
+    if not config.cache.faq_enabled:
+        return None
+    if _store_instance is None:
+        with _store_lock:
+            if _store_instance is None:
+                _store_instance = FAQStore(
+                    store_dir=config.cache.faq_dir,
+                    max_distance=config.cache.faq_max_distance,
+                )
+    return _store_instance
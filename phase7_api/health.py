@@ -0,0 +1,155 @@
+"""
+Liveness, readiness and deep health checks for the Aloysius Chatbot API.
+Probe endpoints only read local state; the Gemini check runs in the
+background and its last result is served with a timestamp.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from config.config import config
+from phase6_rag.embed_query import is_model_loaded
+from phase6_rag.llm_backends import get_llm
+from phase6_rag.retrieve_context import collection_count
+
+logger = logging.getLogger(__name__)
+
+
+class HealthMonitor:
+    """
+    Tracks component health for the probe endpoints.
+
+    Readiness (embedder loaded, collection non-empty) is cached for
+    ``ready_cache_seconds`` so probe cost stays constant regardless of how
+    often the load balancer polls. The LLM status is refreshed only by the
+    background loop, never by a probe.
+    """
+
+    def __init__(self, ready_cache_seconds: float, llm_check_interval: float):
+        self.ready_cache_seconds = ready_cache_seconds
+        self.llm_check_interval = llm_check_interval
+
+        self._lock = threading.Lock()
+        self._ready_checked_at = 0.0
+        self._ready_result: Tuple[bool, Dict[str, Any]] = (False, {})
+
+        self.warmed_up = False
+        self.warmup_error: Optional[str] = None
+
+        self.llm_healthy: Optional[bool] = None
+        self.llm_checked_at: Optional[float] = None
+        self.llm_error: Optional[str] = None
+
+    def check_ready(self) -> Tuple[bool, Dict[str, Any]]:
+        """
+        Check that the service can answer questions.
+
+        Returns:
+            Tuple of (ready, per-component details)
+        """
+        now = time.monotonic()
+        with self._lock:
+            if now - self._ready_checked_at < self.ready_cache_seconds:
+                return self._ready_result
+
+        checks: Dict[str, Any] = {
+            "warmed_up": self.warmed_up,
+            "embedder_loaded": is_model_loaded(),
+        }
+        if self.warmup_error:
+            checks["warmup_error"] = self.warmup_error
+        try:
+            count = collection_count()
+            checks["vector_store_open"] = True
+            checks["vector_count"] = count
+        except Exception as e:
+            logger.error(f"Readiness check could not open vector store: {e}")
+            checks["vector_store_open"] = False
+            checks["vector_count"] = 0
+
+        ready = (
+            checks["warmed_up"]
+            and checks["embedder_loaded"]
+            and checks["vector_store_open"]
+            and checks["vector_count"] > 0
+        )
+
+        with self._lock:
+            self._ready_checked_at = now
+            self._ready_result = (ready, checks)
+        return ready, checks
+
+    async def run_warm_up(self, warm_up: Callable[[], None], retry_seconds: float = 10.0) -> None:
+        """
+        Run the pipeline warm-up off the event loop, retrying until it
+        succeeds. Readiness stays false until then.
+        """
+        while True:
+            started = time.monotonic()
+            try:
+                await asyncio.to_thread(warm_up)
+            except Exception as e:
+                self.warmup_error = str(e)
+                logger.error(f"Warm-up failed, retrying in {retry_seconds:.0f}s: {e}")
+                await asyncio.sleep(retry_seconds)
+                continue
+
+            self.warmup_error = None
+            self.warmed_up = True
+            with self._lock:
+                # Do not serve a not-ready result cached during warm-up
+                self._ready_checked_at = 0.0
+            logger.info(f"Warm-up completed in {time.monotonic() - started:.2f}s")
+            return
+
+    def refresh_llm(self) -> bool:
+        """Run the (quota-consuming) Gemini check and record the result."""
+        try:
+            healthy = get_llm().health_check()
+            error = None if healthy else "LLM health check returned no text"
+        except Exception as e:
+            healthy = False
+            error = str(e)
+
+        self.llm_healthy = healthy
+        self.llm_error = error
+        self.llm_checked_at = time.time()
+        return healthy
+
+    async def run_llm_refresh_loop(self) -> None:
+        """Refresh the LLM status every ``llm_check_interval`` seconds."""
+        while True:
+            await asyncio.to_thread(self.refresh_llm)
+            await asyncio.sleep(self.llm_check_interval)
+
+    def llm_status(self) -> Dict[str, Any]:
+        """Last recorded LLM status with its age."""
+        age = (
+            round(time.time() - self.llm_checked_at, 1)
+            if self.llm_checked_at is not None
+            else None
+        )
+        return {
+            "healthy": self.llm_healthy,
+            "checked_at": self.llm_checked_at,
+            "age_seconds": age,
+            "error": self.llm_error,
+        }
+
+
+# Singleton instance
+_monitor_instance: Optional[HealthMonitor] = None
+
+
+def get_health_monitor() -> HealthMonitor:
+    """Get or create the global health monitor."""
+    global _monitor_instance
+    if _monitor_instance is None:
+        _monitor_instance = HealthMonitor(
+            ready_cache_seconds=config.serving.ready_cache_seconds,
+            llm_check_interval=config.serving.llm_health_interval,
+        )
+    return _monitor_instance
@@ -3,10 +3,16 @@ Main entry point for the Aloysius Chatbot API.
 Initializes FastAPI application with all middleware and routes.
 """
 
+import asyncio
 import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from phase7_api.api import router
+from phase7_api.answer_cache import get_answer_cache
+from phase7_api.api import metrics_router, router
+from phase7_api.health import get_health_monitor
+from phase7_api.rag_service import warm_up
+from phase7_api.tracing import REQUEST_ID_HEADER, RequestTimingMiddleware
 from config.config import config
 from config.logging_setup import setup_logging
 
@@ -14,6 +20,39 @@ from config.logging_setup import setup_logging
 setup_logging()
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application lifespan: warm-up and background tasks"""
+    logger.info(
+        f"Starting {config.app.name} v{config.app.version} "
+        f"in {config.app.environment} mode"
+    )
+    logger.info(f"Vector DB: {config.vector_db.db_path} (retriever={config.vector_db.retriever})")
+    logger.info(f"Chunking: size={config.chunking.chunk_size}, "
+                f"overlap={config.chunking.chunk_overlap}")
+    
+    monitor = get_health_monitor()
+    
+    # Warm up in the background: /live answers immediately, /ready reports
+    # not-ready until the model, vector store and LLM client are initialized
+    warmup_task = asyncio.create_task(monitor.run_warm_up(warm_up))
+    
+    # Keep the deep (Gemini) health status fresh without probing per request
+    health_task = asyncio.create_task(monitor.run_llm_refresh_loop())
+    
+    yield
+    
+    logger.info("Shutting down application...")
+    for task in (warmup_task, health_task):
+        task.cancel()
+    
+    # Keep the hit counts of answers served from memory since the last write-back
+    answer_cache = get_answer_cache()
+    if answer_cache is not None:
+        answer_cache.flush_hits()
+
+
 # Create FastAPI application
 app = FastAPI(
     title=config.app.name,
@@ -21,6 +60,7 @@ app = FastAPI(
     version=config.app.version,
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 # Configure CORS middleware
@@ -30,11 +70,16 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", REQUEST_ID_HEADER],
     max_age=3600,
 )
 
+# Per-request stage timings: Server-Timing header plus one log record per chat request
+app.add_middleware(RequestTimingMiddleware, path_prefix="/api/v1/chat")
+
 # Include API routes
 app.include_router(router)
+app.include_router(metrics_router)
 
 
 @app.get("/")
@@ -46,40 +91,39 @@ def root():
         "environment": config.app.environment,
         "docs": "/docs",
         "health": "/api/v1/health",
-        "chat": "/api/v1/chat"
+        "live": "/api/v1/live",
+        "ready": "/api/v1/ready",
+        "chat": "/api/v1/chat",
+        "chat_stream": "/api/v1/chat/stream",
+        "metrics": "/metrics"
     }
 
 
-@app.on_event("startup")
-async def startup_event():
-    """Startup event handler"""
-    logger.info(
-        f"Starting {config.app.name} v{config.app.version} "
-        f"in {config.app.environment} mode"
-    )
-    logger.info(f"Vector DB: {config.vector_db.db_path}")
-    logger.info(f"Chunking: size={config.chunking.chunk_size}, "
-                f"overlap={config.chunking.chunk_overlap}")
-
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Shutdown event handler"""
-    logger.info("Shutting down application...")
-
-
 if __name__ == "__main__":
     import uvicorn
     
     logger.info(
         f"Starting server on {config.app.host}:{config.app.port} "
-        f"(reload=False)"
+        f"(reload=False, workers={config.serving.workers}, "
+        f"shared_memory={config.serving.shared_memory})"
     )
+    if config.serving.workers > 1 and not config.serving.shared_memory:
+        logger.warning(
+            "Each worker will load its own embedding model and vector index; "
+            "set SHARED_MEMORY_MODE=true to share them"
+        )
+    if config.serving.workers > 1 and config.sessions.enabled:
+        logger.warning(
+            "Sessions are kept in the worker that created them; a follow-up "
+            "routed to another worker starts an empty session under the same id. "
+            "Run one worker or set SESSIONS_ENABLED=false"
+        )
     
     uvicorn.run(
         "phase7_api.main:app",
         host=config.app.host,
         port=config.app.port,
         reload=False,
+        workers=config.serving.workers,
         log_level=config.logging.level.lower(),
     )
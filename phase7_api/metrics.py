@@ -0,0 +1,274 @@
+"""
+Lightweight Prometheus-style metrics for the Aloysius Chatbot API.
+Counters, gauges and histograms rendered in the text exposition format,
+without adding a client library dependency.
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+from phase7_api.tracing import record_stage
+
+LabelValues = Tuple[str, ...]
+CollectorSample = Tuple[Dict[str, str], float]
+# (name, help, type, samples) produced on demand at scrape time
+CollectedMetric = Tuple[str, str, str, List[CollectorSample]]
+
+# Seconds; spans cache hits (sub-ms) to slow Gemini generations
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0,
+)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 10, 15, 20, 50)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Sequence[str]) -> LabelValues:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        return tuple(str(v) for v in labels)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing value per label set."""
+
+    type_name = "counter"
+
+    def __init__(self, name, help_text, labelnames=()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}"
+            for k, v in items
+        ]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down per label set."""
+
+    type_name = "gauge"
+
+    def __init__(self, name, help_text, labelnames=()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}"
+            for k, v in items
+        ]
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram per label set."""
+
+    type_name = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label set -> (per-bucket counts incl. +Inf, sum)
+        self._values: Dict[LabelValues, Tuple[List[int], float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.get(key) or ([0] * (len(self.buckets) + 1), 0.0)
+            counts[index] += 1
+            self._values[key] = (counts, total + value)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = [(k, (list(c), s)) for k, (c, s) in self._values.items()]
+        lines = []
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}"
+                )
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    """Holds metrics and scrape-time collectors, renders the exposition text."""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], Iterable[CollectedMetric]]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector: Callable[[], Iterable[CollectedMetric]]) -> None:
+        """Add a callable evaluated on every scrape (e.g. cache statistics)."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            for name, help_text, type_name, samples in collector():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {type_name}")
+                for labels, value in samples:
+                    label_text = _format_labels(list(labels), list(labels.values()))
+                    lines.append(f"{name}{label_text} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+RAG_STAGE_SECONDS = REGISTRY.register(Histogram(
+    "rag_stage_duration_seconds",
+    "Duration of each RAG pipeline stage.",
+    ["stage"],
+))
+RAG_STREAM_FIRST_TOKEN_SECONDS = REGISTRY.register(Histogram(
+    "rag_stream_first_token_seconds",
+    "Time from request start to the first streamed answer token.",
+))
+RAG_RETRIEVED_CHUNKS = REGISTRY.register(Histogram(
+    "rag_retrieved_chunks",
+    "Number of context chunks retrieved per question.",
+    buckets=COUNT_BUCKETS,
+))
+RAG_ANSWERS_TOTAL = REGISTRY.register(Counter(
+    "rag_answers_total",
+    "Answers produced, by where they came from.",
+    ["source"],
+))
+HTTP_REQUESTS_TOTAL = REGISTRY.register(Counter(
+    "http_requests_total",
+    "Chat API requests by endpoint and HTTP status.",
+    ["endpoint", "status"],
+))
+HTTP_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "http_request_duration_seconds",
+    "Chat API request duration by endpoint.",
+    ["endpoint"],
+))
+HTTP_REQUESTS_IN_FLIGHT = REGISTRY.register(Gauge(
+    "http_requests_in_flight",
+    "Chat API requests currently being processed.",
+    ["endpoint"],
+))
+
+
+@contextmanager
+def observe_stage(stage: str):
+    """
+    Time a RAG stage into ``rag_stage_duration_seconds`` and the current
+    request's trace (Server-Timing header and request log record).
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        RAG_STAGE_SECONDS.observe(elapsed, stage)
+        record_stage(stage, elapsed)
+
+
+class RequestTracker:
+    """
+    Tracks one API request: in-flight gauge on start, status counter and
+    duration on finish. ``finish`` is idempotent so streaming responses can
+    complete the tracker from their generator.
+    """
+
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+        self.started = time.perf_counter()
+        self._finished = False
+        HTTP_REQUESTS_IN_FLIGHT.inc(endpoint)
+
+    def finish(self, status: int) -> None:
+        if self._finished:
+            return
+        self._finished = True
+        HTTP_REQUESTS_IN_FLIGHT.dec(self.endpoint)
+        HTTP_REQUESTS_TOTAL.inc(self.endpoint, str(status))
+        HTTP_REQUEST_SECONDS.observe(time.perf_counter() - self.started, self.endpoint)
+
+    def __enter__(self) -> "RequestTracker":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc is None:
+            self.finish(200)
+        else:
+            self.finish(getattr(exc, "status_code", 500))
+
+
+def render_metrics() -> str:
+    """Render every registered metric in the text exposition format."""
+    return REGISTRY.render()
@@ -3,11 +3,33 @@ RAG (Retrieval Augmented Generation) Service for the Aloysius Chatbot.
 Orchestrates the retrieval and generation pipeline with quality checks.
 """
 
+import asyncio
+import contextvars
+import functools
 import logging
-from typing import Tuple, List
-from phase6_rag.embed_query import embed_query
-from phase6_rag.retrieve_context import retrieve_context
-from phase6_rag.gemini_llm import get_llm
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Tuple, List, Union
+from phase6_rag.circuit_breaker import CircuitBreaker, call_with_retry, call_with_retry_async
+from phase6_rag.context_packer import pack_context
+from phase6_rag.embed_query import embed_queries, embed_query, get_model
+from phase6_rag.extractive import degraded_answer, get_fast_path
+from phase6_rag.reranker import get_reranker
+from phase6_rag.retrieve_context import retrieve_context, retrieve_context_batch_scored, retrieve_context_scored
+from phase6_rag.llm_backends import get_llm
+from phase4_vectorstore.index_version import get_index_version
+from phase7_api.answer_cache import compute_prompt_version, get_answer_cache, normalize_question
+from phase7_api.coalesce import SingleFlight
+from phase7_api.faq_store import get_faq_store
+from phase7_api.metrics import (
+    RAG_ANSWERS_TOTAL,
+    RAG_RETRIEVED_CHUNKS,
+    RAG_STREAM_FIRST_TOKEN_SECONDS,
+    observe_stage,
+)
+from phase7_api.semantic_cache import get_semantic_cache
+from phase7_api.sessions import is_follow_up
+from phase7_api.tracing import record_fields
 from config.config import config
 
 logger = logging.getLogger(__name__)
@@ -35,77 +57,879 @@ FORMATTING GUIDELINES:
 The response should look clean and readable, similar to ChatGPT.
 """
 
+GENERATION_TEMPERATURE = 0.7
 
+# Everything that shapes a generated answer; cached answers are keyed on it
+PROMPT_VERSION = compute_prompt_version(
+    SYSTEM_PROMPT,
+    config.gemini.model,
+    GENERATION_TEMPERATURE,
+    config.gemini.max_tokens,
+    config.rag.top_k_results,
+    config.rag.pack_context,
+    config.rag.context_token_budget,
+    config.rag.fast_path_enabled,
+    config.rag.fast_path_max_distance,
+    config.rag.fast_path_min_margin,
+    config.rag.fast_path_min_term_coverage,
+    config.rag.fast_path_max_chars,
+    config.rag.hybrid_search,
+    config.rag.hybrid_candidates,
+    config.rag.rrf_k,
+    config.rag.use_reranking,
+    config.rag.rerank_model,
+    config.rag.rerank_candidates,
+)
 
+CachedAnswer = Tuple[str, List[str], float]
+# (answer, sources, confidence, degraded); degraded answers are never cached
+RAGResult = Tuple[str, List[str], float, bool]
 
+NO_CONTEXT_ANSWER = (
+    "I don't have relevant information in the knowledge base to answer this question. "
+    "Please contact the university directly or visit staloysius.edu.in"
+)
 
-def run_rag(question: str) -> Tuple[str, List[str], float]:
+# Bounded pool for the blocking stages (CPU embedding, Chroma queries) of the
+# async pipeline, so they never occupy the event loop or the server threadpool
+_executor = ThreadPoolExecutor(
+    max_workers=config.serving.executor_workers,
+    thread_name_prefix="rag-worker",
+)
+
+# Identical questions arriving together share one pipeline execution
+_single_flight = SingleFlight()
+
+# Opens during LLM incidents so requests fail over to extractive answers at once
+_llm_breaker = CircuitBreaker(
+    "llm",
+    failure_threshold=config.llm.breaker_failure_threshold,
+    reset_timeout=config.llm.breaker_reset_seconds,
+)
+
+
+def get_single_flight() -> SingleFlight:
+    """Get the process-wide request coalescer."""
+    return _single_flight
+
+
+def get_llm_breaker() -> CircuitBreaker:
+    """Get the process-wide LLM circuit breaker."""
+    return _llm_breaker
+
+
+def _count_answer(source: str, answer: str) -> None:
+    """Count an answer by source and note it on the request trace."""
+    RAG_ANSWERS_TOTAL.inc(source)
+    record_fields(answer_source=source, answer_chars=len(answer))
+
+
+def _faq_lookup(question: str, kb_version: str, reload: bool = True) -> Optional[CachedAnswer]:
+    """Check the precomputed FAQ answers for the same normalized question."""
+    store = get_faq_store()
+    if store is None:
+        return None
+    with observe_stage("faq"):
+        cached = store.lookup_exact(question, kb_version, PROMPT_VERSION, reload=reload)
+    if cached is not None:
+        _count_answer("faq", cached[0])
+    return cached
+
+
+def _exact_cache_lookup(question: str, kb_version: str) -> Tuple[Optional[str], Optional[CachedAnswer]]:
+    """
+    Check the FAQ store, then both tiers of the exact answer cache.
+    
+    Returns:
+        Tuple of (cache key or None when disabled, cached result or None)
+    """
+    cached = _faq_lookup(question, kb_version)
+    if cached is not None:
+        return None, cached
+    cache = get_answer_cache()
+    if cache is None:
+        return None, None
+    key = cache.make_key(question, kb_version, PROMPT_VERSION)
+    with observe_stage("answer_cache"):
+        cached = cache.get(key, kb_version)
+    if cached is not None:
+        _count_answer("answer_cache", cached[0])
+    return key, cached
+
+
+async def _exact_cache_lookup_async(question: str, kb_version: str) -> Tuple[Optional[str], Optional[CachedAnswer]]:
+    """
+    Async variant: the in-process tier inline; the SQLite tier, and any
+    reload of a changed FAQ store, on the executor.
+    """
+    store = get_faq_store()
+    if store is not None and store.is_stale():
+        await _run_blocking(store.refresh)
+    cached = _faq_lookup(question, kb_version, reload=False)
+    if cached is not None:
+        return None, cached
+    cache = get_answer_cache()
+    if cache is None:
+        return None, None
+    key = cache.make_key(question, kb_version, PROMPT_VERSION)
+    with observe_stage("answer_cache"):
+        cached = cache.get_local(key, kb_version)
+        if cached is None:
+            cached = await _run_blocking(cache.get_shared, key)
+        elif cache.hits_due():
+            # Write memory-tier hits back in the background for FAQ mining
+            _executor.submit(cache.flush_hits)
+    if cached is not None:
+        _count_answer("answer_cache", cached[0])
+    return key, cached
+
+
+def _semantic_cache_lookup(query_embedding, kb_version: str, reload: bool = True) -> Optional[CachedAnswer]:
+    """
+    Check the FAQ store, then the semantic cache, for an equivalent,
+    already answered question. Pass ``reload=False`` on the event loop,
+    after ``_exact_cache_lookup_async`` refreshed the FAQ store.
+    """
+    store = get_faq_store()
+    if store is not None:
+        with observe_stage("faq"):
+            cached = store.lookup_similar(query_embedding, kb_version, PROMPT_VERSION, reload=reload)
+        if cached is not None:
+            _count_answer("faq", cached[0])
+            return cached
+    
+    cache = get_semantic_cache()
+    if cache is None:
+        return None
+    with observe_stage("semantic_cache"):
+        cached = cache.lookup(query_embedding, kb_version)
+    if cached is not None:
+        _count_answer("semantic_cache", cached[0])
+    return cached
+
+
+def _embed(question: str):
+    """Embed a question, timed as the ``embed`` stage."""
+    with observe_stage("embed"):
+        return embed_query(question)
+
+
+def _retrieve(query_embedding, query_text: str) -> Tuple[List[str], List[dict], List[float]]:
+    """
+    Retrieve context and cosine distances for an embedding (and, with
+    hybrid search, its text), timed as the ``retrieve`` stage.
+    """
+    with observe_stage("retrieve"):
+        context_chunks, metadatas, distances = retrieve_context_scored(
+            query_embedding,
+            top_k=_retrieval_depth(),
+            query_text=query_text
+        )
+    context_chunks, metadatas, distances = _rerank(query_text, context_chunks, metadatas, distances)
+    RAG_RETRIEVED_CHUNKS.observe(len(context_chunks))
+    record_fields(chunk_count=len(context_chunks))
+    return context_chunks, metadatas, distances
+
+
+def _retrieval_depth() -> int:
+    """Chunks to retrieve: reranking over-retrieves and keeps the best ``top_k_results``."""
+    if get_reranker() is not None:
+        return max(config.rag.top_k_results, config.rag.rerank_candidates)
+    return config.rag.top_k_results
+
+
+def _rerank(
+    query_text: str, context_chunks: List[str], metadatas: List[dict], distances: List[float]
+) -> Tuple[List[str], List[dict], List[float]]:
+    """
+    Keep the ``top_k_results`` chunks the cross-encoder ranks highest, if
+    reranking is enabled, timed as the ``rerank`` stage.
+    """
+    reranker = get_reranker()
+    if reranker is None:
+        return context_chunks, metadatas, distances
+    with observe_stage("rerank"):
+        return reranker.rerank(
+            query_text, context_chunks, metadatas, distances, config.rag.top_k_results
+        )
+
+
+def _fast_path(
+    question: str, context_chunks: List[str], metadatas: List[dict], distances: List[float]
+) -> Optional[CachedAnswer]:
+    """
+    Answer extractively from the nearest chunk if retrieval is confident
+    enough (see ``ExtractiveFastPath``), timed as the ``fast_path`` stage.
+    The answer cites the chunk it was taken from, which after hybrid search
+    or reranking need not be the first one.
+    """
+    fast_path = get_fast_path()
+    if fast_path is None:
+        return None
+    with observe_stage("fast_path"):
+        extracted = fast_path.try_answer(question, context_chunks, metadatas, distances)
+    if extracted is None:
+        return None
+    answer, index = extracted
+    _count_answer("extractive", answer)
+    sources = extract_sources(metadatas[index:index + 1])
+    return answer, sources, calculate_confidence(context_chunks, metadatas)
+
+
+def _pack(context_chunks: List[str], metadatas: List[dict]) -> Tuple[List[str], List[dict]]:
+    """
+    Fit retrieved chunks to the context token budget, timed as the ``pack``
+    stage. Returns the chunks and metadata that go into the prompt.
+    """
+    if not config.rag.pack_context:
+        return context_chunks, metadatas
+    with observe_stage("pack"):
+        packed = pack_context(context_chunks, metadatas, config.rag.context_token_budget)
+    record_fields(context_tokens=packed.tokens, packed_chunks=len(packed.chunks))
+    return packed.chunks, packed.metadatas
+
+
+def _build_prompt(
+    question: str, context_chunks: List[str], history: Optional[str] = None
+) -> str:
+    """Build the generation prompt, timed as the ``prompt`` stage."""
+    with observe_stage("prompt"):
+        prompt = get_llm().build_context_prompt(question, context_chunks, history)
+    record_fields(prompt_chars=len(prompt))
+    return prompt
+
+
+def _generate(prompt: str) -> str:
+    """Generate an answer with retries under the circuit breaker."""
+    llm = get_llm()
+    with observe_stage("generate"):
+        return call_with_retry(
+            lambda: llm.generate(
+                prompt=prompt,
+                system_instruction=SYSTEM_PROMPT,
+                temperature=GENERATION_TEMPERATURE,
+            ),
+            _llm_breaker,
+            retries=config.llm.retries,
+            base_delay=config.llm.retry_base_delay,
+            max_delay=config.llm.retry_max_delay,
+        )
+
+
+async def _generate_async(prompt: str) -> str:
+    """Async variant of ``_generate``; each attempt is bounded by ``LLM_TIMEOUT_SECONDS``."""
+    llm = get_llm()
+    with observe_stage("generate"):
+        return await call_with_retry_async(
+            lambda: llm.generate_async(
+                prompt=prompt,
+                system_instruction=SYSTEM_PROMPT,
+                temperature=GENERATION_TEMPERATURE,
+            ),
+            _llm_breaker,
+            retries=config.llm.retries,
+            base_delay=config.llm.retry_base_delay,
+            max_delay=config.llm.retry_max_delay,
+            timeout=config.llm.timeout_seconds,
+        )
+
+
+async def _generate_stream_async(prompt: str) -> AsyncIterator[str]:
+    """
+    Stream an answer. Getting the first chunk goes through the circuit
+    breaker with retries and the timeout; once text has been sent to the
+    client, a failure ends the stream with an error instead.
+    """
+    llm = get_llm()
+    stream = None
+
+    async def first_chunk() -> Optional[str]:
+        nonlocal stream
+        if stream is not None:
+            await stream.aclose()
+        stream = llm.generate_stream_async(
+            prompt=prompt,
+            system_instruction=SYSTEM_PROMPT,
+            temperature=GENERATION_TEMPERATURE,
+        )
+        async for text in stream:
+            return text
+        return None
+
+    try:
+        text = await call_with_retry_async(
+            first_chunk,
+            _llm_breaker,
+            retries=config.llm.retries,
+            base_delay=config.llm.retry_base_delay,
+            max_delay=config.llm.retry_max_delay,
+            timeout=config.llm.timeout_seconds,
+        )
+        if text is None:
+            return
+        yield text
+        async for text in stream:
+            yield text
+    finally:
+        if stream is not None:
+            await stream.aclose()
+
+
+def _degraded_answer(
+    question: str, context_chunks: List[str], metadatas: List[dict], error: Exception
+) -> str:
+    """
+    Answer from the retrieved passages when the LLM is unavailable.
+
+    Raises:
+        Exception: ``error`` again if ``LLM_DEGRADED_FALLBACK`` is disabled
+    """
+    if not config.llm.degraded_fallback:
+        raise error
+    logger.warning(f"LLM unavailable ({error!r}); serving an extractive answer")
+    answer = degraded_answer(question, context_chunks, metadatas)
+    _count_answer("degraded", answer)
+    record_fields(degraded=True)
+    return answer
+
+
+def _conversation(
+    question: str, history: Optional[str], previous_question: Optional[str]
+) -> Tuple[Optional[str], Optional[str]]:
+    """
+    History and previous question to answer with. Standalone questions
+    asked within a session are answered (and cached) like stateless ones;
+    only real follow-ups keep the conversation.
+    """
+    if history and is_follow_up(question):
+        return history, previous_question
+    return None, None
+
+
+def _search_text(question: str, previous_question: Optional[str]) -> str:
+    """
+    Text to embed for retrieval. Follow-ups ("what about its fees?") are
+    searched together with the previous question so pronouns resolve.
+    """
+    if previous_question:
+        return f"{previous_question}\n{question}"
+    return question
+
+
+def _store_answer(
+    question: str,
+    cache_key: Optional[str],
+    query_embedding,
+    kb_version: str,
+    answer: str,
+    sources: List[str],
+    confidence: float,
+) -> None:
+    """Remember an answer in the exact and semantic caches."""
+    semantic_cache = get_semantic_cache()
+    if semantic_cache is not None and query_embedding is not None:
+        semantic_cache.store(
+            question, query_embedding, kb_version, answer, sources, confidence
+        )
+    
+    answer_cache = get_answer_cache()
+    if answer_cache is not None and cache_key is not None:
+        try:
+            answer_cache.put(
+                cache_key, question, kb_version, PROMPT_VERSION,
+                answer, sources, confidence
+            )
+        except Exception as e:
+            # A busy or unwritable shared store must never fail the request
+            logger.warning(f"Could not write answer cache: {e}")
+
+
+async def _run_blocking(func: Callable, *args, **kwargs):
+    """
+    Run a blocking callable on the bounded RAG executor.
+    
+    The caller's context is carried over so stage timings recorded in the
+    worker thread land on the current request's trace.
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        _executor, functools.partial(context.run, func, *args, **kwargs)
+    )
+
+
+def run_rag(question: str) -> RAGResult:
     """
     Execute the RAG pipeline with quality assurance.
     
+    If the LLM fails after retries, or its circuit breaker is open, the
+    answer is built from the retrieved passages and flagged as degraded.
+    
     Args:
         question: User's question/query
         
     Returns:
-        Tuple of (answer, sources, confidence_score)
+        Tuple of (answer, sources, confidence_score, degraded)
     """
     try:
         logger.info(f"RAG pipeline started for question: {question}")
         
+        # Serve repeated questions without embedding or calling Gemini
+        kb_version = get_index_version(config.vector_db.db_path)
+        cache_key, cached = _exact_cache_lookup(question, kb_version)
+        if cached is not None:
+            logger.info("RAG pipeline served from answer cache")
+            return (*cached, False)
+        
         # Step 1: Embed the query
         logger.debug("Embedding query...")
-        query_embedding = embed_query(question)
+        query_embedding = _embed(question)
+        
+        # Reuse the answer to a semantically equivalent question if cached
+        cached = _semantic_cache_lookup(query_embedding, kb_version)
+        if cached is not None:
+            logger.info("RAG pipeline served from semantic cache")
+            _store_answer(question, cache_key, None, kb_version, *cached)
+            return (*cached, False)
         
         # Step 2: Retrieve relevant context
         logger.debug("Retrieving context...")
-        context_chunks, metadatas = retrieve_context(
-            query_embedding, 
-            top_k=config.rag.top_k_results
-        )
+        context_chunks, metadatas, distances = _retrieve(query_embedding, question)
         
         # Verify we have context
         if not context_chunks or len(context_chunks) == 0:
             logger.warning(f"No relevant context found for question: {question}")
-            return (
-                "I don't have relevant information in the knowledge base to answer this question. "
-                "Please contact the university directly or visit staloysius.edu.in",
-                [],
-                0.0
-            )
+            _count_answer("no_context", NO_CONTEXT_ANSWER)
+            return NO_CONTEXT_ANSWER, [], 0.0, False
+        
+        # Answered verbatim by the top chunk: skip the LLM
+        extracted = _fast_path(question, context_chunks, metadatas, distances)
+        if extracted is not None:
+            logger.info("RAG pipeline served by the extractive fast path")
+            _store_answer(question, cache_key, query_embedding, kb_version, *extracted)
+            return (*extracted, False)
         
         # Step 3: Generate answer using Gemini
         logger.debug("Generating response with Gemini...")
-        llm = get_llm()
+        prompt_chunks, prompt_metadatas = _pack(context_chunks, metadatas)
+        prompt = _build_prompt(question, prompt_chunks)
         
-        answer = llm.generate_with_context(
-            query=question,
-            context=context_chunks,
-            system_instruction=SYSTEM_PROMPT,
-            temperature=0.7,
-        )
+        degraded = False
+        try:
+            answer = _generate(prompt)
+            _count_answer("generated", answer)
+        except Exception as e:
+            answer = _degraded_answer(question, prompt_chunks, prompt_metadatas, e)
+            degraded = True
         
         # Step 4: Extract unique sources
-        sources = list(set(
-            meta.get("url", "unknown")
-            for meta in metadatas
-            if meta.get("url")
-        ))
+        sources = extract_sources(prompt_metadatas)
         
         # Step 5: Calculate confidence score
         confidence = calculate_confidence(context_chunks, metadatas)
         
+        if not degraded:
+            _store_answer(
+                question, cache_key, query_embedding, kb_version,
+                answer, sources, confidence
+            )
+        
         logger.info(
             f"RAG pipeline completed - Confidence: {confidence:.2f}, "
-            f"Sources: {len(sources)}"
+            f"Sources: {len(sources)}, Degraded: {degraded}"
+        )
+        
+        return answer, sources, confidence, degraded
+        
+    except Exception as e:
+        logger.error(f"Error in RAG pipeline: {e}", exc_info=True)
+        raise
+
+
+async def run_rag_async(
+    question: str,
+    history: Optional[str] = None,
+    previous_question: Optional[str] = None,
+) -> RAGResult:
+    """
+    Execute the RAG pipeline without blocking the event loop.
+    
+    Embedding and retrieval run on the bounded RAG executor and the answer
+    is generated with Gemini's async API, so an in-flight question only
+    holds an executor thread while it is doing CPU or vector-store work.
+    Concurrent identical (normalized) questions are coalesced onto a single
+    execution when ``COALESCE_REQUESTS`` is enabled.
+    
+    Follow-up questions depend on the conversation history, so they bypass
+    the answer caches, the fast path and coalescing; standalone questions
+    asked within a session are served like stateless ones. LLM failures
+    fall back to a degraded extractive answer as in ``run_rag``.
+    
+    Args:
+        question: User's question/query
+        history: Bounded conversation history of the session, if any
+        previous_question: The session's previous question, if any
+        
+    Returns:
+        Tuple of (answer, sources, confidence_score, degraded)
+    """
+    history, previous_question = _conversation(question, history, previous_question)
+    if history or not config.serving.coalesce_requests:
+        return await _run_rag_async(question, history, previous_question)
+    
+    key = f"{get_index_version(config.vector_db.db_path)}:{normalize_question(question)}"
+    return await _single_flight.run(key, lambda: _run_rag_async(question))
+
+
+async def _run_rag_async(
+    question: str,
+    history: Optional[str] = None,
+    previous_question: Optional[str] = None,
+) -> RAGResult:
+    """Single execution of the async RAG pipeline (see ``run_rag_async``)."""
+    try:
+        logger.info(f"Async RAG pipeline started for question: {question}")
+        
+        kb_version = get_index_version(config.vector_db.db_path)
+        cacheable = not history
+        cache_key, cached = None, None
+        if cacheable:
+            cache_key, cached = await _exact_cache_lookup_async(question, kb_version)
+        if cached is not None:
+            logger.info("Async RAG pipeline served from answer cache")
+            return (*cached, False)
+        
+        search_text = _search_text(question, previous_question)
+        query_embedding = await _run_blocking(_embed, search_text)
+        
+        cached = _semantic_cache_lookup(query_embedding, kb_version, reload=False) if cacheable else None
+        if cached is not None:
+            logger.info("Async RAG pipeline served from semantic cache")
+            await _run_blocking(
+                _store_answer, question, cache_key, None, kb_version, *cached
+            )
+            return (*cached, False)
+        
+        context_chunks, metadatas, distances = await _run_blocking(
+            _retrieve, query_embedding, search_text
         )
         
-        return answer, sources, confidence
+        if not context_chunks:
+            logger.warning(f"No relevant context found for question: {question}")
+            _count_answer("no_context", NO_CONTEXT_ANSWER)
+            return NO_CONTEXT_ANSWER, [], 0.0, False
+        
+        # Follow-ups depend on the conversation, so they always go to the LLM
+        extracted = _fast_path(question, context_chunks, metadatas, distances) if cacheable else None
+        if extracted is not None:
+            logger.info("Async RAG pipeline served by the extractive fast path")
+            await _run_blocking(
+                _store_answer, question, cache_key, query_embedding, kb_version, *extracted
+            )
+            return (*extracted, False)
+        
+        prompt_chunks, prompt_metadatas = _pack(context_chunks, metadatas)
+        prompt = _build_prompt(question, prompt_chunks, history)
+        degraded = False
+        try:
+            answer = await _generate_async(prompt)
+            _count_answer("generated", answer)
+        except Exception as e:
+            answer = _degraded_answer(question, prompt_chunks, prompt_metadatas, e)
+            degraded = True
+        
+        sources = extract_sources(prompt_metadatas)
+        confidence = calculate_confidence(context_chunks, metadatas)
+        
+        if cacheable and not degraded:
+            await _run_blocking(
+                _store_answer, question, cache_key, query_embedding, kb_version,
+                answer, sources, confidence
+            )
+        
+        logger.info(
+            f"Async RAG pipeline completed - Confidence: {confidence:.2f}, "
+            f"Sources: {len(sources)}, Degraded: {degraded}"
+        )
+        
+        return answer, sources, confidence, degraded
         
     except Exception as e:
         logger.error(f"Error in RAG pipeline: {e}", exc_info=True)
         raise
 
 
+async def run_rag_batch_async(questions: List[str]) -> List[Union[RAGResult, Exception]]:
+    """
+    Execute the RAG pipeline for a list of questions.
+    
+    Questions not served from cache are embedded in one encoder call and
+    retrieved with one multi-query collection lookup; answers are then
+    generated concurrently, bounded by ``BATCH_CONCURRENCY``.
+    
+    Args:
+        questions: User questions, in order
+        
+    Returns:
+        One entry per question, in order: either (answer, sources,
+        confidence, degraded) or the exception raised while answering it
+    """
+    logger.info(f"Batch RAG pipeline started for {len(questions)} questions")
+    
+    kb_version = get_index_version(config.vector_db.db_path)
+    results: List[Union[RAGResult, Exception, None]] = [None] * len(questions)
+    cache_keys: List[Optional[str]] = [None] * len(questions)
+    
+    for i, question in enumerate(questions):
+        cache_keys[i], cached = await _exact_cache_lookup_async(question, kb_version)
+        if cached is not None:
+            results[i] = (*cached, False)
+    
+    pending = [i for i, result in enumerate(results) if result is None]
+    if pending:
+        with observe_stage("embed_batch"):
+            embeddings = await _run_blocking(embed_queries, [questions[i] for i in pending])
+        embedding_by_index = dict(zip(pending, embeddings))
+        
+        for i in pending:
+            cached = _semantic_cache_lookup(embedding_by_index[i], kb_version, reload=False)
+            if cached is not None:
+                results[i] = (*cached, False)
+                if cache_keys[i] is not None:
+                    # Repeats then hit the exact cache, as on the single-question path
+                    await _run_blocking(
+                        _store_answer, questions[i], cache_keys[i], None, kb_version, *cached
+                    )
+        
+        pending = [i for i in pending if results[i] is None]
+    
+    if pending:
+        with observe_stage("retrieve_batch"):
+            retrieved = await _run_blocking(
+                retrieve_context_batch_scored,
+                [embedding_by_index[i] for i in pending],
+                top_k=_retrieval_depth(),
+                query_texts=[questions[i] for i in pending]
+            )
+        if get_reranker() is not None:
+            retrieved = await asyncio.gather(*(
+                _run_blocking(_rerank, questions[i], *result)
+                for i, result in zip(pending, retrieved)
+            ))
+        for context_chunks, _, _ in retrieved:
+            RAG_RETRIEVED_CHUNKS.observe(len(context_chunks))
+        
+        llm = get_llm()
+        semaphore = asyncio.Semaphore(config.serving.batch_concurrency)
+        
+        async def answer_one(
+            i: int, context_chunks: List[str], metadatas: List[dict], distances: List[float]
+        ):
+            if not context_chunks:
+                _count_answer("no_context", NO_CONTEXT_ANSWER)
+                results[i] = (NO_CONTEXT_ANSWER, [], 0.0, False)
+                return
+            try:
+                extracted = _fast_path(questions[i], context_chunks, metadatas, distances)
+                if extracted is not None:
+                    results[i] = (*extracted, False)
+                    await _run_blocking(
+                        _store_answer, questions[i], cache_keys[i], embedding_by_index[i],
+                        kb_version, *extracted
+                    )
+                    return
+                prompt_chunks, prompt_metadatas = _pack(context_chunks, metadatas)
+                prompt = llm.build_context_prompt(questions[i], prompt_chunks)
+                degraded = False
+                try:
+                    async with semaphore:
+                        answer = await _generate_async(prompt)
+                    _count_answer("generated", answer)
+                except Exception as e:
+                    answer = _degraded_answer(questions[i], prompt_chunks, prompt_metadatas, e)
+                    degraded = True
+                sources = extract_sources(prompt_metadatas)
+                confidence = calculate_confidence(context_chunks, metadatas)
+                results[i] = (answer, sources, confidence, degraded)
+                if not degraded:
+                    await _run_blocking(
+                        _store_answer, questions[i], cache_keys[i], embedding_by_index[i],
+                        kb_version, answer, sources, confidence
+                    )
+            except Exception as e:
+                logger.error(f"Error answering batch question {i}: {e}", exc_info=True)
+                results[i] = e
+        
+        await asyncio.gather(*[
+            answer_one(i, context_chunks, metadatas, distances)
+            for i, (context_chunks, metadatas, distances) in zip(pending, retrieved)
+        ])
+    
+    logger.info(
+        f"Batch RAG pipeline completed - {len(questions)} questions, "
+        f"{len(pending)} generated"
+    )
+    
+    return results
+
+
+async def run_rag_stream(
+    question: str,
+    history: Optional[str] = None,
+    previous_question: Optional[str] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Execute the RAG pipeline, streaming the answer as it is generated.
+    
+    Retrieval runs first so sources and confidence can be sent before
+    the first token. Yields events of the form ``{"event": ..., "data": ...}``:
+    one ``meta`` event, zero or more ``token`` events and a final ``done``
+    whose ``degraded`` flag tells whether the answer is an extractive
+    fallback because the LLM was unavailable before its first token.
+    
+    Args:
+        question: User's question/query
+        history: Bounded conversation history of the session, if any
+        previous_question: The session's previous question, if any
+        
+    Yields:
+        Event dictionaries ready to be serialized for the client
+    """
+    logger.info(f"Streaming RAG pipeline started for question: {question}")
+    started = time.perf_counter()
+    history, previous_question = _conversation(question, history, previous_question)
+    
+    kb_version = get_index_version(config.vector_db.db_path)
+    cacheable = not history
+    cache_key, cached = None, None
+    if cacheable:
+        cache_key, cached = await _exact_cache_lookup_async(question, kb_version)
+    
+    query_embedding = None
+    search_text = _search_text(question, previous_question)
+    if cached is None:
+        query_embedding = await _run_blocking(_embed, search_text)
+        cached = _semantic_cache_lookup(query_embedding, kb_version, reload=False) if cacheable else None
+        if cached is not None:
+            await _run_blocking(
+                _store_answer, question, cache_key, None, kb_version, *cached
+            )
+    
+    if cached is not None:
+        logger.info("Streaming RAG pipeline served from cache")
+        answer, sources, confidence = cached
+        yield {"event": "meta", "data": {"sources": sources, "confidence": confidence}}
+        yield {"event": "token", "data": {"text": answer}}
+        yield {"event": "done", "data": {"degraded": False}}
+        return
+    
+    context_chunks, metadatas, distances = await _run_blocking(
+        _retrieve, query_embedding, search_text
+    )
+    
+    if not context_chunks:
+        logger.warning(f"No relevant context found for question: {question}")
+        _count_answer("no_context", NO_CONTEXT_ANSWER)
+        yield {"event": "meta", "data": {"sources": [], "confidence": 0.0}}
+        yield {"event": "token", "data": {"text": NO_CONTEXT_ANSWER}}
+        yield {"event": "done", "data": {"degraded": False}}
+        return
+    
+    extracted = _fast_path(question, context_chunks, metadatas, distances) if cacheable else None
+    if extracted is not None:
+        logger.info("Streaming RAG pipeline served by the extractive fast path")
+        await _run_blocking(
+            _store_answer, question, cache_key, query_embedding, kb_version, *extracted
+        )
+        answer, sources, confidence = extracted
+        yield {"event": "meta", "data": {"sources": sources, "confidence": confidence}}
+        yield {"event": "token", "data": {"text": answer}}
+        yield {"event": "done", "data": {"degraded": False}}
+        return
+    
+    prompt_chunks, prompt_metadatas = _pack(context_chunks, metadatas)
+    sources = extract_sources(prompt_metadatas)
+    confidence = calculate_confidence(context_chunks, metadatas)
+    yield {"event": "meta", "data": {"sources": sources, "confidence": confidence}}
+    
+    prompt = _build_prompt(question, prompt_chunks, history)
+    parts = []
+    degraded = False
+    with observe_stage("generate"):
+        try:
+            async for text in _generate_stream_async(prompt):
+                if not parts:
+                    RAG_STREAM_FIRST_TOKEN_SECONDS.observe(time.perf_counter() - started)
+                parts.append(text)
+                yield {"event": "token", "data": {"text": text}}
+        except Exception as e:
+            if parts:
+                raise
+            fallback = _degraded_answer(question, prompt_chunks, prompt_metadatas, e)
+            parts.append(fallback)
+            degraded = True
+            yield {"event": "token", "data": {"text": fallback}}
+    answer = "".join(parts).strip()
+    if not degraded:
+        _count_answer("generated", answer)
+    if cacheable and not degraded:
+        await _run_blocking(
+            _store_answer, question, cache_key, query_embedding, kb_version,
+            answer, sources, confidence
+        )
+    
+    logger.info(
+        f"Streaming RAG pipeline completed - Confidence: {confidence:.2f}, "
+        f"Sources: {len(sources)}, Answer chars: {len(answer)}, Degraded: {degraded}"
+    )
+    yield {"event": "done", "data": {"degraded": degraded}}
+
+
+def warm_up() -> None:
+    """
+    Load and exercise every pipeline component once.
+    
+    Loads the SentenceTransformer and runs a dummy embedding (first-call
+    kernel warm-up), opens the vector store with a dummy query, initializes
+    the Gemini client, opens the answer cache and loads the reranker if
+    enabled. Blocking; run it off the event loop.
+    """
+    logger.info("Warm-up: loading embedding model...")
+    get_model()
+    query_embedding = embed_query("warm up")
+    embed_queries(["warm up", "warm up"])
+    
+    logger.info("Warm-up: opening vector store...")
+    retrieve_context(query_embedding, top_k=1, query_text="warm up")
+    
+    logger.info("Warm-up: initializing LLM client and caches...")
+    get_llm()
+    get_answer_cache()
+    get_semantic_cache()
+    get_faq_store()
+    reranker = get_reranker()
+    if reranker is not None:
+        logger.info("Warm-up: loading reranker...")
+        reranker.warm_up()
+
+
+def extract_sources(metadatas: List[dict]) -> List[str]:
+    """
+    Extract the unique source URLs from retrieved chunk metadata.
+    
+    Args:
+        metadatas: Metadata for retrieved chunks
+        
+    Returns:
+        List of unique source URLs
+    """
+    return list(set(
+        meta.get("url", "unknown")
+        for meta in metadatas
+        if meta.get("url")
+    ))
+
+
 def calculate_confidence(chunks: List[str], metadatas: List[dict]) -> float:
     """
     Calculate confidence score based on retrieval quality.
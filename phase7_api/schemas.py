@@ -3,7 +3,7 @@ Pydantic schemas for API request/response validation.
 """
 
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 
 class ChatRequest(BaseModel):
@@ -14,10 +14,21 @@ class ChatRequest(BaseModel):
         max_length=1000,
         description="User's question about the university"
     )
+    session_id: Optional[str] = Field(
+        default=None,
+        max_length=64,
+        description="Conversation session id from a previous response"
+    )
+    start_session: bool = Field(
+        default=False,
+        description="Start a conversation session when no session_id is sent; "
+                    "without either the request is stateless"
+    )
     
     class Config:
         example = {
-            "question": "What are the admission requirements for BTech?"
+            "question": "What are the admission requirements for BTech?",
+            "session_id": "3f2b9c0e8a7d4e1f9b6c5a4d3e2f1a0b"
         }
 
 
@@ -37,15 +48,79 @@ class ChatResponse(BaseModel):
         le=1.0,
         description="Confidence score of the response (0.0 to 1.0)"
     )
+    session_id: Optional[str] = Field(
+        default=None,
+        description="Conversation session id to send with follow-up questions"
+    )
+    degraded: bool = Field(
+        default=False,
+        description="True if the answer is a list of retrieved passages because the LLM was unavailable"
+    )
     
     class Config:
         example = {
             "answer": "St. Aloysius offers multiple BTech programs...",
             "sources": ["https://staloysius.edu.in/admissions"],
-            "confidence": 0.85
+            "confidence": 0.85,
+            "session_id": "3f2b9c0e8a7d4e1f9b6c5a4d3e2f1a0b"
         }
 
 
+class BatchChatRequest(BaseModel):
+    """Request schema for batch chat endpoint"""
+    questions: List[str] = Field(
+        ...,
+        min_length=1,
+        description="Questions to answer, in order"
+    )
+    
+    class Config:
+        example = {
+            "questions": [
+                "What are the admission requirements for BTech?",
+                "What is the fee structure for BCA?"
+            ]
+        }
+
+
+class BatchChatResult(BaseModel):
+    """Per-question result within a batch chat response"""
+    question: str = Field(
+        ...,
+        description="The question this result answers"
+    )
+    answer: Optional[str] = Field(
+        default=None,
+        description="AI-generated answer (null if this question failed)"
+    )
+    sources: List[str] = Field(
+        default=[],
+        description="URLs of sources used to generate the answer"
+    )
+    confidence: float = Field(
+        default=0.0,
+        ge=0.0,
+        le=1.0,
+        description="Confidence score of the response (0.0 to 1.0)"
+    )
+    degraded: bool = Field(
+        default=False,
+        description="True if the answer is a list of retrieved passages because the LLM was unavailable"
+    )
+    error: Optional[str] = Field(
+        default=None,
+        description="Error message if this question could not be answered"
+    )
+
+
+class BatchChatResponse(BaseModel):
+    """Response schema for batch chat endpoint"""
+    results: List[BatchChatResult] = Field(
+        ...,
+        description="One result per question, in request order"
+    )
+
+
 class HealthResponse(BaseModel):
     """Response schema for health check endpoint"""
     status: str = Field(
@@ -56,9 +131,17 @@ class HealthResponse(BaseModel):
         ..., 
         description="Detailed status message"
     )
+    checks: Dict[str, Any] = Field(
+        default={},
+        description="Per-component details (readiness and last LLM check)"
+    )
     
     class Config:
         example = {
             "status": "healthy",
-            "message": "All services operational"
+            "message": "All services operational",
+            "checks": {
+                "ready": {"embedder_loaded": True, "vector_store_open": True, "vector_count": 4210},
+                "llm": {"healthy": True, "checked_at": 1765432100.0, "age_seconds": 42.0, "error": None}
+            }
         }
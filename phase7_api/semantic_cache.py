@@ -0,0 +1,234 @@
+"""
+Semantic answer cache for the RAG pipeline.
+Reuses answers for questions whose embeddings are close to a previously
+answered question under the same knowledge-base version.
+"""
+
+import logging
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config.config import config
+
+logger = logging.getLogger(__name__)
+
+# Rough per-entry bookkeeping cost (dict slots, dataclass, OrderedDict node)
+_ENTRY_OVERHEAD_BYTES = 512
+
+
+@dataclass
+class _CacheEntry:
+    question: str
+    answer: str
+    sources: List[str]
+    confidence: float
+    size_bytes: int
+
+
+class SemanticCache:
+    """
+    LRU + TTL cache keyed on query-embedding similarity.
+
+    Embeddings are kept in one preallocated, L2-normalized matrix so a
+    lookup is a single matrix-vector product. The whole cache is dropped
+    when the knowledge-base version changes.
+    """
+
+    def __init__(
+        self,
+        max_distance: float,
+        ttl_seconds: float,
+        max_entries: int,
+        max_bytes: int,
+    ):
+        self.max_distance = max_distance
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[int, _CacheEntry]" = OrderedDict()
+        self._vectors: Optional[np.ndarray] = None
+        self._valid = np.zeros(max_entries, dtype=bool)
+        self._created_at = np.zeros(max_entries, dtype=np.float64)
+        self._free_slots = list(range(max_entries - 1, -1, -1))
+        self._kb_version: Optional[str] = None
+        self._bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _normalize(embedding) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32).ravel()
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm > 0 else vector
+
+    def _check_version(self, kb_version: str) -> None:
+        """Drop every entry if the knowledge base changed. Caller holds the lock."""
+        if self._kb_version != kb_version:
+            if self._entries:
+                logger.info(
+                    f"Knowledge base version changed ({self._kb_version} -> "
+                    f"{kb_version}), clearing {len(self._entries)} semantic cache entries"
+                )
+            self._clear_locked()
+            self._kb_version = kb_version
+
+    def _clear_locked(self) -> None:
+        self._entries.clear()
+        self._valid[:] = False
+        self._free_slots = list(range(self.max_entries - 1, -1, -1))
+        self._bytes = 0
+
+    def _evict_locked(self, slot: int) -> None:
+        entry = self._entries.pop(slot)
+        self._valid[slot] = False
+        self._free_slots.append(slot)
+        self._bytes -= entry.size_bytes
+
+    def lookup(
+        self, embedding, kb_version: str
+    ) -> Optional[Tuple[str, List[str], float]]:
+        """
+        Find a cached answer for a semantically equivalent question.
+
+        Args:
+            embedding: Query embedding produced by ``embed_query``
+            kb_version: Current knowledge-base version
+
+        Returns:
+            Tuple of (answer, sources, confidence) on a hit, otherwise None
+        """
+        query = self._normalize(embedding)
+
+        with self._lock:
+            self._check_version(kb_version)
+
+            if not self._entries or self._vectors is None:
+                self.misses += 1
+                return None
+
+            similarities = self._vectors @ query
+            # Expired entries are masked out so they cannot hide a valid
+            # match; LRU eviction reclaims their slots
+            expired = self._created_at < time.monotonic() - self.ttl_seconds
+            similarities[~self._valid | expired] = -np.inf
+            slot = int(np.argmax(similarities))
+            distance = 1.0 - float(similarities[slot])
+
+            if distance > self.max_distance:
+                self.misses += 1
+                return None
+
+            entry = self._entries[slot]
+
+            self._entries.move_to_end(slot)
+            self.hits += 1
+
+        logger.debug(
+            f"Semantic cache hit (distance={distance:.3f}) "
+            f"for cached question: {entry.question}"
+        )
+        return entry.answer, list(entry.sources), entry.confidence
+
+    def store(
+        self,
+        question: str,
+        embedding,
+        kb_version: str,
+        answer: str,
+        sources: List[str],
+        confidence: float,
+    ) -> None:
+        """
+        Cache an answer under its query embedding.
+        """
+        vector = self._normalize(embedding)
+        size_bytes = (
+            vector.nbytes
+            + sys.getsizeof(question)
+            + sys.getsizeof(answer)
+            + sum(sys.getsizeof(src) for src in sources)
+            + _ENTRY_OVERHEAD_BYTES
+        )
+        if size_bytes > self.max_bytes:
+            return
+
+        with self._lock:
+            self._check_version(kb_version)
+
+            if self._vectors is None:
+                self._vectors = np.zeros(
+                    (self.max_entries, vector.shape[0]), dtype=np.float32
+                )
+
+            # Make room: LRU order, bounded by entry count and memory cap
+            while self._entries and (
+                not self._free_slots or self._bytes + size_bytes > self.max_bytes
+            ):
+                oldest = next(iter(self._entries))
+                self._evict_locked(oldest)
+                self.evictions += 1
+
+            slot = self._free_slots.pop()
+            self._vectors[slot] = vector
+            self._valid[slot] = True
+            self._created_at[slot] = time.monotonic()
+            self._entries[slot] = _CacheEntry(
+                question=question,
+                answer=answer,
+                sources=list(sources),
+                confidence=confidence,
+                size_bytes=size_bytes,
+            )
+            self._bytes += size_bytes
+
+    def clear(self) -> None:
+        """Remove all cached entries."""
+        with self._lock:
+            self._clear_locked()
+
+    def stats(self) -> Dict[str, float]:
+        """Return hit/miss counters and current occupancy."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "kb_version": self._kb_version,
+            }
+
+
+# Singleton instance
+_cache_instance: Optional[SemanticCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_semantic_cache() -> Optional[SemanticCache]:
+    """Get or create the global semantic cache (None when disabled)."""
+    global _cache_instance
+    if not config.cache.semantic_enabled:
+        return None
+    if _cache_instance is None:
+        with _cache_lock:
+            if _cache_instance is None:
+                _cache_instance = SemanticCache(
+                    max_distance=config.cache.semantic_max_distance,
+                    ttl_seconds=config.cache.semantic_ttl_seconds,
+                    max_entries=config.cache.semantic_max_entries,
+                    max_bytes=config.cache.semantic_max_mb * 1024 * 1024,
+                )
+    return _cache_instance
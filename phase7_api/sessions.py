@@ -0,0 +1,228 @@
+"""
+Server-side conversation sessions for follow-up questions.
+Keeps a bounded history per session: recent turns verbatim, older turns
+folded into a rolling summary so the prompt size stays capped.
+"""
+
+import logging
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional, Tuple
+
+from config.config import config
+from phase6_rag.context_packer import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Words beyond this in a folded answer are dropped from the summary line
+SUMMARY_ANSWER_WORDS = 30
+
+# Questions this short within a conversation are elliptical ("and for MBA?")
+FOLLOW_UP_MAX_WORDS = 3
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_MARKDOWN = re.compile(r"[*_#`>]+")
+# Pronouns and references that only resolve against earlier turns
+_REFERENCE = re.compile(
+    r"\b(it|its|they|them|their|theirs|this|that|these|those|"
+    r"he|she|him|her|his|same|above|former|latter)\b"
+)
+# Openers that continue the previous question ("what about the fees?")
+_CONTINUATION = re.compile(r"^(and|or|but|also|so|then|what about|how about|else)\b")
+_WORD = re.compile(r"[a-z0-9']+")
+
+
+def is_follow_up(question: str) -> bool:
+    """
+    Whether a question asked within a conversation depends on its history.
+
+    Conservative by design: a standalone question misjudged as a follow-up
+    only loses caching, while the reverse would answer it out of context.
+    """
+    text = " ".join(_WORD.findall(question.lower().replace("\u2019", "'")))
+    return (
+        len(text.split()) <= FOLLOW_UP_MAX_WORDS
+        or bool(_REFERENCE.search(text))
+        or bool(_CONTINUATION.match(text))
+    )
+
+
+def _summarize_turn(question: str, answer: str) -> str:
+    """Condense a turn to one line: the question and the answer's lead sentence."""
+    answer = _MARKDOWN.sub("", answer).strip()
+    lead = _SENTENCE_END.split(answer, maxsplit=1)[0]
+    words = lead.split()
+    if len(words) > SUMMARY_ANSWER_WORDS:
+        lead = " ".join(words[:SUMMARY_ANSWER_WORDS]) + " ..."
+    return f"- Asked: {question.strip()} | Answered: {lead}"
+
+
+@dataclass
+class Session:
+    """History of one conversation."""
+    session_id: str
+    turns: Deque[Tuple[str, str]] = field(default_factory=deque)
+    summary: List[str] = field(default_factory=list)
+    last_seen: float = field(default_factory=time.monotonic)
+
+    def history_text(self) -> str:
+        """Render the summary and recent turns for the prompt."""
+        parts = []
+        if self.summary:
+            parts.append("Earlier in this conversation:\n" + "\n".join(self.summary))
+        for question, answer in self.turns:
+            parts.append(f"User: {question}\nAssistant: {answer}")
+        return "\n\n".join(parts)
+
+    @property
+    def last_question(self) -> Optional[str]:
+        return self.turns[-1][0] if self.turns else None
+
+
+class SessionStore:
+    """
+    In-process session store with idle eviction and a memory cap.
+
+    Sessions idle for longer than ``idle_ttl_seconds`` are dropped, and the
+    least recently used session is evicted once ``max_sessions`` is reached.
+    When a session's history exceeds ``history_token_budget``, its oldest
+    turns are folded into a one-line-per-turn summary, itself capped at
+    ``summary_token_budget`` by dropping the oldest lines.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int,
+        idle_ttl_seconds: float,
+        history_token_budget: int,
+        summary_token_budget: int,
+    ):
+        self.max_sessions = max_sessions
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.history_token_budget = history_token_budget
+        self.summary_token_budget = summary_token_budget
+
+        self._lock = threading.Lock()
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+
+        self.created = 0
+        self.evicted_idle = 0
+        self.evicted_capacity = 0
+        self.compactions = 0
+
+    def _evict(self, now: float) -> None:
+        # Sessions are kept in last-access order, so stale ones are at the front
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if now - oldest.last_seen <= self.idle_ttl_seconds:
+                break
+            self._sessions.popitem(last=False)
+            self.evicted_idle += 1
+        while len(self._sessions) >= self.max_sessions:
+            self._sessions.popitem(last=False)
+            self.evicted_capacity += 1
+
+    def get_or_create(self, session_id: Optional[str]) -> Session:
+        """
+        Get a session by id, starting a new one if it is unknown or expired.
+
+        Args:
+            session_id: Client-supplied id, or None to start a new session
+
+        Returns:
+            The session (a new one keeps the client-supplied id)
+        """
+        now = time.monotonic()
+        with self._lock:
+            session = self._sessions.get(session_id) if session_id else None
+            if session is not None and now - session.last_seen > self.idle_ttl_seconds:
+                del self._sessions[session_id]
+                self.evicted_idle += 1
+                session = None
+
+            if session is None:
+                self._evict(now)
+                session = Session(session_id=session_id or uuid.uuid4().hex)
+                self._sessions[session.session_id] = session
+                self.created += 1
+
+            session.last_seen = now
+            self._sessions.move_to_end(session.session_id)
+            return session
+
+    def context(self, session: Session) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Return (history text or None, previous question or None) for a session.
+        """
+        with self._lock:
+            history = session.history_text()
+            return (history or None), session.last_question
+
+    def append(self, session: Session, question: str, answer: str) -> None:
+        """Record a completed turn and compact the history if over budget."""
+        # A single long answer may use at most half of the history budget
+        max_chars = self.history_token_budget * 2
+        if len(answer) > max_chars:
+            answer = answer[:max_chars].rstrip() + " ..."
+        with self._lock:
+            session.turns.append((question, answer))
+            session.last_seen = time.monotonic()
+            self._compact(session)
+
+    def _compact(self, session: Session) -> None:
+        # The latest turn is always kept verbatim for follow-up resolution
+        compacted = False
+        while (
+            len(session.turns) > 1
+            and estimate_tokens(session.history_text()) > self.history_token_budget
+        ):
+            question, answer = session.turns.popleft()
+            session.summary.append(_summarize_turn(question, answer))
+            compacted = True
+
+        while (
+            len(session.summary) > 1
+            and estimate_tokens("\n".join(session.summary)) > self.summary_token_budget
+        ):
+            session.summary.pop(0)
+
+        if compacted:
+            self.compactions += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Return session counts and eviction/compaction counters."""
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "created": self.created,
+                "evicted_idle": self.evicted_idle,
+                "evicted_capacity": self.evicted_capacity,
+                "compactions": self.compactions,
+            }
+
+
+# Singleton instance
+_store_instance: Optional[SessionStore] = None
+_store_lock = threading.Lock()
+
+
+def get_session_store() -> Optional[SessionStore]:
+    """Get or create the global session store (None when disabled)."""
+    global _store_instance
+    if not config.sessions.enabled:
+        return None
+    if _store_instance is None:
+        with _store_lock:
+            if _store_instance is None:
+                _store_instance = SessionStore(
+                    max_sessions=config.sessions.max_sessions,
+                    idle_ttl_seconds=config.sessions.idle_ttl_seconds,
+                    history_token_budget=config.sessions.history_token_budget,
+                    summary_token_budget=config.sessions.summary_token_budget,
+                )
+    return _store_instance
@@ -0,0 +1,118 @@
+"""
+Per-request timing traces for the chat endpoints.
+Stage timings recorded anywhere in the pipeline are attached to the current
+request, returned in a Server-Timing header and logged as one structured
+record when the response completes.
+"""
+
+import logging
+import time
+import uuid
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+logger = logging.getLogger(__name__)
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+
+@dataclass
+class RequestTrace:
+    """Stage timings and size attributes collected for one request."""
+    request_id: str
+    started: float = field(default_factory=time.perf_counter)
+    stages: Dict[str, float] = field(default_factory=dict)
+    fields: Dict[str, Any] = field(default_factory=dict)
+
+    def add_stage(self, name: str, seconds: float) -> None:
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    def timings_ms(self) -> Dict[str, float]:
+        return {name: round(seconds * 1000, 2) for name, seconds in self.stages.items()}
+
+    def server_timing(self) -> str:
+        """Format the timings recorded so far as a Server-Timing header value."""
+        parts = [f"{name};dur={ms}" for name, ms in self.timings_ms().items()]
+        parts.append(f"total;dur={round(self.elapsed_ms(), 2)}")
+        return ", ".join(parts)
+
+
+_current_trace: ContextVar[Optional[RequestTrace]] = ContextVar(
+    "request_trace", default=None
+)
+
+
+def current_trace() -> Optional[RequestTrace]:
+    """The trace of the request being handled, if any."""
+    return _current_trace.get()
+
+
+def record_stage(name: str, seconds: float) -> None:
+    """Add a stage duration to the current request's trace."""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add_stage(name, seconds)
+
+
+def record_fields(**fields: Any) -> None:
+    """Attach attributes (chunk count, prompt size, ...) to the current trace."""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.fields.update(fields)
+
+
+class RequestTimingMiddleware:
+    """
+    ASGI middleware that traces requests under ``path_prefix``.
+
+    Adds ``Server-Timing`` and ``X-Request-ID`` response headers and emits one
+    structured log record per request. For streaming responses the
+    header only covers stages finished before the first byte; the log record,
+    written after the body completes, always has the full breakdown.
+    """
+
+    def __init__(self, app, path_prefix: str = "/api/v1/chat"):
+        self.app = app
+        self.path_prefix = path_prefix
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+
+        request_id = Headers(scope=scope).get(REQUEST_ID_HEADER) or uuid.uuid4().hex
+        trace = RequestTrace(request_id=request_id)
+        token = _current_trace.set(trace)
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", trace.server_timing())
+                headers.append(REQUEST_ID_HEADER, request_id)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_trace.reset(token)
+            total_ms = round(trace.elapsed_ms(), 2)
+            logger.info(
+                f"{scope['method']} {scope['path']} {status_code} in {total_ms}ms",
+                extra={
+                    "request_id": request_id,
+                    "path": scope["path"],
+                    "status": status_code,
+                    "total_ms": total_ms,
+                    "timings_ms": trace.timings_ms(),
+                    **trace.fields,
+                },
+            )
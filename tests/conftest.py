@@ -0,0 +1,55 @@
+"""
+Shared test setup.
+
+``config.config`` validates the Gemini API key at import time, so a dummy
+key is set before any project module is imported. Tests stay off the
+network and never load chromadb or sentence-transformers models.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakeCollection:
+    """Stands in for a Chroma collection in snapshot exports."""
+
+    def __init__(self, embeddings, documents=None, metadatas=None):
+        self.embeddings = np.asarray(embeddings, dtype=np.float32)
+        count = len(self.embeddings)
+        self.ids = [f"chunk-{i}" for i in range(count)]
+        self.documents = documents or [f"document {i}" for i in range(count)]
+        self.metadatas = metadatas or [{"url": f"https://example.edu/{i}"} for i in range(count)]
+
+    def count(self):
+        return len(self.ids)
+
+    def get(self, include, limit, offset):
+        page = slice(offset, offset + limit)
+        return {
+            "ids": self.ids[page],
+            "documents": self.documents[page],
+            "metadatas": self.metadatas[page],
+            "embeddings": self.embeddings[page].tolist(),
+        }
+
+
+@pytest.fixture
+def make_snapshot(tmp_path):
+    """Export a snapshot of the given vectors and return its directory."""
+    from phase4_vectorstore.snapshot import export_snapshot
+
+    def make(embeddings, documents=None, compression="none", pca_dims=0):
+        snapshot_dir = str(tmp_path / "snapshot")
+        export_snapshot(
+            FakeCollection(embeddings, documents), snapshot_dir, "v1", compression, pca_dims
+        )
+        return snapshot_dir
+
+    return make
@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from phase7_api.admission import AdmissionController, Overloaded
+
+
+def test_full_queue_is_rejected_with_retry_after():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_queue=1, queue_timeout=5)
+        ticket = await controller.acquire()
+        waiter = asyncio.ensure_future(controller.acquire())
+        await asyncio.sleep(0)
+        assert controller.queue_depth == 1
+
+        with pytest.raises(Overloaded) as excinfo:
+            await controller.acquire()
+
+        ticket.release()
+        (await waiter).release()
+        return controller, excinfo.value
+
+    controller, error = asyncio.run(scenario())
+    assert "queue full" in error.reason
+    assert error.retry_after >= 1
+    assert controller.stats()["rejected_queue_full"] == 1
+    assert controller.stats()["admitted"] == 2
+    assert controller.in_flight == 0
+
+
+def test_queue_deadline_rejects_waiters():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_queue=5, queue_timeout=0.01)
+        ticket = await controller.acquire()
+        with pytest.raises(Overloaded) as excinfo:
+            await controller.acquire()
+        ticket.release()
+        return controller, excinfo.value
+
+    controller, error = asyncio.run(scenario())
+    assert "queue timeout" in error.reason
+    assert controller.stats()["rejected_timeout"] == 1
+    assert controller.queue_depth == 0
+
+
+def test_retry_after_grows_with_the_backlog():
+    controller = AdmissionController(max_concurrent=2, max_queue=10, queue_timeout=1)
+    controller._service_time_avg = 4.0
+    idle = controller._retry_after()
+    controller._waiting = 9
+    assert controller._retry_after() > idle
+
+
+def test_releasing_a_ticket_twice_frees_one_slot():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_queue=0, queue_timeout=1)
+        ticket = await controller.acquire()
+        ticket.release()
+        ticket.release()
+        return controller
+
+    controller = asyncio.run(scenario())
+    assert controller.in_flight == 0
+    assert controller._semaphore._value == 1
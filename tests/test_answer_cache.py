@@ -0,0 +1,123 @@
+import sqlite3
+import time
+
+import pytest
+
+from phase7_api import answer_cache
+from phase7_api.answer_cache import AnswerCache, normalize_question
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return AnswerCache(str(tmp_path / "answers.sqlite3"), memory_entries=2, ttl_seconds=60)
+
+
+def rows(cache):
+    with sqlite3.connect(cache.db_path) as conn:
+        return conn.execute("SELECT key FROM answers ORDER BY created_at").fetchall()
+
+
+def test_normalize_question_ignores_case_spacing_and_punctuation():
+    assert normalize_question("  What is the FEE? ") == normalize_question("what is the fee")
+
+
+def test_put_then_get_from_memory(cache):
+    key = cache.make_key("What is the fee?", "v1", "p1")
+    cache.put(key, "What is the fee?", "v1", "p1", "10,000", ["fees.html"], 0.9)
+    assert cache.get_local(key, "v1") == ("10,000", ["fees.html"], 0.9)
+
+
+def test_memory_tier_is_lru_bounded(cache):
+    keys = [cache.make_key(f"q{i}", "v1", "p1") for i in range(3)]
+    for i, key in enumerate(keys):
+        cache.put(key, f"q{i}", "v1", "p1", f"a{i}", [], 1.0)
+    assert cache.get_local(keys[0], "v1") is None
+    # The evicted answer is still served from the shared tier and promoted
+    assert cache.get_shared(keys[0]) == ("a0", [], 1.0)
+    assert cache.get_local(keys[0], "v1") == ("a0", [], 1.0)
+
+
+def test_shared_tier_is_visible_to_other_instances(cache):
+    key = cache.make_key("q", "v1", "p1")
+    cache.put(key, "q", "v1", "p1", "a", ["s"], 0.5)
+    other = AnswerCache(cache.db_path, memory_entries=2, ttl_seconds=60)
+    assert other.get(key, "v1") == ("a", ["s"], 0.5)
+
+
+def test_index_version_change_clears_memory_without_disk_io(cache, monkeypatch):
+    key = cache.make_key("q", "v1", "p1")
+    cache.put(key, "q", "v1", "p1", "a", [], 1.0)
+
+    def no_disk():
+        raise AssertionError("get_local must not touch the shared store")
+
+    monkeypatch.setattr(cache, "_connect", no_disk)
+    assert cache.get_local(key, "v2") is None
+
+
+def test_stale_index_and_prompt_versions_are_purged(cache):
+    old_index = cache.make_key("q", "v1", "p1")
+    cache.put(old_index, "q", "v1", "p1", "a", [], 1.0)
+    cache.get_local(old_index, "v2")
+    cache.get_shared(old_index)
+    assert rows(cache) == []
+
+    old_prompt = cache.make_key("q", "v2", "p1")
+    cache.put(old_prompt, "q", "v2", "p1", "a", [], 1.0)
+    new_prompt = cache.make_key("q", "v2", "p2")
+    cache.put(new_prompt, "q", "v2", "p2", "b", [], 1.0)
+    assert rows(cache) == [(new_prompt,)]
+
+
+def test_expired_answers_are_missed_and_swept(tmp_path, monkeypatch):
+    cache = AnswerCache(str(tmp_path / "answers.sqlite3"), memory_entries=2, ttl_seconds=10)
+    key = cache.make_key("q", "v1", "p1")
+    cache.put(key, "q", "v1", "p1", "a", [], 1.0)
+
+    later = time.time() + 3600
+    monkeypatch.setattr(answer_cache.time, "time", lambda: later)
+    assert cache.get(key, "v1") is None
+    assert rows(cache) == []
+
+
+def test_shared_tier_keeps_at_most_max_rows(tmp_path, monkeypatch):
+    cache = AnswerCache(
+        str(tmp_path / "answers.sqlite3"), memory_entries=10, ttl_seconds=3600, max_rows=2
+    )
+    monkeypatch.setattr(answer_cache, "MAINTENANCE_INTERVAL_SECONDS", 0.0)
+    keys = [cache.make_key(f"q{i}", "v1", "p1") for i in range(4)]
+    for i, key in enumerate(keys):
+        cache.put(key, f"q{i}", "v1", "p1", "a", [], 1.0)
+        time.sleep(0.01)
+    cache.get_shared(keys[0])
+    assert rows(cache) == [(keys[2],), (keys[3],)]
+
+
+def test_memory_hits_are_written_back_for_faq_mining(cache, monkeypatch):
+    from phase7_api.build_faq import mine_answer_cache
+
+    popular = cache.make_key("What is the fee?", "v1", "p1")
+    rare = cache.make_key("Where is the library?", "v1", "p1")
+    cache.put(popular, "What is the fee?", "v1", "p1", "a", [], 1.0)
+    cache.put(rare, "Where is the library?", "v1", "p1", "b", [], 1.0)
+    for _ in range(3):
+        assert cache.get_local(popular, "v1") is not None
+    assert cache.get_local(rare, "v1") is not None
+    assert mine_answer_cache(cache.db_path, limit=10, min_hits=1) == []
+
+    monkeypatch.setattr(answer_cache, "HIT_FLUSH_INTERVAL_SECONDS", 0.0)
+    assert cache.hits_due()
+    cache.flush_hits()
+    assert not cache.hits_due()
+    assert mine_answer_cache(cache.db_path, limit=10, min_hits=2) == ["what is the fee"]
+
+
+def test_reanswering_keeps_the_hit_count(cache):
+    key = cache.make_key("q", "v1", "p1")
+    cache.put(key, "q", "v1", "p1", "old", [], 1.0)
+    cache.get_local(key, "v1")
+    cache.flush_hits()
+    cache.put(key, "q", "v1", "p1", "new", [], 1.0)
+
+    with sqlite3.connect(cache.db_path) as conn:
+        assert conn.execute("SELECT answer, hits FROM answers").fetchall() == [("new", 1)]
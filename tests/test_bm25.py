@@ -0,0 +1,61 @@
+import numpy as np
+
+from phase4_vectorstore.bm25_index import BM25Index, tokenize
+from phase6_rag.shared_index import SharedIndex, reciprocal_rank_fusion
+
+DOCUMENTS = [
+    "BCA301 Data Structures is a third semester course.",
+    "The B.Com programme fee is 1,20,000 per year.",
+    "Admissions for 2024-25 open in June.",
+    "The library is open from 8 am to 8 pm.",
+]
+
+
+def test_tokenize_indexes_compounds_whole_joined_and_as_parts():
+    assert tokenize("B.Com") == ["b.com", "bcom", "b", "com"]
+    assert tokenize("Fee: 1,20,000") == ["fee", "120000"]
+    assert "2024-25" in tokenize("Admissions 2024-25")
+
+
+def test_exact_tokens_rank_their_document_first():
+    index = BM25Index.build(DOCUMENTS)
+    for query, expected in (("BCA301", 0), ("bcom fees", 1), ("b com", 1), ("120000", 1), ("2024-25", 2)):
+        rows, scores = index.top_k(query, 2)
+        assert rows[0] == expected, query
+        assert list(scores) == sorted(scores, reverse=True)
+
+
+def test_documents_without_a_matching_term_are_left_out():
+    index = BM25Index.build(DOCUMENTS)
+    rows, _ = index.top_k("library hours", 4)
+    assert list(rows) == [3]
+    assert len(index.top_k("hostel", 4)[0]) == 0
+
+
+def test_save_and_load_round_trip(tmp_path):
+    index = BM25Index.build(DOCUMENTS)
+    loaded = BM25Index.load(str(tmp_path), index.save(str(tmp_path), "v1"))
+    np.testing.assert_allclose(loaded.scores("b.com fee"), index.scores("b.com fee"))
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = reciprocal_rank_fusion([["a", "b", "d"], ["b", "c"]], k=60)
+    assert fused[0] == "b"
+    assert set(fused) == {"a", "b", "c", "d"}
+    # Ties keep first-seen order
+    assert reciprocal_rank_fusion([["x"], ["y"]]) == ["x", "y"]
+
+
+def test_hybrid_search_surfaces_the_exact_token_match(make_snapshot):
+    rng = np.random.default_rng(0)
+    embeddings = rng.normal(size=(len(DOCUMENTS), 8)).astype(np.float32)
+    index = SharedIndex(make_snapshot(embeddings, DOCUMENTS))
+    # A query vector nearest to the library chunk, asking about BCA301
+    query = embeddings[3]
+
+    [(dense_docs, _, _)] = index.search([query], 1)
+    [(documents, _, distances)] = index.hybrid_search([query], ["BCA301"], top_k=2, candidates=2)
+    assert dense_docs == [DOCUMENTS[3]]
+    assert DOCUMENTS[0] in documents
+    # Distances stay attached to their chunks after fusion
+    assert distances[documents.index(DOCUMENTS[3])] < 1e-5
@@ -0,0 +1,128 @@
+import asyncio
+
+import pytest
+
+from phase6_rag import circuit_breaker
+from phase6_rag.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    call_with_retry,
+    call_with_retry_async,
+)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", lambda: now[0])
+    return now
+
+
+def failing(calls):
+    def func():
+        calls.append(1)
+        raise RuntimeError("provider down")
+    return func
+
+
+def test_opens_after_consecutive_failures_and_rejects(clock):
+    breaker = CircuitBreaker("llm", failure_threshold=2, reset_timeout=30)
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    assert breaker.stats()["rejected_total"] == 1
+
+
+def test_single_probe_after_the_cool_down(clock):
+    breaker = CircuitBreaker("llm", failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock[0] += 31
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+
+def test_failed_probe_reopens(clock):
+    breaker = CircuitBreaker("llm", failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock[0] += 31
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.stats()["opened_total"] == 2
+
+
+def test_retries_count_as_one_breaker_failure():
+    breaker = CircuitBreaker("llm", failure_threshold=2)
+    calls = []
+    with pytest.raises(RuntimeError):
+        call_with_retry(failing(calls), breaker, retries=2, base_delay=0, max_delay=0)
+    assert len(calls) == 3
+    assert breaker.stats()["consecutive_failures"] == 1
+
+
+def test_retry_recovers_from_a_transient_failure():
+    breaker = CircuitBreaker("llm")
+    attempts = iter([RuntimeError("blip"), "answer"])
+
+    def func():
+        outcome = next(attempts)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    assert call_with_retry(func, breaker, base_delay=0, max_delay=0) == "answer"
+    assert breaker.state == CLOSED
+
+
+def test_open_circuit_fails_fast_without_calling():
+    breaker = CircuitBreaker("llm", failure_threshold=1)
+    breaker.record_failure()
+    calls = []
+    with pytest.raises(CircuitOpenError):
+        call_with_retry(failing(calls), breaker)
+    assert calls == []
+
+
+def test_async_attempts_are_bounded_by_the_timeout():
+    breaker = CircuitBreaker("llm", failure_threshold=1)
+    attempts = []
+
+    async def slow():
+        attempts.append(1)
+        await asyncio.sleep(1)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(call_with_retry_async(
+            slow, breaker, retries=1, base_delay=0, max_delay=0, timeout=0.01
+        ))
+    assert len(attempts) == 2
+    assert breaker.state == OPEN
+
+
+def test_async_cancellation_releases_the_probe():
+    breaker = CircuitBreaker("llm", failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+
+    async def scenario():
+        task = asyncio.ensure_future(
+            call_with_retry_async(lambda: asyncio.sleep(1), breaker)
+        )
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(scenario())
+    # Nothing was learned about the provider, so another probe may go out
+    assert breaker.stats()["consecutive_failures"] == 1
+    assert breaker.allow()
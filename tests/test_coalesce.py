@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from phase7_api.coalesce import SingleFlight
+
+
+def test_concurrent_identical_keys_share_one_call():
+    async def scenario():
+        flight = SingleFlight()
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "answer"
+
+        results = await asyncio.gather(*(flight.run("q", work) for _ in range(5)))
+        return flight, calls, results
+
+    flight, calls, results = asyncio.run(scenario())
+    assert calls == 1
+    assert results == ["answer"] * 5
+    assert flight.stats()["coalesced"] == 4
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_different_keys_run_separately():
+    async def scenario():
+        flight = SingleFlight()
+
+        async def work(value):
+            await asyncio.sleep(0.01)
+            return value
+
+        return await asyncio.gather(
+            flight.run("a", lambda: work("A")), flight.run("b", lambda: work("B"))
+        )
+
+    assert asyncio.run(scenario()) == ["A", "B"]
+
+
+def test_exceptions_reach_every_waiter():
+    async def scenario():
+        flight = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("llm down")
+
+        return await asyncio.gather(
+            flight.run("q", work), flight.run("q", work), return_exceptions=True
+        )
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_cancelled_leader_does_not_cancel_the_shared_work():
+    async def scenario():
+        flight = SingleFlight()
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return "answer"
+
+        leader = asyncio.ensure_future(flight.run("q", work))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.run("q", work))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return calls, await follower
+
+    assert asyncio.run(scenario()) == (1, "answer")
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from phase4_vectorstore.compression import CompressedVectors, evaluate, rescore
+from phase6_rag.shared_index import SharedIndex
+
+
+def clustered_rows(count=2000, dim=64, seed=0):
+    """Unit vectors in a few clusters, like sentence embeddings of one site."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(20, dim))
+    vectors = centers[rng.integers(0, 20, count)] + 0.5 * rng.normal(size=(count, dim))
+    vectors = vectors.astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@pytest.mark.parametrize("method", ["float16", "int8"])
+def test_compression_saves_memory_and_rescoring_keeps_recall(method):
+    embeddings = clustered_rows()
+    compressed = CompressedVectors.build(embeddings, method)
+    report = evaluate(embeddings, compressed, k=5, candidates=50, sample=100)
+
+    assert compressed.codes.dtype == (np.int8 if method == "int8" else np.float16)
+    assert report["saved"] >= (0.7 if method == "int8" else 0.45)
+    assert report["recall_at_k"] >= 0.9
+    assert report["recall_at_k_rescored"] >= 0.99
+
+
+def test_pca_reduces_dimensions():
+    embeddings = clustered_rows()
+    compressed = CompressedVectors.build(embeddings, "int8", pca_dims=32)
+    assert compressed.dims == 32
+    assert compressed.project(embeddings[:3]).shape == (3, 32)
+    assert evaluate(embeddings, compressed, sample=100)["recall_at_k_rescored"] >= 0.95
+
+
+def test_unknown_method_is_rejected():
+    with pytest.raises(ValueError):
+        CompressedVectors.build(clustered_rows(10, 8), "int4")
+
+
+def test_rescore_orders_candidates_exactly():
+    embeddings = clustered_rows(100, 16)
+    query = embeddings[[7]]
+    candidates = np.array([[3, 7, 50, 12]])
+    rows, similarities = rescore(embeddings, query, candidates, 2)
+    assert rows[0, 0] == 7
+    assert similarities[0, 0] >= similarities[0, 1]
+
+
+def test_save_and_load_round_trip(tmp_path):
+    embeddings = clustered_rows(200, 16)
+    compressed = CompressedVectors.build(embeddings, "int8", pca_dims=8)
+    loaded = CompressedVectors.load(str(tmp_path), compressed.save(str(tmp_path), "v1"))
+    np.testing.assert_allclose(loaded.scores(embeddings[:5]), compressed.scores(embeddings[:5]))
+
+
+def test_compressed_snapshot_search_matches_exact(make_snapshot):
+    embeddings = clustered_rows()
+    index = SharedIndex(make_snapshot(embeddings, compression="int8"), rescore_candidates=50)
+    queries = clustered_rows(20, 64, seed=1)
+
+    exact, _ = index.top_k(queries, 5, exact=True)
+    approx, _ = index.top_k(queries, 5)
+    recall = np.mean([len(set(a) & set(b)) / 5 for a, b in zip(approx, exact)])
+    assert recall >= 0.98
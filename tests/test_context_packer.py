@@ -0,0 +1,48 @@
+from phase6_rag.context_packer import (
+    BLOCK_OVERHEAD_TOKENS,
+    clean_chunk,
+    estimate_tokens,
+    pack_context,
+)
+
+
+def sentence_chunk(word, count):
+    return " ".join(f"The {word} detail number {i} is listed here." for i in range(count))
+
+
+def test_clean_chunk_strips_images_and_unwraps_links():
+    text = "See ![logo](https://x/logo.png) the [fee page](https://x/fees)  now"
+    assert clean_chunk(text) == "See the fee page now"
+
+
+def test_packed_context_stays_within_the_budget():
+    chunks = [sentence_chunk(word, 10) for word in ("fee", "hostel", "course", "exam")]
+    metadatas = [{"url": f"https://x/{i}"} for i in range(4)]
+    budget = 250
+
+    packed = pack_context(chunks, metadatas, budget)
+    assert packed.tokens <= budget
+    assert packed.tokens == sum(estimate_tokens(c) + BLOCK_OVERHEAD_TOKENS for c in packed.chunks)
+    assert packed.dropped == 4 - len(packed.chunks)
+    # Relevance order is kept
+    assert packed.chunks[0] == chunks[0]
+
+
+def test_only_the_most_relevant_block_is_truncated():
+    chunks = [sentence_chunk("fee", 40), sentence_chunk("hostel", 2)]
+    packed = pack_context(chunks, [{"url": "a"}, {"url": "b"}], 120)
+    assert packed.truncated == 1
+    assert packed.chunks[0].startswith("The fee detail number 0")
+    assert packed.tokens <= 120
+
+
+def test_duplicates_are_dropped_and_overlaps_merged():
+    first = "Admissions open in June for all undergraduate programmes offered by the college."
+    second = first[30:] + " Applications close in July."
+    chunks = [first, first.upper(), second]
+    metadatas = [{"url": "a"}, {"url": "a"}, {"url": "a"}]
+
+    packed = pack_context(chunks, metadatas, 1000)
+    assert packed.duplicates == 1
+    assert packed.merged == 1
+    assert packed.chunks == [first + " Applications close in July."]
@@ -0,0 +1,82 @@
+import pytest
+
+from phase6_rag.extractive import DEGRADED_PREAMBLE, ExtractiveFastPath, best_span, degraded_answer
+
+FEES_CHUNK = (
+    "The annual tuition fee for BCA is INR 60,000. "
+    "Hostel accommodation is available for outstation students. "
+    "The college was founded in 1880."
+)
+FEES_META = {"url": "https://example.edu/fees"}
+
+
+@pytest.fixture
+def fast_path():
+    return ExtractiveFastPath(max_distance=0.2, min_margin=0.05, min_term_coverage=0.6, max_chars=200)
+
+
+def test_answers_from_a_confident_top_chunk(fast_path):
+    answer, index = fast_path.try_answer(
+        "What is the tuition fee for BCA?", [FEES_CHUNK, "other"], [FEES_META, {}], [0.1, 0.3]
+    )
+    assert answer == (
+        "The annual tuition fee for BCA is INR 60,000.\n\nSource: https://example.edu/fees"
+    )
+    assert index == 0
+    assert fast_path.stats()["answered"] == 1
+
+
+@pytest.mark.parametrize(
+    "distances",
+    [
+        [0.25, 0.5],  # top chunk too far from the question
+        [0.1, 0.12],  # runner-up about as close
+    ],
+)
+def test_defers_to_the_llm_when_retrieval_is_not_confident(fast_path, distances):
+    answer = fast_path.try_answer(
+        "What is the tuition fee for BCA?", [FEES_CHUNK, "other"], [FEES_META, {}], distances
+    )
+    assert answer is None
+    assert fast_path.stats()["considered"] == 1
+    assert fast_path.stats()["answered"] == 0
+
+
+def test_defers_when_the_chunk_misses_most_question_terms(fast_path):
+    answer = fast_path.try_answer(
+        "When does MBA placement season start?", [FEES_CHUNK], [FEES_META], [0.1]
+    )
+    assert answer is None
+
+
+def test_best_span_reports_term_coverage():
+    passage, coverage = best_span("tuition fee BCA", FEES_CHUNK)
+    assert passage == "The annual tuition fee for BCA is INR 60,000."
+    assert coverage == 1.0
+
+
+def test_degraded_answer_lists_passages_with_sources():
+    answer = degraded_answer("tuition fee", [FEES_CHUNK, FEES_CHUNK], [FEES_META, FEES_META])
+    lines = answer.splitlines()
+    assert lines[0] == DEGRADED_PREAMBLE
+    # The repeated chunk is listed once
+    assert len([line for line in lines if line.startswith("- ")]) == 1
+    assert "(Source: https://example.edu/fees)" in answer
+
+
+def test_gates_on_distances_when_results_were_reordered(fast_path):
+    # Hybrid search or reranking put another chunk first; its distance is kept
+    chunks = ["other", FEES_CHUNK, "third"]
+    metadatas = [
+        {"url": "https://example.edu/other"}, FEES_META, {"url": "https://example.edu/third"}
+    ]
+    distances = [0.3, 0.1, 0.35]
+    answer, index = fast_path.try_answer(
+        "What is the tuition fee for BCA?", chunks, metadatas, distances
+    )
+    assert answer == (
+        "The annual tuition fee for BCA is INR 60,000.\n\nSource: https://example.edu/fees"
+    )
+    # The RAG service cites metadatas[index], the chunk the answer came from
+    assert index == 1
+    assert metadatas[index] is FEES_META
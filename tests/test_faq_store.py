@@ -0,0 +1,57 @@
+import os
+
+import numpy as np
+import pytest
+
+from phase7_api.faq_store import FAQStore, write_faq_store
+
+
+def entry(question, answer):
+    return {"question": question, "answer": answer, "sources": [f"{answer}.html"], "confidence": 0.9}
+
+
+def write(store_dir, entries, embeddings, index_version="v1"):
+    write_faq_store(store_dir, entries, np.asarray(embeddings, dtype=np.float32), index_version, "p1")
+    # A later write in the same clock tick must still look changed
+    path = os.path.join(store_dir, "faq.json")
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+@pytest.fixture
+def store_dir(tmp_path):
+    store_dir = str(tmp_path / "faq")
+    write(store_dir, [entry("What is the BCA fee?", "fees"), entry("Where is the campus?", "map")],
+          [[1.0, 0.0], [0.0, 1.0]])
+    return store_dir
+
+
+def test_exact_and_similar_lookups(store_dir):
+    store = FAQStore(store_dir, max_distance=0.05)
+    assert store.lookup_exact("what is the  BCA fee", "v1", "p1")[0] == "fees"
+    assert store.lookup_similar([0.01, 1.0], "v1", "p1")[0] == "map"
+    assert store.lookup_similar([1.0, 1.0], "v1", "p1") is None
+    assert store.stats()["exact_hits"] == 1
+
+
+def test_answers_are_gated_on_index_and_prompt_version(store_dir):
+    store = FAQStore(store_dir, max_distance=0.05)
+    assert store.lookup_exact("What is the BCA fee?", "v2", "p1") is None
+    assert store.lookup_exact("What is the BCA fee?", "v1", "p2") is None
+    assert store.lookup_similar([1.0, 0.0], "v2", "p1") is None
+
+
+def test_rewritten_store_is_reloaded(store_dir):
+    store = FAQStore(store_dir, max_distance=0.05)
+    assert store.lookup_similar([0.0, 1.0], "v1", "p1")[0] == "map"
+
+    write(store_dir, [entry("Where is the campus?", "new map")], [[0.0, 1.0]], index_version="v2")
+    assert store.is_stale()
+    # Without a reload the old version keeps answering only its own index version
+    assert store.lookup_similar([0.0, 1.0], "v2", "p1", reload=False) is None
+
+    store.refresh()
+    assert not store.is_stale()
+    assert store.lookup_similar([0.0, 1.0], "v2", "p1", reload=False)[0] == "new map"
+    assert store.lookup_exact("What is the BCA fee?", "v1", "p1") is None
+    assert store.stats()["entries"] == 1
@@ -0,0 +1,123 @@
+import asyncio
+
+from phase6_rag import llm_backends
+from phase6_rag.llm_backends import HedgedLLM, LLMBackend
+
+
+class FakeBackend(LLMBackend):
+    """Answers after a fixed delay and records cancellations."""
+
+    def __init__(self, name, delay, chunks=("answer",)):
+        self.name = name
+        self.delay = delay
+        self.chunks = chunks
+        self.started = 0
+        self.cancelled = 0
+
+    def generate(self, prompt, temperature=None, max_tokens=None, system_instruction=None):
+        raise NotImplementedError
+
+    def generate_stream(self, prompt, temperature=None, max_tokens=None, system_instruction=None):
+        raise NotImplementedError
+
+    async def generate_async(self, prompt, temperature=None, max_tokens=None, system_instruction=None):
+        self.started += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return f"{self.name}: {prompt}"
+
+    async def generate_stream_async(self, prompt, temperature=None, max_tokens=None, system_instruction=None):
+        self.started += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        for chunk in self.chunks:
+            yield f"{self.name}:{chunk}"
+
+    def health_check(self):
+        return True
+
+
+def hedged(primary, hedge, initial_delay=0.02):
+    return HedgedLLM(
+        primary, hedge, percentile=95, window_size=10, min_samples=5,
+        initial_delay=initial_delay, min_delay=0.01,
+    )
+
+
+def test_fast_primary_is_not_hedged():
+    primary, hedge = FakeBackend("primary", 0.0), FakeBackend("hedge", 0.0)
+    llm = hedged(primary, hedge)
+    assert asyncio.run(llm.generate_async("q")) == "primary: q"
+    assert hedge.started == 0
+    assert llm.stats()["hedged"] == 0
+
+
+def test_hedge_fires_after_the_deadline_and_the_loser_is_cancelled():
+    primary, hedge = FakeBackend("primary", 1.0), FakeBackend("hedge", 0.0)
+    llm = hedged(primary, hedge)
+    assert asyncio.run(llm.generate_async("q")) == "hedge: q"
+    assert hedge.started == 1
+    assert primary.cancelled == 1
+    assert llm.stats()["hedge_wins"] == 1
+
+
+def test_primary_can_still_win_after_hedging():
+    primary, hedge = FakeBackend("primary", 0.05), FakeBackend("hedge", 1.0)
+    llm = hedged(primary, hedge)
+    assert asyncio.run(llm.generate_async("q")) == "primary: q"
+    assert llm.stats()["hedged"] == 1
+    assert llm.stats()["hedge_wins"] == 0
+    assert hedge.cancelled == 1
+
+
+def test_cancelling_the_caller_before_the_hedge_cancels_the_primary():
+    primary = FakeBackend("primary", 1.0)
+    llm = hedged(primary, FakeBackend("hedge", 0.0), initial_delay=1.0)
+
+    async def cancel_early():
+        call = asyncio.ensure_future(llm.generate_async("q"))
+        await asyncio.sleep(0.01)
+        call.cancel()
+        await asyncio.gather(call, return_exceptions=True)
+        await asyncio.sleep(0.01)
+        # Checked before asyncio.run cancels leftover tasks on exit
+        return primary.cancelled
+
+    assert asyncio.run(cancel_early()) == 1
+    assert primary.started == 1
+    assert llm.stats()["hedged"] == 0
+
+
+def test_streaming_hedges_on_the_first_chunk():
+    primary = FakeBackend("primary", 1.0)
+    hedge = FakeBackend("hedge", 0.0, chunks=("a", "b"))
+    llm = hedged(primary, hedge)
+
+    async def collect():
+        return [text async for text in llm.generate_stream_async("q")]
+
+    assert asyncio.run(collect()) == ["hedge:a", "hedge:b"]
+    assert primary.cancelled == 1
+
+
+def test_deadline_follows_the_latency_percentile():
+    llm = hedged(FakeBackend("p", 0), FakeBackend("h", 0), initial_delay=3.0)
+    assert llm._deadline(llm._latency) == 3.0
+    for latency in (0.1, 0.2, 0.3, 0.4, 0.5):
+        llm._latency.add(latency)
+    assert llm._deadline(llm._latency) == 0.5
+
+
+def test_current_llm_does_not_create_the_backend(monkeypatch):
+    monkeypatch.setattr(llm_backends, "_llm_instance", None)
+    monkeypatch.setattr(
+        llm_backends, "create_backend",
+        lambda name: (_ for _ in ()).throw(AssertionError("backend created")),
+    )
+    assert llm_backends.current_llm() is None
@@ -0,0 +1,76 @@
+import threading
+import time
+
+from phase6_rag.reranker import CrossEncoderReranker
+
+CHUNKS = ["library hours", "hostel fees", "bca fee is 60000"]
+METAS = [{"url": str(i)} for i in range(len(CHUNKS))]
+DISTANCES = [0.1, 0.2, 0.3]
+
+
+class FakeCrossEncoder:
+    """Scores a pair by how many query words the chunk contains."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = 0
+
+    def predict(self, pairs, batch_size, show_progress_bar):
+        self.calls += 1
+        time.sleep(self.delay)
+        return [sum(word in chunk for word in query.split()) for query, chunk in pairs]
+
+
+def reranker(model, budget=1.0, workers=1):
+    instance = CrossEncoderReranker("fake", time_budget_seconds=budget, workers=workers)
+    instance._model = model
+    return instance
+
+
+def test_reorders_by_score_and_keeps_distances_with_their_chunks():
+    chunks, metas, distances = reranker(FakeCrossEncoder()).rerank(
+        "bca fee", CHUNKS, METAS, DISTANCES, top_k=2
+    )
+    assert chunks == ["bca fee is 60000", "hostel fees"]
+    assert metas == [{"url": "2"}, {"url": "1"}]
+    assert distances == [0.3, 0.2]
+
+
+def test_scores_are_cached_per_question():
+    model = FakeCrossEncoder()
+    instance = reranker(model)
+    first = instance.rerank("BCA  fee", CHUNKS, METAS, DISTANCES, top_k=2)
+    assert instance.rerank("bca fee", CHUNKS, METAS, DISTANCES, top_k=2) == first
+    assert model.calls == 1
+    assert instance.stats()["cache_hit_rate"] == 0.5
+
+
+def test_timeout_falls_back_to_retrieval_order_and_caches_late_scores():
+    model = FakeCrossEncoder(delay=0.2)
+    instance = reranker(model, budget=0.01)
+
+    result = instance.rerank("bca fee", CHUNKS, METAS, DISTANCES, top_k=2)
+    assert result == (CHUNKS[:2], METAS[:2], DISTANCES[:2])
+    assert instance.stats()["fallbacks"] == 1
+
+    time.sleep(0.4)
+    chunks, _, _ = instance.rerank("bca fee", CHUNKS, METAS, DISTANCES, top_k=2)
+    assert chunks[0] == "bca fee is 60000"
+    assert model.calls == 1
+
+
+def test_concurrent_questions_are_scored_in_parallel():
+    instance = reranker(FakeCrossEncoder(delay=0.1), budget=0.3, workers=6)
+    results = []
+
+    def ask(i):
+        results.append(instance.rerank(f"bca fee {i}", CHUNKS, METAS, DISTANCES, top_k=1))
+
+    threads = [threading.Thread(target=ask, args=(i,)) for i in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert instance.stats()["fallbacks"] == 0
+    assert all(chunks == ["bca fee is 60000"] for chunks, _, _ in results)
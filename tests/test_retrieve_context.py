@@ -0,0 +1,32 @@
+import pytest
+
+pytest.importorskip("chromadb")
+
+from phase4_vectorstore.index_version import bump_index_version
+from phase6_rag import retrieve_context
+from phase6_rag.retrieve_context import RetrievalService
+
+
+def test_index_update_reopens_on_a_new_chroma_system(tmp_path, monkeypatch):
+    clients = []
+    open_client = retrieve_context.chromadb.Client
+
+    def recording_client(settings):
+        client = open_client(settings)
+        clients.append(client)
+        return client
+
+    monkeypatch.setattr(retrieve_context.chromadb, "Client", recording_client)
+    persist_dir = str(tmp_path / "vector_db")
+    bump_index_version(persist_dir)
+    service = RetrievalService(persist_dir, "chunks")
+
+    first = service.collection()
+    assert service.collection() is first
+    assert len(clients) == 1
+
+    bump_index_version(persist_dir)
+    assert service.collection() is not first
+    assert len(clients) == 2
+    # A client on the cached System would still serve the old HNSW index
+    assert clients[1]._system is not clients[0]._system
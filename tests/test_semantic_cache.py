@@ -0,0 +1,73 @@
+import pytest
+
+from phase7_api import semantic_cache
+from phase7_api.semantic_cache import SemanticCache
+
+
+@pytest.fixture
+def cache():
+    return SemanticCache(max_distance=0.1, ttl_seconds=60, max_entries=2, max_bytes=1 << 20)
+
+
+def test_hit_within_distance_threshold(cache):
+    cache.store("what is the fee", [1.0, 0.0, 0.0], "v1", "10,000", ["fees.html"], 0.9)
+    # Cosine distance 1 - 0.995 ~= 0.005
+    assert cache.lookup([1.0, 0.1, 0.0], "v1") == ("10,000", ["fees.html"], 0.9)
+
+
+def test_miss_beyond_distance_threshold(cache):
+    cache.store("what is the fee", [1.0, 0.0, 0.0], "v1", "10,000", [], 0.9)
+    # Cosine distance 1 - 0.707 ~= 0.29
+    assert cache.lookup([1.0, 1.0, 0.0], "v1") is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_knowledge_base_version_change_clears_entries(cache):
+    cache.store("q", [1.0, 0.0], "v1", "a", [], 1.0)
+    assert cache.lookup([1.0, 0.0], "v2") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted(cache):
+    cache.store("a", [1.0, 0.0, 0.0], "v1", "A", [], 1.0)
+    cache.store("b", [0.0, 1.0, 0.0], "v1", "B", [], 1.0)
+    assert cache.lookup([1.0, 0.0, 0.0], "v1") is not None
+    cache.store("c", [0.0, 0.0, 1.0], "v1", "C", [], 1.0)
+
+    assert cache.lookup([0.0, 1.0, 0.0], "v1") is None
+    assert cache.lookup([1.0, 0.0, 0.0], "v1")[0] == "A"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_memory_cap_evicts_before_storing():
+    probe = SemanticCache(max_distance=0.1, ttl_seconds=60, max_entries=10, max_bytes=1 << 20)
+    probe.store("a", [1.0, 0.0], "v1", "A", [], 1.0)
+    entry_bytes = probe.stats()["bytes"]
+
+    cache = SemanticCache(
+        max_distance=0.1, ttl_seconds=60, max_entries=10, max_bytes=entry_bytes + entry_bytes // 2
+    )
+    cache.store("a", [1.0, 0.0], "v1", "A", [], 1.0)
+    cache.store("b", [0.0, 1.0], "v1", "B", [], 1.0)
+    assert cache.stats()["entries"] == 1
+    assert cache.lookup([0.0, 1.0], "v1")[0] == "B"
+
+
+def test_expired_entry_is_a_miss(cache, monkeypatch):
+    cache.store("q", [1.0, 0.0], "v1", "a", [], 1.0)
+    now = semantic_cache.time.monotonic() + 3600
+    monkeypatch.setattr(semantic_cache.time, "monotonic", lambda: now)
+    assert cache.lookup([1.0, 0.0], "v1") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_expired_best_match_does_not_hide_a_valid_one(cache, monkeypatch):
+    now = [semantic_cache.time.monotonic()]
+    monkeypatch.setattr(semantic_cache.time, "monotonic", lambda: now[0])
+    cache.store("old", [1.0, 0.0, 0.0], "v1", "old", [], 1.0)
+    now[0] += 50
+    cache.store("new", [1.0, 0.1, 0.0], "v1", "new", [], 1.0)
+    now[0] += 20
+
+    # The expired entry is the closer one, the fresh one is still within the threshold
+    assert cache.lookup([1.0, 0.0, 0.0], "v1")[0] == "new"
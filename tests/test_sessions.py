@@ -0,0 +1,72 @@
+import pytest
+
+from phase7_api import sessions as sessions_module
+from phase7_api.sessions import SessionStore, is_follow_up
+
+
+@pytest.fixture
+def store():
+    return SessionStore(
+        max_sessions=2, idle_ttl_seconds=60, history_token_budget=60, summary_token_budget=40
+    )
+
+
+def test_get_or_create_keeps_the_client_id_and_reuses_sessions(store):
+    session = store.get_or_create("abc")
+    assert session.session_id == "abc"
+    assert store.get_or_create("abc") is session
+    assert store.stats()["created"] == 1
+
+
+def test_idle_sessions_expire(store, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(sessions_module.time, "monotonic", lambda: clock[0])
+    session = store.get_or_create("abc")
+    store.append(session, "What courses are offered?", "BCA and BCom.")
+
+    clock[0] += 61
+    fresh = store.get_or_create("abc")
+    assert fresh is not session
+    assert store.context(fresh) == (None, None)
+    assert store.stats()["evicted_idle"] == 1
+
+
+def test_least_recently_used_session_is_evicted_at_capacity(store):
+    store.get_or_create("a")
+    store.get_or_create("b")
+    store.get_or_create("a")
+    store.get_or_create("c")
+
+    assert store.stats()["evicted_capacity"] == 1
+    assert store.stats()["sessions"] == 2
+    assert store.get_or_create("a").session_id == "a"
+    assert store.stats()["created"] == 3
+
+
+def test_long_history_is_compacted_into_a_summary(store):
+    session = store.get_or_create("abc")
+    for i in range(6):
+        store.append(session, f"Question {i} about courses?", f"Answer {i}. " + "detail " * 20)
+
+    history, previous = store.context(session)
+    assert previous == "Question 5 about courses?"
+    assert "Earlier in this conversation:" in history
+    assert "Question 5 about courses?" in history
+    assert len(session.turns) < 6
+    assert store.stats()["compactions"] > 0
+
+
+@pytest.mark.parametrize(
+    "question",
+    ["What about its fees?", "and for MBA?", "Is it open on Sundays?", "tell me more"],
+)
+def test_follow_ups_are_detected(question):
+    assert is_follow_up(question)
+
+
+@pytest.mark.parametrize(
+    "question",
+    ["What are the hostel fees for BCA?", "Is there a hostel on campus?", "Who is the principal of the college?"],
+)
+def test_standalone_questions_are_not_follow_ups(question):
+    assert not is_follow_up(question)
@@ -0,0 +1,50 @@
+import numpy as np
+
+from phase4_vectorstore.snapshot import read_snapshot_meta
+from phase6_rag.shared_index import SharedIndex
+
+
+def unit_rows(count, dim, seed=0):
+    vectors = np.random.default_rng(seed).normal(size=(count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def brute_force(embeddings, queries, k):
+    similarities = queries @ embeddings.T
+    return np.argsort(-similarities, axis=1, kind="stable")[:, :k]
+
+
+def test_top_k_matches_brute_force(make_snapshot):
+    embeddings = unit_rows(500, 32)
+    index = SharedIndex(make_snapshot(embeddings))
+    queries = unit_rows(20, 32, seed=1)
+
+    rows, similarities = index.top_k(queries, 7)
+    np.testing.assert_array_equal(rows, brute_force(embeddings, queries, 7))
+    np.testing.assert_allclose(
+        similarities, np.take_along_axis(queries @ embeddings.T, rows, axis=1), rtol=1e-5
+    )
+
+
+def test_single_query_and_oversized_k(make_snapshot):
+    embeddings = unit_rows(5, 8)
+    index = SharedIndex(make_snapshot(embeddings))
+    rows, _ = index.top_k(embeddings[2] * 3.0, 10)
+    assert rows.shape == (1, 5)
+    assert rows[0, 0] == 2
+
+
+def test_search_returns_documents_and_chroma_scale_distances(make_snapshot):
+    embeddings = unit_rows(50, 16)
+    index = SharedIndex(make_snapshot(embeddings))
+
+    [(documents, metadatas, distances)] = index.search(embeddings[[10]], 3)
+    assert documents[0] == "document 10"
+    assert metadatas[0] == {"url": "https://example.edu/10"}
+    assert abs(distances[0]) < 1e-5
+    assert distances == sorted(distances)
+    assert all(0.0 <= d <= 4.0 for d in distances)
+
+
+def test_empty_collection_is_not_exported(make_snapshot):
+    assert read_snapshot_meta(make_snapshot(np.empty((0, 8), dtype=np.float32))) is None